@@ -0,0 +1,282 @@
+"""ASGI entry point serving the same routes as ``bully_detector.app``.
+
+    uvicorn asgi:app --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+
+``POST /analyze`` and ``POST /challenge`` are handled natively on the event
+loop: the request is parsed on the loop and only the model call is handed to
+a thread pool (where concurrent calls coalesce into micro-batches when
+MICROBATCH_ENABLED=1), so a slow or idle client never holds a thread. Every
+other route runs the Flask app through a WSGI bridge on a second thread pool;
+streamed responses (NDJSON/SSE scans) are relayed chunk by chunk with a
+bounded buffer, so a slow reader back-pressures the scan instead of piling up
+output in memory.
+
+Environment:
+    ASGI_MODEL_THREADS  threads running model calls (default 32)
+    ASGI_WSGI_THREADS   threads running bridged Flask requests (default 16)
+"""
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bully_detector
+from inference_pool import InferencePoolFull, InferencePoolUnavailable
+
+ASGI_MODEL_THREADS = int(os.environ.get("ASGI_MODEL_THREADS", 32))
+ASGI_WSGI_THREADS = int(os.environ.get("ASGI_WSGI_THREADS", 16))
+
+# Streamed response chunks buffered between the Flask thread and the client.
+STREAM_BUFFER = 16
+
+model_executor = ThreadPoolExecutor(ASGI_MODEL_THREADS, thread_name_prefix="asgi-model")
+wsgi_executor = ThreadPoolExecutor(ASGI_WSGI_THREADS, thread_name_prefix="asgi-wsgi")
+
+
+# --------- NATIVE ROUTES ----------
+async def analyze(data):
+    text = str(data.get("text", "")).strip()
+    if not text:
+        return 400, {"error": "No text provided"}
+    return 200, await run_model(bully_detector.detect, text)
+
+
+async def challenge(data):
+    text = str(data.get("text", "")).strip()
+    if not text:
+        return 400, {"error": "No text provided"}
+    return 200, bully_detector.challenge_verdict(await run_model(bully_detector.detect, text))
+
+
+NATIVE_ROUTES = {
+    ("POST", "/analyze"): analyze,
+    ("POST", "/challenge"): challenge,
+}
+
+
+async def run_model(fn, *args):
+    """Run a blocking model call off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(model_executor, fn, *args)
+
+
+async def handle_native(handler, scope, receive, send):
+    started = time.perf_counter()
+    status, payload, headers = await call_native(handler, receive)
+    await send_json(send, status, payload, headers)
+    bully_detector.record_request(scope["path"], scope["method"], status, time.perf_counter() - started)
+
+
+async def call_native(handler, receive):
+    """Return ``(status, payload, extra headers)`` for a native route."""
+    try:
+        data = json.loads(await read_body(receive) or b"null")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return 400, {"error": "Request body must be a JSON object"}, ()
+    try:
+        status, payload = await handler(data)
+    except InferencePoolFull as e:
+        return 429, {"error": "Inference queue is full, retry shortly", "detail": str(e)}, [(b"retry-after", b"1")]
+    except InferencePoolUnavailable as e:
+        return 503, {"error": "Inference workers unavailable", "detail": str(e)}, [(b"retry-after", b"5")]
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return 500, {"error": "Internal server error", "detail": str(e)}, ()
+    return status, payload, ()
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def send_json(send, status, payload, headers=()):
+    body = bully_detector.app.json.dumps(payload).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+        *headers,
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+# --------- WSGI BRIDGE ----------
+def wsgi_environ(scope, body):
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server_name),
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        elif name != "CONTENT_LENGTH":
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def run_wsgi(wsgi_app, environ, emit, aborted):
+    """Run one WSGI request on this thread, passing its output to ``emit``.
+
+    The whole request, including iteration of a streamed body, stays on one
+    thread so Flask's context-local state stays valid.
+    """
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+        return lambda data: emit(("body", data))
+
+    try:
+        iterable = wsgi_app(environ, start_response)
+        try:
+            emit(("start", response["status"], response["headers"]))
+            for chunk in iterable:
+                if aborted.is_set():
+                    break
+                if chunk:
+                    emit(("body", chunk))
+        finally:
+            if hasattr(iterable, "close"):
+                iterable.close()
+    except Exception as e:
+        emit(("error", e))
+    finally:
+        emit(("end",))
+
+
+async def handle_wsgi(wsgi_app, scope, receive, send):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(STREAM_BUFFER)
+    aborted = threading.Event()
+
+    def emit(message):
+        # Blocks the Flask thread while the buffer is full (slow client),
+        # but not once the response was abandoned and may never be read.
+        future = asyncio.run_coroutine_threadsafe(queue.put(message), loop)
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except concurrent.futures.TimeoutError:
+                if aborted.is_set():
+                    future.cancel()
+                    return
+
+    environ = wsgi_environ(scope, await read_body(receive))
+    loop.run_in_executor(wsgi_executor, run_wsgi, wsgi_app, environ, emit, aborted)
+    watcher = asyncio.ensure_future(watch_disconnect(receive, aborted))
+
+    started = ended = False
+    try:
+        while True:
+            message = await queue.get()
+            kind = message[0]
+            if kind == "end":
+                ended = True
+                break
+            if aborted.is_set():
+                continue  # drain so the Flask thread can finish
+            try:
+                if kind == "start":
+                    await send({"type": "http.response.start", "status": message[1], "headers": message[2]})
+                    started = True
+                elif kind == "body":
+                    await send({"type": "http.response.body", "body": message[1], "more_body": True})
+                elif kind == "error":
+                    print(f"[!] WSGI bridge error: {message[1]}", file=sys.stderr)
+                    if not started:
+                        await send_json(send, 500, {"error": "Internal server error"})
+                    aborted.set()
+            except Exception as e:
+                # Client went away mid-response (servers raise OSError or
+                # their own disconnect errors); stop the WSGI iterator.
+                if not isinstance(e, OSError):
+                    print(f"[!] WSGI bridge send failed: {e!r}", file=sys.stderr)
+                aborted.set()
+        if started and not aborted.is_set():
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        watcher.cancel()
+        if not ended:
+            # Cancelled mid-response: keep consuming so the Flask thread is
+            # never left blocked on a full buffer.
+            aborted.set()
+            asyncio.ensure_future(drain(queue))
+
+
+async def drain(queue):
+    """Discard a bridged response nobody will send, up to its end marker."""
+    while (await queue.get())[0] != "end":
+        pass
+
+
+async def watch_disconnect(receive, aborted):
+    """Stop a streamed response early once the client disconnects."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    aborted.set()
+
+
+# --------- APP ----------
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    handler = NATIVE_ROUTES.get((scope["method"], scope["path"]))
+    if handler is not None:
+        return await handle_native(handler, scope, receive, send)
+    await handle_wsgi(bully_detector.app, scope, receive, send)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if bully_detector.MODEL_WARMUP == "lazy":
+                bully_detector.start_warmup()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            model_executor.shutdown(wait=False, cancel_futures=True)
+            wsgi_executor.shutdown(wait=False, cancel_futures=True)
+            bully_detector.report_store.flush()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+if __name__ == "__main__":
+    import uvicorn  # pip install uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 10000)))
@@ -0,0 +1,141 @@
+"""CPU inference backends for the toxicity model.
+
+Every backend is called like a transformers text-classification pipeline:
+``backend(text_or_texts, batch_size=N)`` returns one ``{"label", "score"}``
+dict per text (a one-item list for a single string).
+
+    mock       keyword stand-in, never imports torch/transformers
+    torch      fp32 PyTorch pipeline (the baseline)
+    torch-int8 same pipeline with Linear layers dynamically quantized to int8
+    onnx       model exported to ONNX and run with onnxruntime
+               (needs ``pip install onnx onnxruntime``)
+"""
+import os
+
+BACKENDS = ("mock", "torch", "torch-int8", "onnx")
+
+MOCK_TOXIC_KEYWORDS = ["hate", "stupid", "idiot", "kill", "ugly"]
+
+
+class MockPipeline:
+    """Keyword-based stand-in for the toxic-bert pipeline (SAFE MODE)."""
+
+    def __call__(self, inputs, **kwargs):
+        # Mirror the pipeline API: a single string gives a one-item list,
+        # a list of strings gives one result per string.
+        if isinstance(inputs, str):
+            return [self._classify(inputs)]
+        return [self._classify(text) for text in inputs]
+
+    def _classify(self, text):
+        # Simple keyword-based mock data for testing
+        text_lower = text.lower()
+        if any(w in text_lower for w in MOCK_TOXIC_KEYWORDS):
+            return {"label": "toxic", "score": 0.95}
+        return {"label": "neutral", "score": 0.05}
+
+
+def load_backend(name, model_name, onnx_path=None):
+    """Build the backend called ``name`` for ``model_name``."""
+    if name == "mock":
+        return MockPipeline()
+    if name == "torch":
+        from transformers import pipeline
+        return pipeline("text-classification", model=model_name)
+    if name == "torch-int8":
+        return _quantized_pipeline(model_name)
+    if name == "onnx":
+        return OnnxPipeline(model_name, onnx_path or default_onnx_path(model_name))
+    raise ValueError(f"Unknown model backend {name!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def _quantized_pipeline(model_name):
+    import torch
+    from transformers import pipeline
+
+    clf = pipeline("text-classification", model=model_name)
+    # Weights of every Linear layer become int8; activations are quantized
+    # on the fly. Tokenization and post-processing stay the pipeline's own.
+    clf.model = torch.ao.quantization.quantize_dynamic(clf.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return clf
+
+
+# --------- ONNX Runtime ----------
+def default_onnx_path(model_name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "models",
+                        model_name.replace("/", "__") + ".onnx")
+
+
+def export_onnx(model_name, path):
+    """Export ``model_name`` to an ONNX file with dynamic batch/sequence axes."""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer(["export sample text"], return_tensors="pt")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=17,
+        )
+    return path
+
+
+class OnnxPipeline:
+    """onnxruntime session with the pipeline's tokenization and top-label output."""
+
+    def __init__(self, model_name, onnx_path, threads=None):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        if not os.path.exists(onnx_path):
+            print(f"Exporting {model_name} to ONNX at {onnx_path}...")
+            export_onnx(model_name, onnx_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.environ.get("TORCH_THREADS", 0))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        config = AutoConfig.from_pretrained(model_name)
+        self.id2label = config.id2label
+        # Same rule the pipeline uses to pick its score function.
+        self.sigmoid = config.problem_type == "multi_label_classification" or config.num_labels == 1
+
+    def __call__(self, inputs, batch_size=None, **kwargs):
+        import numpy as np
+
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        batch_size = batch_size or len(texts) or 1
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(texts[start:start + batch_size], padding=True,
+                                     truncation=True, return_tensors="np")
+            logits = self.session.run(["logits"], {
+                "input_ids": encoded["input_ids"].astype(np.int64),
+                "attention_mask": encoded["attention_mask"].astype(np.int64),
+            })[0]
+            if self.sigmoid:
+                scores = 1.0 / (1.0 + np.exp(-logits))
+            else:
+                exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+                scores = exp / exp.sum(axis=1, keepdims=True)
+            for row in scores:
+                top = int(row.argmax())
+                results.append({"label": self.id2label[top], "score": float(row[top])})
+        return results
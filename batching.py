@@ -0,0 +1,135 @@
+"""Micro-batching scheduler that sits in front of the toxicity model.
+
+Concurrent callers submit single texts; a background thread groups them into
+batches (up to ``max_batch_size`` items, waiting at most ``max_wait_ms`` for
+the batch to fill) and runs one forward pass per batch.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Queue single items and run them through ``batch_fn`` in micro-batches.
+
+    ``batch_fn`` takes a list of items and returns a list of results in the
+    same order. Each submitted item gets its own result (or the exception the
+    batch raised) back through a future.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        # Stats
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+        self._batch_sizes = {}
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    def submit(self, item):
+        """Queue an item and return a Future for its result."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._ensure_worker()
+            self._pending.append((item, future, time.perf_counter()))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+            self._cond.notify()
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Submit an item and block until its result is ready."""
+        return self.submit(item).result(timeout=timeout)
+
+    def close(self):
+        """Stop the worker once the queue has drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "avg_wait_ms": round(self._wait_ms_total / self._items, 3) if self._items else 0,
+                "max_wait_ms": round(self._wait_ms_max, 3),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_limit_ms": self.max_wait * 1000.0,
+            }
+
+    # Worker thread
+
+    def _ensure_worker(self):
+        # Started lazily so a forking server starts one thread per worker.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            # Wait for the batch to fill, but never hold the oldest item
+            # longer than max_wait.
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            started = time.perf_counter()
+            self._record(batch, started)
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            results = list(results)
+            if len(results) != len(batch):
+                e = RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _record(self, batch, started):
+        with self._cond:
+            self._batches += 1
+            self._items += len(batch)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            for _, _, queued_at in batch:
+                waited_ms = (started - queued_at) * 1000.0
+                self._wait_ms_total += waited_ms
+                self._wait_ms_max = max(self._wait_ms_max, waited_ms)
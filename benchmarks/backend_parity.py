@@ -0,0 +1,130 @@
+"""Accuracy parity and latency/memory comparison of the model backends.
+
+Runs every backend over the same fixed corpus, each in its own process so
+memory numbers do not bleed into each other, and compares them with the
+fp32 ``torch`` baseline:
+
+    python benchmarks/backend_parity.py
+    python benchmarks/backend_parity.py --backends torch torch-int8 onnx --tolerance 0.05
+
+Exits non-zero if a backend's scores drift more than ``--tolerance`` from
+the baseline or its top-label agreement drops below ``--min-agreement``.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EXTRA_TEXTS = [
+    "You are an idiot and everyone hates you",
+    "I will find you and hurt you",
+    "Thanks so much for helping me move this weekend!",
+    "Nobody asked for your stupid opinion, shut up",
+    "The meeting is moved to 3pm tomorrow",
+    "You're such a genius 🙄 wow great job breaking everything",
+    "kys loser",
+    "Happy birthday! Hope you have an amazing day 🎂",
+]
+
+
+def corpus():
+    from bully_detector import SIMULATED_POSTS
+    texts = [post["content"] for posts in SIMULATED_POSTS.values() for post in posts]
+    return texts + EXTRA_TEXTS
+
+
+def rss_mib():
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend, batch_size, repeats):
+    from backends import load_backend
+    from bully_detector import MODEL_NAME, ONNX_MODEL_PATH
+
+    texts = corpus()
+    rss_before = rss_mib()
+    started = time.perf_counter()
+    model = load_backend(backend, MODEL_NAME, onnx_path=ONNX_MODEL_PATH)
+    load_seconds = time.perf_counter() - started
+
+    outputs = model(texts, batch_size=batch_size)  # warm-up, also the parity sample
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model(texts, batch_size=batch_size)
+        timings.append(time.perf_counter() - started)
+
+    print(json.dumps({
+        "backend": backend,
+        "outputs": outputs,
+        "load_seconds": load_seconds,
+        "median_seconds": statistics.median(timings),
+        "texts": len(texts),
+        "rss_mib": rss_mib(),
+        "model_rss_mib": rss_mib() - rss_before,
+    }))
+
+
+def bully_score(output):
+    # Same mapping as bully_detector._run_model.
+    return output["score"] if output["label"] == "toxic" else 0.1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.batch_size, args.repeats)
+        return
+
+    results = {}
+    for backend in dict.fromkeys(["torch"] + args.backends):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend,
+             "--batch-size", str(args.batch_size), "--repeats", str(args.repeats)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"[!] {backend}: failed\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+            continue
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    if "torch" not in results:
+        print("[!] fp32 torch baseline unavailable; nothing to compare against.")
+        sys.exit(1)
+
+    baseline = results["torch"]
+    failed = False
+    print(f"\n{'backend':<12} {'max |Δscore|':>13} {'label agree':>12} {'load s':>8} "
+          f"{'batch ms':>9} {'texts/s':>9} {'speedup':>8} {'model MiB':>10} {'peak MiB':>9}")
+    for backend, r in results.items():
+        diffs = [abs(bully_score(a) - bully_score(b)) for a, b in zip(r["outputs"], baseline["outputs"])]
+        agree = sum(a["label"] == b["label"] for a, b in zip(r["outputs"], baseline["outputs"])) / len(diffs)
+        max_diff = max(diffs)
+        ok = max_diff <= args.tolerance and agree >= args.min_agreement
+        failed = failed or not ok
+        print(f"{backend:<12} {max_diff:>13.4f} {agree:>12.2%} {r['load_seconds']:>8.2f} "
+              f"{r['median_seconds'] * 1000:>9.1f} {r['texts'] / r['median_seconds']:>9.1f} "
+              f"{baseline['median_seconds'] / r['median_seconds']:>7.2f}x {r['model_rss_mib']:>10.1f} "
+              f"{r['rss_mib']:>9.1f}{'' if ok else '  <-- parity FAILED'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Dedup rate, lookup cost and memory of the near-duplicate campaign index.
+
+Streams messages where a share are edited copies of scam campaigns (new
+amounts, phone numbers, links, emoji, shouting) and the rest are one-off
+chatter, through CampaignIndex, reporting progress as it goes:
+
+    python benchmarks/campaigns.py                          # 1M messages
+    python benchmarks/campaigns.py --messages 10000000      # the 10M run
+    python benchmarks/campaigns.py --campaign-share 0.3 --max-campaigns 200000
+    python benchmarks/campaigns.py --analyze 5000           # also time analyze_content_batch()
+
+"index MiB" is the index's own estimate (signatures, LSH buckets, LRU);
+"traced MiB" is what tracemalloc saw allocated, when --trace is given
+(slower). Both include the model score each campaign keeps for its
+near-duplicates.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from corpus import generate_corpus
+from harness import peak_rss_mib
+
+import bully_detector  # noqa: E402  (after harness sets MODEL_BACKEND=mock)
+from campaigns import CampaignIndex  # noqa: E402
+
+TEMPLATES = [post["content"] for posts in bully_detector.SIMULATED_POSTS.values() for post in posts
+             if bully_detector.detect_fraud(post["content"])["is_fraud"]]
+EMOJI = ["🎉", "🎁", "💰", "🔥", "✅", "", ""]
+WORDS = ("now today fast free win cash prize link offer deal claim hurry bank card team city "
+         "game movie lunch class notes party trip music train coffee weekend project friend").split()
+
+
+def variant(rng, template):
+    text = template
+    if rng.random() < 0.5:
+        text = "".join(str(rng.randint(0, 9)) if c.isdigit() else c for c in text)
+    if rng.random() < 0.3:
+        text = text.upper()
+    if rng.random() < 0.3:
+        text = text.replace("!", "!!")
+    return f"{text} {rng.choice(EMOJI)}{rng.choice(['', ' pls', ' now', ' ' + str(rng.randint(10, 99))])}"
+
+
+def one_off(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) + f" #{n}"
+
+
+def stream(n, seed, campaign_share, campaigns):
+    rng = random.Random(seed)
+    templates = [rng.choice(TEMPLATES) + f" ref {i}" for i in range(campaigns)]
+    for i in range(n):
+        if rng.random() < campaign_share:
+            yield variant(rng, templates[int(rng.paretovariate(1.2)) % campaigns])
+        else:
+            yield one_off(rng, i)
+
+
+def run_index(args):
+    index = CampaignIndex(threshold=args.threshold, max_campaigns=args.max_campaigns)
+    if args.trace:
+        tracemalloc.start()
+    print(f"{'messages':>12} {'msg/s':>9} {'µs/msg':>7} {'dedup':>7} {'campaigns':>10} "
+          f"{'evicted':>10} {'index MiB':>10} {'traced MiB':>11} {'RSS MiB':>8}")
+    started = time.perf_counter()
+    report_every = max(1, args.messages // 10)
+    for i, text in enumerate(stream(args.messages, args.seed, args.campaign_share, args.campaigns), 1):
+        index.assign(text)
+        if i % report_every == 0 or i == args.messages:
+            elapsed = time.perf_counter() - started
+            stats = index.stats()
+            traced = f"{tracemalloc.get_traced_memory()[0] / 2**20:.1f}" if args.trace else "-"
+            print(f"{i:>12,} {i / elapsed:>9,.0f} {elapsed / i * 1e6:>7.1f} {stats['dedup_rate']:>7.1%} "
+                  f"{stats['tracked']:>10,} {stats['evictions']:>10,} {stats['memory_bytes'] / 2**20:>10.1f} "
+                  f"{traced:>11} {peak_rss_mib():>8.0f}")
+    if args.trace:
+        tracemalloc.stop()
+    # Ideal dedup rate: every campaign copy after the first is a hit.
+    print(f"\nCampaign copies in the stream: {args.campaign_share:.0%} "
+          f"(upper bound on the dedup rate, before evictions)")
+
+
+def run_analyze(args):
+    posts = [{"content": text, "media": None}
+             for text in stream(args.analyze, args.seed, args.campaign_share, args.campaigns)]
+    posts += generate_corpus(args.analyze // 10, args.seed)
+    bully_detector.get_model()
+    print(f"\nanalyze_content_batch() over {len(posts):,} posts (batch {args.batch_size}):")
+    for enabled in (False, True):
+        bully_detector.CAMPAIGN_DETECTION = enabled
+        bully_detector.campaign_index.clear()
+        started = time.perf_counter()
+        for i in range(0, len(posts), args.batch_size):
+            bully_detector.analyze_content_batch(posts[i:i + args.batch_size], batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        reused = bully_detector.campaign_index.stats()["dedup_rate"] if enabled else 0.0
+        print(f"  CAMPAIGN_DETECTION={int(enabled)}: {len(posts) / elapsed:>9,.0f} posts/s  (dedup {reused:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--campaign-share", type=float, default=0.6, help="fraction of messages that are campaign copies")
+    parser.add_argument("--campaigns", type=int, default=2000, help="distinct campaigns in the stream")
+    parser.add_argument("--threshold", type=float, default=bully_detector.CAMPAIGN_SIMILARITY)
+    parser.add_argument("--max-campaigns", type=int, default=bully_detector.CAMPAIGN_INDEX_SIZE)
+    parser.add_argument("--trace", action="store_true", help="also report tracemalloc's view of memory")
+    parser.add_argument("--analyze", type=int, default=0, help="posts for the analyze_content_batch() comparison")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    run_index(args)
+    if args.analyze:
+        run_analyze(args)
+
+
+if __name__ == "__main__":
+    main()
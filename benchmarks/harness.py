@@ -0,0 +1,141 @@
+"""Timing, memory and baseline helpers shared by the benchmark scripts.
+
+Every script imports this module before ``bully_detector`` so the app runs
+with the keyword MockPipeline (MODEL_BACKEND=mock), no score cache and no
+campaign dedup, i.e. offline and measuring the code rather than the caches.
+"""
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MODEL_BACKEND", "mock")
+os.environ.setdefault("INFERENCE_CACHE_SIZE", "0")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, ops):
+    latencies = sorted(latencies)
+    return {
+        "ops": ops,
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 4) if latencies else 0.0,
+    }
+
+
+def measure(fn, items, warmup=20, ops_per_call=1, memory_sample=200):
+    """Call ``fn(item)`` for every item; return throughput, latency and memory stats.
+
+    Latency percentiles are per call; ``ops_per_call`` scales throughput for
+    calls that each process several items (batches, whole scans). tracemalloc
+    slows everything down, so allocation peaks come from a separate pass over
+    the first ``memory_sample`` items, not from the timed pass.
+    """
+    for item in items[:warmup]:
+        fn(item)
+    gc.collect()
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for item in items[:memory_sample]:
+        fn(item)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(latencies, elapsed, len(items) * ops_per_call)
+    result["traced_peak_kib"] = round(traced_peak / 1024, 1)
+    # Process-wide high-water mark once this stage has run.
+    result["peak_rss_mib"] = round(peak_rss_mib(), 1)
+    return result
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor() or None, "cpus": os.cpu_count()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(section, results, path=BASELINE_PATH):
+    """Store ``results`` under ``section`` (other sections are kept)."""
+    data = load_baseline(path) or {}
+    data[section] = {"environment": environment(), "results": results}
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def check_baseline(section, results, tolerance, path=BASELINE_PATH):
+    """Print a comparison with the stored baseline; return False on a regression.
+
+    A stage regresses when its throughput drops, or its p95 latency rises,
+    by more than ``tolerance`` (a fraction) relative to the baseline.
+    """
+    baseline = (load_baseline(path) or {}).get(section)
+    if baseline is None:
+        print(f"[!] No '{section}' baseline in {path}; run with --save first.")
+        return False
+    ok = True
+    print(f"\n{'stage':<28} {'ops/s':>10} {'baseline':>10} {'Δ':>8} {'p95 ms':>9} {'baseline':>9}")
+    for stage, current in results.items():
+        base = baseline["results"].get(stage)
+        if base is None:
+            print(f"{stage:<28} {current['ops_per_sec']:>10.1f} {'-':>10}  (new stage)")
+            continue
+        change = current["ops_per_sec"] / base["ops_per_sec"] - 1 if base["ops_per_sec"] else 0.0
+        slower = change < -tolerance
+        laggier = base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance)
+        ok = ok and not (slower or laggier)
+        print(f"{stage:<28} {current['ops_per_sec']:>10.1f} {base['ops_per_sec']:>10.1f} {change:>+8.1%} "
+              f"{current['p95_ms']:>9.3f} {base['p95_ms']:>9.3f}"
+              f"{'  <-- REGRESSION' if slower or laggier else ''}")
+    if baseline.get("environment") != environment():
+        print("[!] Baseline was recorded on a different environment; compare with care.")
+    return ok
+
+
+def print_table(results):
+    print(f"\n{'stage':<28} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'traced KiB':>11} {'peak RSS MiB':>13}")
+    for stage, r in results.items():
+        print(f"{stage:<28} {r['ops_per_sec']:>10.1f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+              f"{r['p99_ms']:>9.3f} {_kib(r['traced_peak_kib']):>11} {r['peak_rss_mib']:>13.1f}")
+
+
+def _kib(value):
+    return "-" if value is None else f"{value:.1f}"
@@ -0,0 +1,87 @@
+"""Throughput, latency percentiles and memory of the detection hot paths.
+
+Runs every stage over the same seeded synthetic corpus with the keyword
+MockPipeline, so it needs no network or model weights:
+
+    python benchmarks/hot_paths.py                  # print the table
+    python benchmarks/hot_paths.py --save           # record benchmarks/baseline.json
+    python benchmarks/hot_paths.py --check          # exit 1 on a regression vs the baseline
+    python benchmarks/hot_paths.py --stages detect detect_fraud --size 5000
+
+Record the baseline on the machine that runs --check; numbers from
+different hardware are not comparable.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from corpus import generate_corpus
+from harness import check_baseline, measure, print_table, save_baseline
+
+import bully_detector  # noqa: E402  (after harness sets MODEL_BACKEND=mock)
+
+
+def fresh_scan(name):
+    # Forget earlier results so every scan analyzes the whole feed.
+    bully_detector.scan_memo.clear()
+    bully_detector.reset_feeds(name)
+    return bully_detector.scan_platform(name)
+
+
+def batches(posts, size):
+    return [posts[i:i + size] for i in range(0, len(posts), size)]
+
+
+def stages(posts, batch_size):
+    texts = [p["content"] for p in posts]
+    platforms = bully_detector.PLATFORMS * 20
+    rng = np.random.default_rng(0)
+    score_batches = [(rng.random(100_000), rng.random(100_000)) for _ in range(5)]
+    return {
+        "detect": (bully_detector.detect, texts, 1),
+        "detect_fraud": (bully_detector.detect_fraud, texts, 1),
+        "detect_fake_media": (lambda p: bully_detector.detect_fake_media(p["content"], p["media"]), posts, 1),
+        "generate_polite_rewrite": (lambda t: bully_detector.generate_polite_rewrite(t, 0.9), texts, 1),
+        "analyze_content": (lambda p: bully_detector.analyze_content(p["content"], p["media"]), posts, 1),
+        "analyze_content_batch": (bully_detector.analyze_content_batch, batches(posts, batch_size), batch_size),
+        "scoring_kernel_100k": (lambda b: bully_detector.scoring_kernel.score(*b), score_batches, 100_000),
+        "build_detections": (lambda b: bully_detector._build_detections(b, [0.5] * len(b), [0.9] * len(b)),
+                             batches(texts, 256), 256),
+        "scan_platform_cold": (fresh_scan, platforms, 1),
+        "scan_platform_warm": (bully_detector.scan_platform, platforms, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000, help="posts in the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--stages", nargs="+", help="only run these stages")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="compare with the baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --check (fraction)")
+    args = parser.parse_args()
+
+    # Seed the score jitter and meme picks too.
+    bully_detector.scoring_kernel.reseed(args.seed)
+    bully_detector.get_model()
+    posts = generate_corpus(args.size, args.seed)
+
+    results = {}
+    for name, (fn, items, ops_per_call) in stages(posts, args.batch_size).items():
+        if args.stages and name not in args.stages:
+            continue
+        results[name] = measure(fn, items, ops_per_call=ops_per_call)
+    print_table(results)
+
+    if args.save:
+        save_baseline("hot_paths", results)
+        print("\n[OK] Baseline saved.")
+    if args.check and not check_baseline("hot_paths", results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""HTTP load test of the Flask routes through the test client.
+
+Drives the full request path (routing, JSON parsing, the handler and
+serialization) from several threads at once, without opening a socket:
+
+    python benchmarks/http_load.py --requests 2000 --concurrency 8
+    python benchmarks/http_load.py --save / --check
+
+Reports requests/sec, latency percentiles and status codes per route. The
+test client runs in-process, so this measures the app, not a WSGI server.
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+
+from corpus import generate_corpus
+from harness import check_baseline, peak_rss_mib, print_table, save_baseline, summarize
+
+import bully_detector  # noqa: E402  (after harness sets MODEL_BACKEND=mock)
+
+
+def scenarios(posts):
+    texts = [p["content"] for p in posts]
+    return {
+        "POST /analyze": lambda c, i: c.post("/analyze", json={"text": texts[i % len(texts)]}),
+        "POST /challenge": lambda c, i: c.post("/challenge", json={"text": texts[i % len(texts)]}),
+        "POST /api/analyze/batch": lambda c, i: c.post(
+            "/api/analyze/batch", json={"items": texts[i % len(texts):i % len(texts) + 32], "compact": True}),
+        "GET /api/platform/feed": lambda c, i: c.get("/api/platform/feed"),
+        "GET /api/cyberhub/reports": lambda c, i: c.get("/api/cyberhub/reports?limit=50"),
+    }
+
+
+def run(request_fn, total, concurrency):
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        client = bully_detector.app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            t0 = time.perf_counter()
+            response = request_fn(client, i)
+            response.get_data()
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result = summarize(latencies, time.perf_counter() - started, total)
+    result["statuses"] = {str(k): v for k, v in sorted(statuses.items())}
+    result["traced_peak_kib"] = None  # tracemalloc is not used here
+    result["peak_rss_mib"] = round(peak_rss_mib(), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--routes", nargs="+", help="only these routes, e.g. 'POST /analyze'")
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    bully_detector.get_model()
+    posts = generate_corpus(2000, args.seed)
+    results = {}
+    for route, request_fn in scenarios(posts).items():
+        if args.routes and route not in args.routes:
+            continue
+        run(request_fn, min(20, args.requests), 1)  # warm-up
+        results[route] = run(request_fn, args.requests, args.concurrency)
+    print_table(results)
+    for route, r in results.items():
+        if set(r["statuses"]) != {"200"}:
+            print(f"[!] {route}: non-200 responses {r['statuses']}")
+
+    if args.save:
+        save_baseline("http_load", results)
+        print("\n[OK] Baseline saved.")
+    if args.check and not check_baseline("http_load", results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Padding waste of arrival-order vs length-sorted batches, and chunking of long texts.
+
+Builds a corpus with a realistic chat length distribution (log-normal
+message lengths plus a tail of long group-chat pastes), then counts the
+tokens each batch is padded to when batched in arrival order and when
+sorted by length, as bully_detector._run_model does with
+LENGTH_BUCKETING=1:
+
+    python benchmarks/padding_waste.py
+    python benchmarks/padding_waste.py --tokenizer unitary/toxic-bert --time
+
+Token counts use whitespace words unless ``--tokenizer`` names a Hugging
+Face tokenizer. ``--time`` also times _run_model both ways with the
+configured MODEL_BACKEND (only meaningful with a real model; the mock does
+not pad).
+"""
+import argparse
+import random
+import time
+
+from corpus import generate_corpus
+from harness import ROOT  # noqa: F401  (sets up sys.path and the mock backend)
+
+import bully_detector  # noqa: E402
+from chunking import arrival_batches, length_sorted_batches, padding_waste, split_windows, token_spans  # noqa: E402
+
+
+def realistic_corpus(n, seed, paste_fraction=0.02):
+    rng = random.Random(seed)
+    sentences = [p["content"] for p in generate_corpus(500, seed)]
+    words = " ".join(sentences).split()
+    texts = []
+    for _ in range(n):
+        if rng.random() < paste_fraction:
+            length = rng.randint(300, 2000)  # pasted group-chat history
+        else:
+            length = max(1, int(rng.lognormvariate(2.4, 0.8)))  # median ~11 words
+        start = rng.randrange(len(words))
+        texts.append(" ".join(words[(start + i) % len(words)] for i in range(length)))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-tokens", type=int, default=bully_detector.MODEL_MAX_TOKENS)
+    parser.add_argument("--tokenizer", help="Hugging Face tokenizer name for real token counts")
+    parser.add_argument("--time", action="store_true", help="also time _run_model with and without bucketing")
+    args = parser.parse_args()
+
+    tokenizer = None
+    if args.tokenizer:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    texts = realistic_corpus(args.size, args.seed)
+    window = max(8, args.max_tokens - 8)
+    lengths, truncated, chunked = [], 0, 0
+    for text, spans in zip(texts, token_spans(texts, tokenizer)):
+        pieces = split_windows(text, spans, window, min(bully_detector.CHUNK_STRIDE, window // 2))
+        lengths.extend(length for _, length in pieces)
+        if len(pieces) > 1:
+            chunked += 1
+            truncated += len(spans) - (args.max_tokens - 2)  # special tokens take two
+
+    print(f"{len(texts):,} texts -> {len(lengths):,} pieces ({chunked:,} long texts chunked; "
+          f"{truncated:,} tokens that truncation would have dropped)")
+    print(f"\n{'strategy':<16} {'real tokens':>12} {'padded tokens':>14} {'waste':>7}")
+    for name, batcher in (("arrival order", arrival_batches), ("length sorted", length_sorted_batches)):
+        real, padded = padding_waste(lengths, batcher(lengths, args.batch_size))
+        print(f"{name:<16} {real:>12,} {padded:>14,} {1 - real / padded:>7.1%}")
+
+    if args.time:
+        bully_detector.get_model()
+        print(f"\n_run_model with backend {bully_detector.model_status['backend']}:")
+        for bucketing in (False, True):
+            bully_detector.LENGTH_BUCKETING = bucketing
+            started = time.perf_counter()
+            bully_detector._run_model(texts, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+            print(f"  LENGTH_BUCKETING={int(bucketing)}: {elapsed:.2f}s ({len(texts) / elapsed:,.0f} texts/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Polite-rewrite lexicon: the old per-phrase replace loop vs the compiled rewriter.
+
+Grows TOXIC_REWRITES with seeded made-up phrases to each lexicon size and
+rewrites the same synthetic corpus with both implementations:
+
+    python benchmarks/rewrite_lexicon.py
+    python benchmarks/rewrite_lexicon.py --sizes 25 1000 10000 50000 --size 5000
+    python benchmarks/rewrite_lexicon.py --save            # record under "rewriter" in baseline.json
+    python benchmarks/rewrite_lexicon.py --check           # exit 1 on a regression vs the baseline
+
+The loop costs one substring scan per phrase, so it grows linearly with the
+lexicon; the compiled trie walks each message once.
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+from corpus import generate_corpus
+from harness import check_baseline, measure, print_table, save_baseline
+
+import bully_detector  # noqa: E402  (after harness sets MODEL_BACKEND=mock)
+from rewriter import Rewriter  # noqa: E402
+
+
+def legacy_rewrite(lexicon, text):
+    # generate_polite_rewrite() before the compiled rewriter.
+    rewritten = text.lower()
+    changed = False
+    for toxic, polite in lexicon.items():
+        if toxic in rewritten:
+            rewritten = rewritten.replace(toxic, polite)
+            changed = True
+    return rewritten, changed
+
+
+def grow_lexicon(size, seed):
+    rng = random.Random(seed)
+    lexicon = dict(bully_detector.TOXIC_REWRITES)
+    while len(lexicon) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+                 for _ in range(rng.choice((1, 1, 1, 2)))]
+        lexicon[" ".join(words)] = "something kinder"
+    return lexicon
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=2000, help="posts in the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 1000, 10000], help="lexicon sizes")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="compare with the baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown for --check (fraction)")
+    args = parser.parse_args()
+
+    texts = [p["content"] for p in generate_corpus(args.size, args.seed)]
+    results = {}
+    for size in args.sizes:
+        lexicon = grow_lexicon(size, args.seed)
+        started = time.perf_counter()
+        rewriter = Rewriter(lexicon)
+        print(f"[OK] {size:,} phrases compiled in {(time.perf_counter() - started) * 1000:.1f} ms "
+              f"({len(rewriter.pattern.pattern):,} chars of regex)")
+        results[f"legacy_loop[{size}]"] = measure(lambda t: legacy_rewrite(lexicon, t), texts)
+        results[f"compiled[{size}]"] = measure(rewriter.rewrite, texts)
+    print_table(results)
+
+    for size in args.sizes:
+        legacy, compiled = results[f"legacy_loop[{size}]"], results[f"compiled[{size}]"]
+        print(f"{size:>7,} phrases: compiled is {compiled['ops_per_sec'] / legacy['ops_per_sec']:.1f}x the loop")
+
+    if args.save:
+        save_baseline("rewriter", results)
+        print("\n[OK] Baseline saved.")
+    if args.check and not check_baseline("rewriter", results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
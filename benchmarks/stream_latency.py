@@ -0,0 +1,66 @@
+"""Time-to-first-result vs whole-response time for the platform scan endpoints.
+
+Forces a fresh analysis of every feed before each run, then requests
+/api/platform/feed as one JSON document and as an NDJSON stream through the
+Flask test client:
+
+    python benchmarks/stream_latency.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MODEL_BACKEND", "mock")
+os.environ.setdefault("INFERENCE_CACHE_SIZE", "0")
+
+import bully_detector  # noqa: E402
+
+
+def fresh():
+    bully_detector.scan_memo.clear()
+    bully_detector.reset_feeds()
+
+
+def whole_response(client):
+    started = time.perf_counter()
+    response = client.get("/api/platform/feed")
+    response.get_data()
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+def streamed(client, stream):
+    started = time.perf_counter()
+    response = client.get(f"/api/platform/feed?stream={stream}", buffered=False)
+    first = None
+    for _ in response.response:
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    client = bully_detector.app.test_client()
+    modes = {"json": whole_response, "ndjson": lambda c: streamed(c, "ndjson"),
+             "sse": lambda c: streamed(c, "sse")}
+    print(f"{'mode':<8} {'first result ms':>16} {'total ms':>10}")
+    for name, run in modes.items():
+        firsts, totals = [], []
+        for _ in range(args.runs):
+            fresh()
+            first, total = run(client)
+            firsts.append(first * 1000)
+            totals.append(total * 1000)
+        print(f"{name:<8} {statistics.median(firsts):>16.2f} {statistics.median(totals):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memory-per-worker benchmark for the gunicorn deployment (Linux only).
+
+Starts gunicorn with ``gunicorn.conf.py`` once with the model preloaded in
+the master and once with every worker loading its own copy, waits until
+every worker answers /readyz, then reads /proc/<pid>/smaps_rollup for the
+master and each worker:
+
+    python benchmarks/worker_memory.py --workers 4
+
+RSS counts shared pages in every process; PSS splits them between the
+processes sharing them, so the PSS total is the real footprint.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_smaps(pid):
+    """Return {"rss", "pss", "uss"} in MiB for a process."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss": fields.get("Rss", 0) / 1024,
+        "pss": fields.get("Pss", 0) / 1024,
+        "uss": uss / 1024,
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_ready(port, workers, timeout):
+    # Each worker loads lazily-started pieces on its own, so probe a few
+    # times per worker before measuring.
+    deadline = time.time() + timeout
+    ready = 0
+    while time.time() < deadline and ready < workers * 3:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=5) as r:
+                ready += r.status == 200
+        except Exception:
+            time.sleep(0.5)
+    return ready >= workers * 3
+
+
+def measure(preload, workers, port, timeout):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers),
+               PRELOAD_APP="1" if preload else "0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "bully_detector:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_ready(port, workers, timeout):
+            raise RuntimeError("gunicorn did not become ready in time")
+        master = read_smaps(proc.pid)
+        worker_stats = [read_smaps(pid) for pid in children(proc.pid)]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=30)
+    return master, worker_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'process':<10} {'RSS MiB':>10} {'PSS MiB':>10} {'USS MiB':>10}")
+    for preload in (True, False):
+        mode = "preload" if preload else "per-worker"
+        master, worker_stats = measure(preload, args.workers, args.port, args.timeout)
+        print(f"{mode:<10} {'master':<10} {master['rss']:>10.1f} {master['pss']:>10.1f} {master['uss']:>10.1f}")
+        for i, w in enumerate(worker_stats):
+            print(f"{mode:<10} {'worker ' + str(i):<10} {w['rss']:>10.1f} {w['pss']:>10.1f} {w['uss']:>10.1f}")
+        total_pss = master["pss"] + sum(w["pss"] for w in worker_stats)
+        per_worker = sum(w["uss"] for w in worker_stats) / max(1, len(worker_stats))
+        print(f"{mode:<10} {'TOTAL':<10} {'':>10} {total_pss:>10.1f} {'':>10}   "
+              f"(private per worker: {per_worker:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
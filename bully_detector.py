@@ -1,11 +1,38 @@
-from flask import Flask, request, jsonify, render_template, session
-from transformers import pipeline
-import numpy as np
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import nullcontext
+
+from flask import Flask, Response, g, request, jsonify, render_template, session, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import re
 import os
-import random
+import atexit
+import hashlib
+import threading
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
+from itertools import islice
+
+from backends import MOCK_TOXIC_KEYWORDS, MockPipeline, load_backend
+from batching import MicroBatcher
+from campaigns import CampaignIndex
+from chunking import (arrival_batches, combine, estimate_tokens, length_sorted_batches, may_overflow,
+                      split_windows, token_spans)
+from feeds import JsonlFeedSource, ListFeedSource, WatermarkStore
+from inference_cache import InferenceCache
+from inference_pool import InferencePool, InferencePoolFull, InferencePoolUnavailable
+from matchers import PatternMatcher
+from metrics import Profiler, Registry, timed
+from offenders import OffenderIndex
+from prescreen import PreScreen
+from rewriter import LexiconRewriter
+from report_exporter import ReportExporter
+from report_store import FILTERS as REPORT_FILTERS, InvalidCursor, open_report_store
+from scan_memo import ScanMemo, post_key
+from scoring import ScoringKernel, pick
 
 # --------- FLASK APP ----------
 app = Flask(__name__,
@@ -13,25 +40,239 @@ app = Flask(__name__,
             static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.secret_key = "cybershield-dextrix-secret-2025"
 
+# --------- METRICS ----------
+# Timing hooks around each detection stage and every route, exposed on
+# /metrics. PROFILE_SAMPLE_RATE > 0 also cProfiles that fraction of requests
+# (merged report on /metrics/profile).
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+
+metrics_registry = Registry()
+STAGE_SECONDS = metrics_registry.histogram(
+    "bully_stage_seconds", "Seconds spent in each detection stage (stages may nest).", ["stage"])
+REQUEST_SECONDS = metrics_registry.histogram(
+    "bully_http_request_duration_seconds", "Seconds to produce each HTTP response.", ["route", "method"])
+REQUESTS_TOTAL = metrics_registry.counter(
+    "bully_http_requests_total", "HTTP requests served.", ["route", "method", "status"])
+REPORTS_SUBMITTED = metrics_registry.counter(
+    "bully_reports_submitted_total", "Cyber Hub reports filed by this process.", ["priority"])
+profiler = Profiler(PROFILE_SAMPLE_RATE)
+
+
+def stage(name):
+    """Decorator timing a function as detection stage ``name``."""
+    return timed(STAGE_SECONDS, name, enabled=METRICS_ENABLED)
+
+
+def stage_timer(name):
+    """Context manager timing a block as detection stage ``name``."""
+    return STAGE_SECONDS.time(name) if METRICS_ENABLED else nullcontext()
+
+
+def record_request(route, method, status, seconds):
+    if METRICS_ENABLED:
+        REQUEST_SECONDS.observe(seconds, route, method)
+        REQUESTS_TOTAL.inc(1, route, method, str(status))
+
+
+class _TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        with stage_timer("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+if METRICS_ENABLED:
+    app.json = _TimedJSONProvider(app)
+
 # --------- MODELS ----------
-print("Loading toxic-bert model...")
-try:
-    bully_detector = pipeline("text-classification", model="unitary/toxic-bert")
-    print("[OK] Model loaded!")
-except Exception as e:
-    print(f"[!] Model loading failed: {e}")
-    print("[!] Running in SAFE MODE with mock detection.")
-    # Fallback to mock if loading fails
-    class MockPipeline:
-        def __call__(self, text):
-            # Simple keyword-based mock data for testing
-            text_lower = text.lower()
-            if any(w in text_lower for w in ["hate", "stupid", "idiot", "kill", "ugly"]):
-                return [{"label": "toxic", "score": 0.95}]
-            return [{"label": "neutral", "score": 0.05}]
-            
-    bully_detector = MockPipeline()
-    
+MODEL_NAME = "unitary/toxic-bert"
+
+# "auto" loads the fp32 torch model and falls back to MockPipeline if that
+# fails. "torch", "torch-int8" and "onnx" require that backend (see
+# backends.py); "mock" never touches torch/transformers.
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "auto")
+ONNX_MODEL_PATH = os.environ.get("ONNX_MODEL_PATH")
+
+# "lazy" loads on first use, "background" starts a warm-up thread at import,
+# "eager" loads during import (the old behaviour).
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "lazy")
+
+# Number of texts sent through the model per forward pass by the batched API.
+INFERENCE_BATCH_SIZE = int(os.environ.get("INFERENCE_BATCH_SIZE", 16))
+
+# Most items accepted by one /api/analyze/batch request (more -> HTTP 413).
+ANALYZE_BATCH_MAX = int(os.environ.get("ANALYZE_BATCH_MAX", 1000))
+
+# Texts longer than MODEL_MAX_TOKENS are scored as overlapping windows
+# (CHUNK_STRIDE tokens of overlap) combined by CHUNK_COMBINE (max, mean or
+# softmax). LENGTH_BUCKETING sorts texts by length before batching so each
+# batch pads as little as possible.
+MODEL_MAX_TOKENS = int(os.environ.get("MODEL_MAX_TOKENS", 512))
+CHUNK_STRIDE = int(os.environ.get("CHUNK_STRIDE", 64))
+CHUNK_COMBINE = os.environ.get("CHUNK_COMBINE", "max")
+LENGTH_BUCKETING = os.environ.get("LENGTH_BUCKETING", "1") == "1"
+
+# Micro-batching of concurrent single-text requests (/analyze, /challenge).
+MICROBATCH_ENABLED = os.environ.get("MICROBATCH_ENABLED", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", INFERENCE_BATCH_SIZE))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", 5))
+
+# "inline" runs the model inside the web worker; "pool" hands it to a fixed
+# pool of model-owning processes with a bounded queue (full -> HTTP 429).
+INFERENCE_MODE = os.environ.get("INFERENCE_MODE", "inline")
+INFERENCE_POOL_PROCESSES = int(os.environ.get("INFERENCE_POOL_PROCESSES", 2))
+INFERENCE_POOL_MAX_PENDING = int(os.environ.get("INFERENCE_POOL_MAX_PENDING", 64))
+INFERENCE_POOL_TIMEOUT = float(os.environ.get("INFERENCE_POOL_TIMEOUT", 30))
+
+# Cache of model scores keyed on the normalized text (0 entries disables the
+# memory tier; set INFERENCE_CACHE_PATH to add a restart-safe disk tier,
+# capped at INFERENCE_CACHE_DISK_MAX rows).
+INFERENCE_CACHE_SIZE = int(os.environ.get("INFERENCE_CACHE_SIZE", 10000))
+INFERENCE_CACHE_TTL = float(os.environ.get("INFERENCE_CACHE_TTL", 3600))
+INFERENCE_CACHE_PATH = os.environ.get("INFERENCE_CACHE_PATH")
+INFERENCE_CACHE_DISK_MAX = int(os.environ.get("INFERENCE_CACHE_DISK_MAX", 1000000))
+
+# Tiered evaluation: a keyword/regex screen decides whether a text needs the
+# model at all. Texts below PRESCREEN_THRESHOLD confidence escalate.
+PRESCREEN_ENABLED = os.environ.get("PRESCREEN_ENABLED", "0") == "1"
+PRESCREEN_THRESHOLD = float(os.environ.get("PRESCREEN_THRESHOLD", 0.85))
+
+# Post-model scoring. SCORING_SEED makes the jitter and meme/hint picks
+# reproducible; SCORING_NOISE=0 drops the jitter so identical inputs always
+# score identically (and cache cleanly).
+SCORING_SEED = os.environ.get("SCORING_SEED")
+SCORING_NOISE = os.environ.get("SCORING_NOISE", "1") == "1"
+scoring_kernel = ScoringKernel(seed=int(SCORING_SEED) if SCORING_SEED else None, noise=SCORING_NOISE)
+
+_model = None
+_model_lock = threading.Lock()
+model_status = {
+    "state": "not_loaded",  # not_loaded -> loading -> ready | failed
+    "backend": None,
+    "import_seconds": None,
+    "load_seconds": None,
+    "error": None,
+}
+
+
+def load_model():
+    """Load the toxicity model once (thread-safe) and return it."""
+    global _model
+    if _model is not None:
+        return _model
+    with _model_lock:
+        if _model is not None:
+            return _model
+        model_status["state"] = "loading"
+        started = time.perf_counter()
+        try:
+            backend, model = _build_model()
+        except Exception as e:
+            model_status.update(state="failed", error=str(e))
+            raise
+        model_status.update(
+            state="ready",
+            backend=backend,
+            load_seconds=round(time.perf_counter() - started, 3),
+        )
+        print(f"[OK] {model_status['backend']} ready in {model_status['load_seconds']}s "
+              f"(module import took {model_status['import_seconds']}s)")
+        if inference_cache is not None:
+            # Scores from the mock and the real model must never mix.
+            inference_cache.namespace = f"{MODEL_NAME}:{backend}"
+        _instrument_pipeline(model)
+        _model = model
+        return model
+
+
+def _build_model():
+    """Return ``(backend name, model)`` for the configured MODEL_BACKEND."""
+    if MODEL_BACKEND == "mock":
+        print("[!] Running in SAFE MODE with mock detection.")
+        return "mock", MockPipeline()
+
+    backend = "torch" if MODEL_BACKEND == "auto" else MODEL_BACKEND
+    print(f"Loading toxic-bert model ({backend} backend)...")
+    try:
+        # torch/transformers are imported in here so importing this module stays cheap.
+        model = load_backend(backend, MODEL_NAME, onnx_path=ONNX_MODEL_PATH)
+        print("[OK] Model loaded!")
+        return backend, model
+    except Exception as e:
+        if MODEL_BACKEND != "auto":
+            raise
+        print(f"[!] Model loading failed: {e}")
+        print("[!] Running in SAFE MODE with mock detection.")
+        # Fallback to mock if loading fails
+        return "mock", MockPipeline()
+
+
+def _instrument_pipeline(model):
+    """Time a transformers pipeline's tokenization, forward pass and post-processing separately."""
+    for attr, name in (("preprocess", "tokenize"), ("_forward", "forward"), ("postprocess", "postprocess")):
+        method = getattr(model, attr, None)
+        if method is not None:
+            setattr(model, attr, stage(name)(method))
+
+
+def get_model():
+    """Return the toxicity model, loading it on first use."""
+    return _model if _model is not None else load_model()
+
+
+def model_ready():
+    return _model is not None
+
+
+def start_warmup():
+    """Load the model on a background thread so the app can serve health checks."""
+    thread = threading.Thread(target=_warmup, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _warmup():
+    try:
+        load_model()
+    except Exception as e:
+        print(f"[!] Model warm-up failed: {e}")
+
+
+def __getattr__(name):
+    # ``bully_detector.bully_detector`` used to be the pipeline built at
+    # import time; keep it working by loading on access.
+    if name == "bully_detector":
+        return get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+inference_pool = None
+if INFERENCE_MODE == "pool":
+    inference_pool = InferencePool(
+        target="bully_detector:_run_model",
+        processes=INFERENCE_POOL_PROCESSES,
+        max_pending=INFERENCE_POOL_MAX_PENDING,
+        warmup="bully_detector:load_model",
+        torch_threads=int(os.environ.get("TORCH_THREADS", 1)),
+    )
+
+# In pool mode this process never loads a model, so it cannot tell which
+# backend produced a score (a worker may have fallen back to mock). Such
+# scores stay in memory instead of outliving the process on disk.
+if INFERENCE_CACHE_PATH and inference_pool is not None:
+    print("[!] INFERENCE_CACHE_PATH ignored in pool mode; caching scores in memory only")
+    INFERENCE_CACHE_PATH = None
+
+inference_cache = None
+if INFERENCE_CACHE_SIZE > 0 or INFERENCE_CACHE_PATH:
+    inference_cache = InferenceCache(
+        max_entries=INFERENCE_CACHE_SIZE,
+        ttl_seconds=INFERENCE_CACHE_TTL,
+        disk_path=INFERENCE_CACHE_PATH,
+        disk_max_entries=INFERENCE_CACHE_DISK_MAX,
+        namespace=f"{MODEL_NAME}:{MODEL_BACKEND}",
+    )
+
 
 
 # --------- MEME RESPONSES ----------
@@ -104,6 +345,14 @@ TOXIC_REWRITES = {
     "moron": "someone who made a mistake",
 }
 
+# Extra rewrites (JSON object or "phrase<TAB>replacement" lines) merged over
+# TOXIC_REWRITES; the file is re-read when it changes, checked at most every
+# REWRITE_LEXICON_CHECK_SECONDS.
+REWRITE_LEXICON_PATH = os.environ.get("REWRITE_LEXICON_PATH")
+REWRITE_LEXICON_CHECK_SECONDS = float(os.environ.get("REWRITE_LEXICON_CHECK_SECONDS", 2))
+polite_rewriter = LexiconRewriter(TOXIC_REWRITES, path=REWRITE_LEXICON_PATH,
+                                  check_interval=REWRITE_LEXICON_CHECK_SECONDS)
+
 POLITE_TEMPLATES = [
     "I think {rewrite}. Let's work on it together. 🤝",
     "Hey, maybe {rewrite}. We can all grow! 🌱",
@@ -149,53 +398,150 @@ FAKE_MEDIA_INDICATORS = [
     r'(?i)(unverified|unconfirmed|rumor|false\s+(?:claim|news|info))',
 ]
 
+FRAUD_MATCHER = PatternMatcher(FRAUD_PATTERNS)
+FAKE_MEDIA_MATCHER = PatternMatcher(FAKE_MEDIA_INDICATORS)
+
+prescreen = None
+if PRESCREEN_ENABLED:
+    prescreen = PreScreen(
+        lexicon=list(TOXIC_REWRITES) + MOCK_TOXIC_KEYWORDS,
+        fraud_matcher=FRAUD_MATCHER,
+        fake_matcher=FAKE_MEDIA_MATCHER,
+        threshold=PRESCREEN_THRESHOLD,
+    )
+
 # --------- SIMULATED SOCIAL MEDIA POSTS ----------
 SIMULATED_POSTS = {
     "whatsapp": [
-        {"user": "Unknown +91-XXX", "content": "Congratulations! You won ₹50,000! Click here to claim: bit.ly/win-now 🎉", "type": "message", "media": None},
-        {"user": "Group: College Friends", "content": "You're so useless, just leave the group nobody wants you here 😂", "type": "group_message", "media": None},
-        {"user": "Unknown +44-XXX", "content": "URGENT: Your bank account will be blocked. Send OTP to verify: 1800-XXX-XXX", "type": "message", "media": None},
-        {"user": "Riya 💕", "content": "Hey! Great work on the project today. Really proud of you! 🌟", "type": "message", "media": None},
-        {"user": "Group: School Batch", "content": "Look at this deepfake video of our teacher 💀💀 so funny", "type": "group_message", "media": "video_attachment"},
-        {"user": "Unknown +1-XXX", "content": "Work from home and earn $5000/day! Guaranteed returns, invest now!", "type": "message", "media": None},
-        {"user": "Brother", "content": "Come home for dinner, mom made your favorite 🍲", "type": "message", "media": None},
-        {"user": "Unknown +91-XXX", "content": "I have your private photos. Send ₹10,000 or I will share them everywhere.", "type": "message", "media": None},
+        {"id": "whatsapp-1", "user": "Unknown +91-XXX", "content": "Congratulations! You won ₹50,000! Click here to claim: bit.ly/win-now 🎉", "type": "message", "media": None},
+        {"id": "whatsapp-2", "user": "Group: College Friends", "content": "You're so useless, just leave the group nobody wants you here 😂", "type": "group_message", "media": None},
+        {"id": "whatsapp-3", "user": "Unknown +44-XXX", "content": "URGENT: Your bank account will be blocked. Send OTP to verify: 1800-XXX-XXX", "type": "message", "media": None},
+        {"id": "whatsapp-4", "user": "Riya 💕", "content": "Hey! Great work on the project today. Really proud of you! 🌟", "type": "message", "media": None},
+        {"id": "whatsapp-5", "user": "Group: School Batch", "content": "Look at this deepfake video of our teacher 💀💀 so funny", "type": "group_message", "media": "video_attachment"},
+        {"id": "whatsapp-6", "user": "Unknown +1-XXX", "content": "Work from home and earn $5000/day! Guaranteed returns, invest now!", "type": "message", "media": None},
+        {"id": "whatsapp-7", "user": "Brother", "content": "Come home for dinner, mom made your favorite 🍲", "type": "message", "media": None},
+        {"id": "whatsapp-8", "user": "Unknown +91-XXX", "content": "I have your private photos. Send ₹10,000 or I will share them everywhere.", "type": "message", "media": None},
     ],
     "instagram": [
-        {"user": "@toxic_troll_42", "content": "You're the ugliest person I've ever seen. Delete your account loser 🗑️", "type": "comment", "media": None},
-        {"user": "@crypto_king_real", "content": "DM me for FREE BITCOIN! I turned $100 into $50,000 in just 1 week! 🚀💰", "type": "dm", "media": "image_proof"},
-        {"user": "@bestie_forever", "content": "You look amazing in this photo! Keep shining ✨💫", "type": "comment", "media": None},
-        {"user": "@news_breaker_x", "content": "BREAKING: This AI-generated video shows politician doing [fake activity]. Share before it gets deleted!", "type": "story_reply", "media": "fake_video"},
-        {"user": "@anon_hater", "content": "Everyone in your school thinks you're pathetic. Just give up already 💀", "type": "dm", "media": None},
-        {"user": "@free_gifts_2025", "content": "🎁 FREE iPhone 16! Just follow, like, and send your address + card details to claim!", "type": "comment", "media": None},
-        {"user": "@classmate_raj", "content": "Great presentation today! You really nailed the delivery 👏", "type": "comment", "media": None},
-        {"user": "@fake_celeb_acc", "content": "I'm giving away $10,000 to my followers! Send $50 processing fee to claim!", "type": "dm", "media": None},
+        {"id": "instagram-1", "user": "@toxic_troll_42", "content": "You're the ugliest person I've ever seen. Delete your account loser 🗑️", "type": "comment", "media": None},
+        {"id": "instagram-2", "user": "@crypto_king_real", "content": "DM me for FREE BITCOIN! I turned $100 into $50,000 in just 1 week! 🚀💰", "type": "dm", "media": "image_proof"},
+        {"id": "instagram-3", "user": "@bestie_forever", "content": "You look amazing in this photo! Keep shining ✨💫", "type": "comment", "media": None},
+        {"id": "instagram-4", "user": "@news_breaker_x", "content": "BREAKING: This AI-generated video shows politician doing [fake activity]. Share before it gets deleted!", "type": "story_reply", "media": "fake_video"},
+        {"id": "instagram-5", "user": "@anon_hater", "content": "Everyone in your school thinks you're pathetic. Just give up already 💀", "type": "dm", "media": None},
+        {"id": "instagram-6", "user": "@free_gifts_2025", "content": "🎁 FREE iPhone 16! Just follow, like, and send your address + card details to claim!", "type": "comment", "media": None},
+        {"id": "instagram-7", "user": "@classmate_raj", "content": "Great presentation today! You really nailed the delivery 👏", "type": "comment", "media": None},
+        {"id": "instagram-8", "user": "@fake_celeb_acc", "content": "I'm giving away $10,000 to my followers! Send $50 processing fee to claim!", "type": "dm", "media": None},
     ],
     "twitter": [
-        {"user": "@hate_spreader", "content": "People like you don't deserve to exist. The world would be better without you.", "type": "reply", "media": None},
-        {"user": "@tech_daily", "content": "Great thread on AI safety! We need more conversations like this 🤖", "type": "mention", "media": None},
-        {"user": "@scam_lottery", "content": "You've been selected as our WINNER! DM us with your bank details to receive $100,000! 🎰", "type": "dm", "media": None},
-        {"user": "@misinfo_bot", "content": "This manipulated video proves the conspiracy! Don't believe mainstream media. SHARE NOW!", "type": "tweet", "media": "manipulated_video"},
-        {"user": "@school_bully99", "content": "Lmao look at this loser trying to be smart 😂😂 you're so dumb it hurts", "type": "reply", "media": None},
-        {"user": "@supportive_ally", "content": "Your art is incredible! Don't listen to the haters, keep creating 🎨💪", "type": "reply", "media": None},
-        {"user": "@phishing_link", "content": "Your Twitter account has been compromised! Verify now: twiter-security.fake.com/verify", "type": "dm", "media": None},
-        {"user": "@troll_army", "content": "This is the worst take I've ever seen. You should be ashamed. Disgusting human being.", "type": "reply", "media": None},
+        {"id": "twitter-1", "user": "@hate_spreader", "content": "People like you don't deserve to exist. The world would be better without you.", "type": "reply", "media": None},
+        {"id": "twitter-2", "user": "@tech_daily", "content": "Great thread on AI safety! We need more conversations like this 🤖", "type": "mention", "media": None},
+        {"id": "twitter-3", "user": "@scam_lottery", "content": "You've been selected as our WINNER! DM us with your bank details to receive $100,000! 🎰", "type": "dm", "media": None},
+        {"id": "twitter-4", "user": "@misinfo_bot", "content": "This manipulated video proves the conspiracy! Don't believe mainstream media. SHARE NOW!", "type": "tweet", "media": "manipulated_video"},
+        {"id": "twitter-5", "user": "@school_bully99", "content": "Lmao look at this loser trying to be smart 😂😂 you're so dumb it hurts", "type": "reply", "media": None},
+        {"id": "twitter-6", "user": "@supportive_ally", "content": "Your art is incredible! Don't listen to the haters, keep creating 🎨💪", "type": "reply", "media": None},
+        {"id": "twitter-7", "user": "@phishing_link", "content": "Your Twitter account has been compromised! Verify now: twiter-security.fake.com/verify", "type": "dm", "media": None},
+        {"id": "twitter-8", "user": "@troll_army", "content": "This is the worst take I've ever seen. You should be ashamed. Disgusting human being.", "type": "reply", "media": None},
     ],
 }
 
-# --------- CYBER HUB REPORTS (in-memory store) ----------
-cyberhub_reports = []
+# --------- CYBER HUB REPORTS ----------
+# "memory" keeps reports in this process only; "sqlite" persists them to
+# REPORT_DB_PATH, shared by every worker on the host.
+REPORT_STORE = os.environ.get("REPORT_STORE", "memory")
+REPORT_DB_PATH = os.environ.get("REPORT_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cyberhub_reports.db"))
+
+report_store = open_report_store(REPORT_STORE, REPORT_DB_PATH)
+# Write out buffered reports when the worker exits.
+atexit.register(report_store.close)
+
+# Write-behind forwarding of every report to an external case-management
+# endpoint (see report_exporter.py); off unless REPORT_EXPORT_URL is set.
+# Reports the sink cannot take right now wait in REPORT_EXPORT_JOURNAL.
+REPORT_EXPORT_URL = os.environ.get("REPORT_EXPORT_URL")
+REPORT_EXPORT_TOKEN = os.environ.get("REPORT_EXPORT_TOKEN")
+REPORT_EXPORT_JOURNAL = os.environ.get("REPORT_EXPORT_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cyberhub_export_journal.jsonl"))
+REPORT_EXPORT_QUEUE = int(os.environ.get("REPORT_EXPORT_QUEUE", 10000))
+REPORT_EXPORT_BATCH = int(os.environ.get("REPORT_EXPORT_BATCH", 100))
+REPORT_EXPORT_INTERVAL = float(os.environ.get("REPORT_EXPORT_INTERVAL", 1.0))
+REPORT_EXPORT_TIMEOUT = float(os.environ.get("REPORT_EXPORT_TIMEOUT", 5.0))
+REPORT_EXPORT_RETRIES = int(os.environ.get("REPORT_EXPORT_RETRIES", 5))
+
+report_exporter = None
+if REPORT_EXPORT_URL:
+    report_exporter = ReportExporter(
+        REPORT_EXPORT_URL,
+        journal_path=REPORT_EXPORT_JOURNAL,
+        max_queue=REPORT_EXPORT_QUEUE,
+        batch_size=REPORT_EXPORT_BATCH,
+        flush_interval=REPORT_EXPORT_INTERVAL,
+        timeout=REPORT_EXPORT_TIMEOUT,
+        max_retries=REPORT_EXPORT_RETRIES,
+        headers={"Authorization": f"Bearer {REPORT_EXPORT_TOKEN}"} if REPORT_EXPORT_TOKEN else None,
+    )
+    # Hand queued reports to the sink (or the journal) on a clean shutdown.
+    atexit.register(report_exporter.close)
+    print(f"[OK] Exporting Cyber Hub reports to {REPORT_EXPORT_URL}")
+
+# Page size bounds for /api/cyberhub/reports.
+REPORTS_PAGE_SIZE = int(os.environ.get("REPORTS_PAGE_SIZE", 50))
+REPORTS_PAGE_MAX = int(os.environ.get("REPORTS_PAGE_MAX", 500))
+
+# --------- REPEAT OFFENDERS ----------
+# Per-(platform, user) history of risky posts, used to escalate repeat
+# offenders in decide_action(). OFFENDER_INDEX_SIZE caps the users tracked.
+OFFENDER_TRACKING = os.environ.get("OFFENDER_TRACKING", "1") == "1"
+OFFENDER_INDEX_SIZE = int(os.environ.get("OFFENDER_INDEX_SIZE", 100000))
+OFFENDER_WINDOW_SECONDS = float(os.environ.get("OFFENDER_WINDOW_SECONDS", 3600))
+OFFENDER_HALF_LIFE_SECONDS = float(os.environ.get("OFFENDER_HALF_LIFE_SECONDS", 3600))
+
+# (from action, to action, history field, threshold): escalate when the
+# user's history reaches the threshold. Checked in order, so a post can
+# climb more than one step.
+ESCALATION_RULES = [
+    ("flag", "block", "window_hits", int(os.environ.get("OFFENDER_FLAG_TO_BLOCK_HITS", 5))),
+    ("block", "report_to_cyberhub", "score", float(os.environ.get("OFFENDER_BLOCK_TO_REPORT_SCORE", 4.0))),
+]
+
+# Largest k accepted by /api/offenders/top.
+OFFENDERS_TOP_MAX = int(os.environ.get("OFFENDERS_TOP_MAX", 1000))
+
+offender_index = OffenderIndex(
+    max_users=OFFENDER_INDEX_SIZE,
+    window_seconds=OFFENDER_WINDOW_SECONDS,
+    half_life_seconds=OFFENDER_HALF_LIFE_SECONDS,
+)
+
+# --------- SCAM CAMPAIGNS ----------
+# Near-duplicate index (MinHash LSH, see campaigns.py), off by default: a
+# post at least CAMPAIGN_SIMILARITY similar to an earlier one reuses that
+# post's model score (everything else is still computed per post) and
+# carries its campaign id. CAMPAIGN_INDEX_SIZE caps the campaigns kept;
+# texts shorter than CAMPAIGN_MIN_CHARS are always scored on their own.
+CAMPAIGN_DETECTION = os.environ.get("CAMPAIGN_DETECTION", "0") == "1"
+CAMPAIGN_SIMILARITY = float(os.environ.get("CAMPAIGN_SIMILARITY", 0.8))
+CAMPAIGN_INDEX_SIZE = int(os.environ.get("CAMPAIGN_INDEX_SIZE", 100000))
+CAMPAIGN_MIN_CHARS = int(os.environ.get("CAMPAIGN_MIN_CHARS", 24))
+
+# Largest k accepted by /api/campaigns/top.
+CAMPAIGNS_TOP_MAX = int(os.environ.get("CAMPAIGNS_TOP_MAX", 1000))
+
+campaign_index = CampaignIndex(
+    threshold=CAMPAIGN_SIMILARITY,
+    max_campaigns=CAMPAIGN_INDEX_SIZE,
+    min_chars=CAMPAIGN_MIN_CHARS,
+)
+campaign_counters = {"reused": 0}
 
 # --------- FRAUD DETECTION ----------
+@stage("fraud")
 def detect_fraud(text):
     """Detect fraud/scam patterns in text."""
     fraud_score = 0.0
     matched_patterns = []
 
-    for pattern in FRAUD_PATTERNS:
-        if re.search(pattern, text):
-            fraud_score += 0.25
-            matched_patterns.append(re.search(pattern, text).group(0))
+    for match in FRAUD_MATCHER.matches(text):
+        fraud_score += 0.25
+        matched_patterns.append(match)
 
     fraud_score = min(fraud_score, 1.0)
     return {
@@ -205,15 +551,15 @@ def detect_fraud(text):
     }
 
 # --------- FAKE MEDIA DETECTION ----------
+@stage("fake_media")
 def detect_fake_media(text, media_type=None):
     """Detect fake/manipulated media indicators."""
     fake_score = 0.0
     indicators = []
 
-    for pattern in FAKE_MEDIA_INDICATORS:
-        if re.search(pattern, text):
-            fake_score += 0.3
-            indicators.append(re.search(pattern, text).group(0))
+    for match in FAKE_MEDIA_MATCHER.matches(text):
+        fake_score += 0.3
+        indicators.append(match)
 
     # Boost if media attachment is present with suspicious keywords
     if media_type and media_type in ['video_attachment', 'fake_video', 'manipulated_video', 'image_proof']:
@@ -230,8 +576,15 @@ def detect_fake_media(text, media_type=None):
 # --------- EXTENDED CONTENT ANALYSIS ----------
 def analyze_content(text, media_type=None):
     """Full content analysis: toxicity + fraud + fake media."""
+    match = _campaign_match(text, media_type)
+    bully_score = _campaign_score(match, media_type, text)
+    reused = bully_score is not None
+    if not reused:
+        bully_score = _toxicity_scores([text], scheduled=True)[0]
+        _remember_score(match, media_type, text, bully_score)
+
     # Run existing toxicity detection
-    toxicity_result = detect(text)
+    toxicity_result = _build_detection(text, _sarcasm_score(text), bully_score)
 
     # Run fraud detection
     fraud_result = detect_fraud(text)
@@ -239,6 +592,106 @@ def analyze_content(text, media_type=None):
     # Run fake media detection
     fake_result = detect_fake_media(text, media_type)
 
+    analysis = _combine_analysis(toxicity_result, fraud_result, fake_result)
+    return _with_campaign(analysis, match, reused=reused)
+
+
+def analyze_content_batch(posts, batch_size=None, signals=None):
+    """Batched analyze_content() over posts ({"content", "media"} dicts).
+
+    The toxicity model runs in batches of ``batch_size`` texts; results are
+    returned in the same order as ``posts``. ``signals`` are precomputed
+    content_signals() for the posts (e.g. from a process pool). Near-
+    duplicates of an earlier post (one scam campaign) reuse its model score.
+    """
+    posts = list(posts)
+    if signals is None:
+        signals = content_signals(posts)
+    matches = [_campaign_match(post["content"], post.get("media")) for post in posts]
+    bully_scores = [None] * len(posts)
+    fresh, followers, leaders = [], [], {}
+    for i, (post, match) in enumerate(zip(posts, matches)):
+        campaign = _reusable_campaign(match, post.get("media"), post["content"])
+        bully_scores[i] = campaign.score if campaign is not None else None
+        if bully_scores[i] is not None:
+            continue
+        if campaign is not None and campaign.id in leaders:
+            followers.append(i)  # its campaign's first post is scored in this batch
+        else:
+            if campaign is not None:
+                leaders[campaign.id] = i
+            fresh.append(i)
+
+    if fresh:
+        scores = _toxicity_scores([posts[i]["content"] for i in fresh], batch_size=batch_size)
+        for i, bully_score in zip(fresh, scores):
+            bully_scores[i] = bully_score
+            _remember_score(matches[i], posts[i].get("media"), posts[i]["content"], bully_score)
+    for i in followers:
+        bully_scores[i] = bully_scores[leaders[matches[i][0].id]]
+
+    toxicity_results = _build_detections([post["content"] for post in posts],
+                                         [sarcasm_score for sarcasm_score, _, _ in signals], bully_scores)
+    fresh = set(fresh)
+    return [_with_campaign(_combine_analysis(toxicity_result, fraud_result, fake_result), match,
+                           reused=i not in fresh)
+            for i, (toxicity_result, (_, fraud_result, fake_result), match)
+            in enumerate(zip(toxicity_results, signals, matches))]
+
+
+def _campaign_match(text, media_type=None):
+    """(campaign, similarity) for a text, or None when campaign detection does not apply."""
+    if not CAMPAIGN_DETECTION:
+        return None
+    return campaign_index.assign(text, media_type)
+
+
+def _reusable_campaign(match, media_type, text):
+    """The matched campaign if ``text`` adds nothing to its representative, else None.
+
+    A near-duplicate with new words (e.g. an insult appended to a known
+    message) keeps its campaign id but is scored by the model.
+    """
+    if match and match[0].media == media_type and match[0].covers(text):
+        return match[0]
+    return None
+
+
+def _campaign_score(match, media_type, text):
+    """The model score a near-duplicate can reuse from its campaign, or None."""
+    campaign = _reusable_campaign(match, media_type, text)
+    return campaign.score if campaign is not None else None
+
+
+def _remember_score(match, media_type, text, bully_score):
+    # The first model score of a campaign is what its near-duplicates reuse.
+    campaign = _reusable_campaign(match, media_type, text)
+    if campaign is not None and campaign.score is None:
+        campaign.score = bully_score
+
+
+def _with_campaign(analysis, match, reused):
+    """The analysis tagged with its campaign (None until a near-duplicate shows up)."""
+    if not match or match[0].size < 2:
+        return {**analysis, "campaign": None}
+    campaign, similarity = match
+    if reused:
+        campaign_counters["reused"] += 1
+    return {**analysis, "campaign": {"id": campaign.id, "size": campaign.size,
+                                     "similarity": round(similarity, 4), "reused": reused}}
+
+
+def content_signals(posts):
+    """The model-free stages per post: (sarcasm score, fraud result, fake media result)."""
+    return [(_sarcasm_score(post["content"]),
+             detect_fraud(post["content"]),
+             detect_fake_media(post["content"], post.get("media")))
+            for post in posts]
+
+
+@stage("combine")
+def _combine_analysis(toxicity_result, fraud_result, fake_result):
+    """Merge toxicity, fraud and fake media results into one threat report."""
     # Determine primary threat category
     threats = []
     if toxicity_result["risk"] > 0.4:
@@ -271,8 +724,13 @@ def analyze_content(text, media_type=None):
     }
 
 # --------- AI AUTO-ACTION ENGINE ----------
-def decide_action(analysis, platform, user):
-    """AI decides what action to take based on analysis."""
+@stage("decide_action")
+def decide_action(analysis, platform, user, post_key=None):
+    """AI decides what action to take based on analysis.
+
+    ``post_key`` identifies the post being judged; auto-reports for the same
+    post then share one report id, so repeated scans never file it twice.
+    """
     severity = analysis["overall_severity"]
     threats = analysis["threats"]
     category = analysis["primary_category"]
@@ -298,6 +756,24 @@ def decide_action(analysis, platform, user):
         explanation = f"CRITICAL THREAT. Auto-reported to Cyber Hub. Severe {category} from {user} on {platform}."
         auto_report = True
 
+    # Escalate repeat offenders based on their recent history. Only posts at
+    # flag level or above count, and each post counts once however often
+    # it is re-analyzed.
+    offender = None
+    if OFFENDER_TRACKING and action != "monitor":
+        offender = offender_index.record(platform, user, severity, post_id=post_key)
+    escalated_from = None
+    for from_action, to_action, field, threshold in ESCALATION_RULES:
+        if offender and action == from_action and offender[field] >= threshold:
+            escalated_from = escalated_from or action
+            action = to_action
+            action_icon = ACTION_ICONS[to_action]
+            auto_report = True
+    if escalated_from:
+        explanation = (f"REPEAT OFFENDER. {offender['window_hits']} risky posts from {user} in the last "
+                       f"{OFFENDER_WINDOW_SECONDS / 60:.0f} min (score {offender['score']:.2f}). "
+                       f"Escalated from {escalated_from} to {action}.")
+
     # Auto-report to Cyber Hub if needed
     report_id = None
     if auto_report and threats:
@@ -307,7 +783,9 @@ def decide_action(analysis, platform, user):
             content=analysis.get("meme", ""),
             threats=threats,
             severity=severity,
-            action_taken=action
+            action_taken=action,
+            report_id=_report_id_for(post_key) if post_key else None,
+            campaign_id=(analysis.get("campaign") or {}).get("id"),
         )
 
     return {
@@ -316,12 +794,25 @@ def decide_action(analysis, platform, user):
         "explanation": explanation,
         "auto_reported": auto_report,
         "report_id": report_id,
+        "escalated_from": escalated_from,
+        "offender": offender,
     }
 
+
+ACTION_ICONS = {"monitor": "👁️", "flag": "🚩", "block": "🛑", "report_to_cyberhub": "🚨"}
+
 # --------- CYBER HUB REPORTING ----------
-def submit_cyberhub_report(platform, user, content, threats, severity, action_taken):
-    """Submit a report to the Cyber Hub."""
-    report_id = f"CH-{uuid.uuid4().hex[:8].upper()}"
+def submit_cyberhub_report(platform, user, content, threats, severity, action_taken, report_id=None,
+                           campaign_id=None):
+    """Submit a report to the Cyber Hub.
+
+    A report with an ``report_id`` already in the store is not added again.
+    ``campaign_id`` links reports on near-duplicate posts of one campaign.
+    """
+    if report_id is None:
+        report_id = f"CH-{uuid.uuid4().hex[:16].upper()}"
+    elif report_store.contains(report_id):
+        return report_id
     report = {
         "id": report_id,
         "timestamp": datetime.now().isoformat(),
@@ -334,156 +825,327 @@ def submit_cyberhub_report(platform, user, content, threats, severity, action_ta
         "status": "submitted",
         "status_icon": "📤",
         "priority": "critical" if severity > 0.75 else "high" if severity > 0.5 else "medium",
+        "campaign_id": campaign_id,
     }
-    cyberhub_reports.insert(0, report)
+    report_store.add(report)
+    if report_exporter is not None:
+        report_exporter.submit(report)
+    if METRICS_ENABLED:
+        REPORTS_SUBMITTED.inc(1, report["priority"])
     print(f"[REPORT] CYBER HUB REPORT {report_id}: {platform} | {user} | Severity: {severity:.2f} | Action: {action_taken}")
     return report_id
 
-# --------- SCAN PLATFORM ----------
-def scan_platform(platform_name):
-    """Scan a platform's simulated feed and analyze all posts."""
-    posts = SIMULATED_POSTS.get(platform_name, [])
-    results = []
+def _report_id_for(post_key):
+    """Deterministic report id for an auto-report on one post."""
+    digest = hashlib.sha256("\x00".join(post_key).encode("utf-8")).hexdigest()
+    return f"CH-{digest[:16].upper()}"
 
-    for post in posts:
-        analysis = analyze_content(post["content"], post.get("media"))
-        action = decide_action(analysis, platform_name, post["user"])
-
-        results.append({
-            "platform": platform_name,
-            "user": post["user"],
-            "content": post["content"],
-            "type": post["type"],
-            "media": post.get("media"),
-            "analysis": {
-                "risk": analysis["risk"],
-                "level": analysis["level"],
-                "roast_icon": analysis["roast_icon"],
-                "primary_category": analysis["primary_category"],
-                "overall_severity": analysis["overall_severity"],
-                "threats": analysis["threats"],
-                "fraud": analysis["fraud"],
-                "fake_media": analysis["fake_media"],
-                "explanation": analysis["explanation"],
-            },
-            "action": action,
-        })
 
+# --------- SCAN PLATFORM ----------
+PLATFORMS = ["whatsapp", "instagram", "twitter"]
+
+# Analyzed posts, reused by later scans (see scan_memo.py).
+SCAN_MEMO_SIZE = int(os.environ.get("SCAN_MEMO_SIZE", 50000))
+scan_memo = ScanMemo(SCAN_MEMO_SIZE)
+
+# Feeds are append-only sources read from a per-platform watermark (see
+# feeds.py). By default they are the simulated lists; FEED_JSONL_DIR switches
+# to tailing <dir>/<platform>.jsonl. FEED_WATERMARK_PATH persists watermarks.
+FEED_JSONL_DIR = os.environ.get("FEED_JSONL_DIR")
+FEED_WATERMARK_PATH = os.environ.get("FEED_WATERMARK_PATH")
+# Most recent results kept per platform for the feed/stats endpoints.
+FEED_WINDOW = int(os.environ.get("FEED_WINDOW", 1000))
+
+if FEED_JSONL_DIR:
+    feed_sources = {p: JsonlFeedSource(os.path.join(FEED_JSONL_DIR, f"{p}.jsonl")) for p in PLATFORMS}
+else:
+    feed_sources = {p: ListFeedSource(SIMULATED_POSTS[p]) for p in PLATFORMS}
+feed_watermarks = WatermarkStore(FEED_WATERMARK_PATH)
+platform_feeds = {p: deque(maxlen=FEED_WINDOW) for p in PLATFORMS}
+# One ingester per platform at a time, so two requests never analyze (and
+# report) the same new post concurrently.
+_scan_locks = {p: threading.Lock() for p in PLATFORMS}
+
+
+def scan_platform(platform_name, batch_size=None):
+    """Scan a platform's feed and return its analyzed posts."""
+    return scan_platforms([platform_name], batch_size=batch_size)
+
+
+def scan_platforms(platform_names, batch_size=None):
+    """Analyze posts that arrived since the last scan, then return each feed.
+
+    Returns the most recent FEED_WINDOW results per platform, in arrival
+    order; only posts past the platform's watermark reach the model.
+    """
+    for platform_name in platform_names:
+        for _ in iter_scan(platform_name, batch_size=batch_size):
+            pass
+    return [r for p in platform_names for r in platform_feeds.get(p, ())]
+
+
+def iter_scan(platform_name, batch_size=None):
+    """Yield scan results for new posts on one platform, one batch at a time.
+
+    Memory stays bounded by ``batch_size`` however long the feed is. The
+    watermark advances after each batch, so a client that stops reading
+    only leaves the unread posts for the next scan.
+    """
+    source = feed_sources.get(platform_name)
+    if source is None:
+        return
+    batch_size = batch_size or INFERENCE_BATCH_SIZE
+    while True:
+        with _scan_locks[platform_name]:
+            batch = list(islice(source.read(feed_watermarks.get(platform_name)), batch_size))
+            if not batch:
+                return
+            results = _scan_posts(platform_name, [post for _, post in batch], batch_size)
+            platform_feeds[platform_name].extend(results)
+            feed_watermarks.set(platform_name, batch[-1][0])
+        yield from results
+
+
+def reset_feeds(platform_name=None):
+    """Forget watermarks and feed windows so the next scan re-reads from the start."""
+    for p in [platform_name] if platform_name else PLATFORMS:
+        feed_watermarks.reset(p)
+        platform_feeds[p].clear()
+
+
+def _scan_posts(platform_name, posts, batch_size=None):
+    """Analyze and act on posts, reusing ``scan_memo`` for posts seen before."""
+    keys = [post_key(platform_name, post) for post in posts]
+    results = [scan_memo.get(key) for key in keys]
+    new = [i for i, result in enumerate(results) if result is None]
+    analyses = analyze_content_batch([posts[i] for i in new], batch_size=batch_size)
+
+    for i, analysis in zip(new, analyses):
+        action = decide_action(analysis, platform_name, posts[i]["user"], post_key=keys[i])
+        results[i] = _scan_result(platform_name, posts[i], analysis, action)
+        scan_memo.put(keys[i], results[i])
     return results
 
 
+def _scan_result(platform_name, post, analysis, action):
+    return {
+        "id": post.get("id"),
+        "platform": platform_name,
+        "user": post["user"],
+        "content": post["content"],
+        "type": post["type"],
+        "media": post.get("media"),
+        "analysis": {
+            "risk": analysis["risk"],
+            "level": analysis["level"],
+            "roast_icon": analysis["roast_icon"],
+            "primary_category": analysis["primary_category"],
+            "overall_severity": analysis["overall_severity"],
+            "threats": analysis["threats"],
+            "fraud": analysis["fraud"],
+            "fake_media": analysis["fake_media"],
+            "explanation": analysis["explanation"],
+            "campaign": analysis["campaign"],
+        },
+        "action": action,
+    }
+
+
 # --------- DETECTION LOGIC ----------
+SARCASM_KEYWORDS = ['smart', 'great', 'nice', 'good', 'perfect', 'awesome',
+                    'genius', 'wah', 'kya baat']
+SARCASM_EMOJIS = ['😂', '😏', '🙄', '🤦', '😉']
+SARCASM_EMOJI_RE = re.compile('[' + ''.join(SARCASM_EMOJIS) + ']')
+
+
 def detect(text):
-    sarcasm_keywords = ['smart', 'great', 'nice', 'good', 'perfect', 'awesome',
-                        'genius', 'wah', 'kya baat']
-    sarcasm_emojis = ['😂', '😏', '🙄', '🤦', '😉']
+    sarcasm_score = _sarcasm_score(text)
+    bully_score = _toxicity_scores([text], scheduled=True)[0]
+    return _build_detection(text, sarcasm_score, bully_score)
+
+
+def detect_batch(texts, batch_size=None):
+    """Batched detect(): one padded forward pass per ``batch_size`` texts.
+
+    Returns one detect()-shaped result per text, in input order.
+    """
+    texts = list(texts)
+    bully_scores = _toxicity_scores(texts, batch_size=batch_size)
+    return _build_detections(texts, [_sarcasm_score(text) for text in texts], bully_scores)
 
+
+@stage("sarcasm")
+def _sarcasm_score(text):
     sarcasm_score = 0.2
-    if any(word in text.lower() for word in sarcasm_keywords):
+    if any(word in text.lower() for word in SARCASM_KEYWORDS):
         sarcasm_score += 0.4
-    emoji_count = len(re.findall('[' + ''.join(sarcasm_emojis) + ']', text))
+    emoji_count = len(SARCASM_EMOJI_RE.findall(text))
     sarcasm_score += 0.3 * emoji_count
-    sarcasm_score = min(0.95, sarcasm_score)
-
-    bully = bully_detector(text)[0]
-    bully_score = bully['score'] if bully['label'] == 'toxic' else 0.1
-
-    risk = float(np.clip(
-        (bully_score * 0.6 + sarcasm_score * 1.2) / 2
-        + np.random.normal(0, 0.03),
-        0, 1
-    ))
-
-    # 5-level roast meter
-    if risk > 0.85:
-        level = "Ultra Toxic"
-        roast_icon = "💀"
-        meme = random.choice(MEME_ULTRA)
-    elif risk > 0.65:
-        level = "Toxic"
-        roast_icon = "🔴"
-        meme = random.choice(MEME_TOXIC)
-    elif risk > 0.45:
-        level = "Risky"
-        roast_icon = "🟠"
-        meme = random.choice(MEME_RISKY)
-    elif risk > 0.25:
-        level = "Sarcastic"
-        roast_icon = "🟡"
-        meme = random.choice(MEME_SARCASTIC)
-    else:
-        level = "Safe"
-        roast_icon = "🔵"
-        meme = random.choice(MEME_SAFE)
-
-    # Explanation with Gen Z microcopy
-    if risk > 0.85:
-        explanation = "💀 YIKES. Maximum toxicity detected. Not the vibe at all."
-    elif risk > 0.65:
-        explanation = "🔴 This is giving toxic energy. Words hurt, bestie."
-    elif risk > 0.45:
-        explanation = "🟠 Whoa 👀 that escalated quickly… tread carefully."
-    elif risk > 0.25:
-        explanation = "🟡 The sarcasm is strong with this one. Proceed with caution."
+    return min(0.95, sarcasm_score)
+
+
+def _toxicity_scores(texts, batch_size=None, scheduled=False):
+    """Return one bully score per text, using the pre-screen and cache where possible.
+
+    Only texts the pre-screen escalates and the cache misses reach the model.
+    ``scheduled`` routes those misses through the micro-batcher (single-request
+    paths) instead of running them as a batch of their own.
+    """
+    texts = list(texts)
+    if inference_pool is None:
+        # Resolve the backend first so cache keys use its namespace.
+        get_model()
+    if prescreen is not None:
+        with stage_timer("prescreen"):
+            scores = [prescreen.screen(text) for text in texts]
     else:
-        explanation = "🔵 All clear! Wholesome energy detected ✨"
+        scores = [None] * len(texts)
+    if inference_cache is not None:
+        with stage_timer("cache"):
+            pending = [i for i, s in enumerate(scores) if s is None]
+            for i, cached in zip(pending, inference_cache.get_many([texts[i] for i in pending])):
+                scores[i] = cached
+
+    # Repeated texts in one batch only need a single forward pass.
+    misses = list(dict.fromkeys(t for t, s in zip(texts, scores) if s is None))
+    if misses:
+        if scheduled and toxicity_batcher is not None:
+            # Share a forward pass with other requests arriving at the same time.
+            fresh = [toxicity_batcher(text) for text in misses]
+        else:
+            fresh = _forward(misses, batch_size=batch_size)
+        if inference_cache is not None:
+            inference_cache.put_many(misses, fresh)
+        fresh = dict(zip(misses, fresh))
+        scores = [fresh[t] if s is None else s for t, s in zip(texts, scores)]
+    return scores
+
+
+@stage("model")
+def _forward(texts, batch_size=None):
+    """Run the model on texts, in this process or on the inference pool."""
+    with _counter_lock:
+        model_counters["calls"] += 1
+        model_counters["texts"] += len(texts)
+    if inference_pool is not None:
+        return inference_pool(texts, timeout=INFERENCE_POOL_TIMEOUT)
+    return _run_model(texts, batch_size=batch_size)
+
+
+def _run_model(texts, batch_size=None):
+    """Run the toxicity model over texts and return one bully score per text."""
+    if not texts:
+        return []
+    model = get_model()
+    batch_size = batch_size or INFERENCE_BATCH_SIZE
+    tokenizer = getattr(model, "tokenizer", None)
+
+    # Long texts become overlapping windows; the margin leaves room for the
+    # special tokens and for re-tokenizing a window slightly differently.
+    # Only texts that may overflow are tokenized here; the pipeline
+    # tokenizes the rest anyway, so they are bucketed by an estimate.
+    window = max(8, MODEL_MAX_TOKENS - 8)
+    stride = min(CHUNK_STRIDE, window // 2)
+    long = [i for i, text in enumerate(texts) if may_overflow(text, window)]
+    spans = dict(zip(long, token_spans([texts[i] for i in long], tokenizer)))
+    pieces, lengths, owners = [], [], []
+    for i, text in enumerate(texts):
+        windows = split_windows(text, spans[i], window, stride) if i in spans else [(text, estimate_tokens(text))]
+        for piece, length in windows:
+            pieces.append(piece)
+            lengths.append(length)
+            owners.append(i)
+
+    # The pipeline pads each batch to its longest member, so batch similar lengths together.
+    batches = (length_sorted_batches if LENGTH_BUCKETING else arrival_batches)(lengths, batch_size)
+    piece_scores = [None] * len(pieces)
+    for batch in batches:
+        outputs = model([pieces[j] for j in batch], batch_size=len(batch))
+        for j, bully in zip(batch, outputs):
+            piece_scores[j] = bully['score'] if bully['label'] == 'toxic' else 0.1
+
+    window_scores = [[] for _ in texts]
+    for owner, score in zip(owners, piece_scores):
+        window_scores[owner].append(score)
+    return [combine(scores, CHUNK_COMBINE) for scores in window_scores]
+
+
+# Texts that actually reached the model (after pre-screen and cache).
+model_counters = {"calls": 0, "texts": 0}
+_counter_lock = threading.Lock()
+
+toxicity_batcher = None
+if MICROBATCH_ENABLED:
+    toxicity_batcher = MicroBatcher(
+        lambda texts: _forward(texts, batch_size=len(texts)),
+        max_batch_size=MICROBATCH_MAX_SIZE,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    )
 
-    mood = "🙂" if risk < 0.25 else "😏" if risk < 0.45 else "😬" if risk < 0.65 else "😡" if risk < 0.85 else "💀"
 
-    # Empathy / Respect / Risk scores for Kindness dashboard
-    empathy = round(max(0, 1 - risk - 0.1 * sarcasm_score + np.random.normal(0, 0.05)), 4)
-    empathy = float(np.clip(empathy, 0, 1))
-    respect = round(max(0, 1 - bully_score * 0.8 + np.random.normal(0, 0.03)), 4)
-    respect = float(np.clip(respect, 0, 1))
+# Per level bucket (see scoring.LEVEL_BOUNDS): name, icon, memes, explanation.
+LEVELS = (
+    ("Safe", "🔵", MEME_SAFE, "🔵 All clear! Wholesome energy detected ✨"),
+    ("Sarcastic", "🟡", MEME_SARCASTIC, "🟡 The sarcasm is strong with this one. Proceed with caution."),
+    ("Risky", "🟠", MEME_RISKY, "🟠 Whoa 👀 that escalated quickly… tread carefully."),
+    ("Toxic", "🔴", MEME_TOXIC, "🔴 This is giving toxic energy. Words hurt, bestie."),
+    ("Ultra Toxic", "💀", MEME_ULTRA, "💀 YIKES. Maximum toxicity detected. Not the vibe at all."),
+)
+MOODS = ("🙂", "😏", "😬", "😡", "💀")
 
-    # Mental health trigger
-    mental_health_msg = None
-    if risk > 0.7:
-        mental_health_msg = random.choice(MENTAL_HEALTH_MSGS)
 
-    # Mood flip (polite rewrite)
-    polite_rewrite = generate_polite_rewrite(text, risk)
+def _build_detection(text, sarcasm_score, bully_score):
+    """Turn the sarcasm and model scores into the full detect() result."""
+    return _build_detections([text], [sarcasm_score], [bully_score])[0]
 
-    # Challenge hint
-    challenge_hint = None
-    if risk > 0.4:
-        challenge_hint = random.choice(CHALLENGE_HINTS)
 
-    return {
-        "risk": round(risk, 4),
-        "level": level,
-        "roast_icon": roast_icon,
-        "sarcasm_score": round(sarcasm_score, 4),
-        "toxicity_score": round(bully_score, 4),
-        "explanation": explanation,
-        "mood": mood,
-        "meme": meme,
-        "empathy_score": empathy,
-        "respect_score": respect,
-        "mental_health": mental_health_msg,
-        "polite_rewrite": polite_rewrite,
-        "challenge_hint": challenge_hint,
-    }
+@stage("build_detection")
+def _build_detections(texts, sarcasm_scores, bully_scores):
+    """Batched _build_detection(): the numeric scoring runs once over the whole batch."""
+    scores = scoring_kernel.score_rows(bully_scores, sarcasm_scores)
+    columns = zip(texts, sarcasm_scores, bully_scores, scores["risk"], scores["level"], scores["mood"],
+                  scores["empathy"], scores["respect"], scores["picks"])
+
+    results = []
+    for text, sarcasm_score, bully_score, risk, level_index, mood_index, empathy, respect, picks in columns:
+        level, roast_icon, memes, explanation = LEVELS[level_index]
+        results.append({
+            "risk": round(risk, 4),
+            "level": level,
+            "roast_icon": roast_icon,
+            "sarcasm_score": round(float(sarcasm_score), 4),
+            "toxicity_score": round(float(bully_score), 4),
+            "explanation": explanation,
+            "mood": MOODS[mood_index],
+            "meme": pick(memes, picks[0]),
+            # Empathy / Respect / Risk scores for Kindness dashboard
+            "empathy_score": empathy,
+            "respect_score": respect,
+            # Mental health trigger
+            "mental_health": pick(MENTAL_HEALTH_MSGS, picks[1]) if risk > 0.7 else None,
+            # Mood flip (polite rewrite)
+            "polite_rewrite": generate_polite_rewrite(text, risk),
+            # Challenge hint
+            "challenge_hint": pick(CHALLENGE_HINTS, picks[2]) if risk > 0.4 else None,
+        })
+    return results
 
 
+@stage("polite_rewrite")
 def generate_polite_rewrite(text, risk):
     """Generate a polite version of toxic text."""
     if risk < 0.3:
         return None  # already safe
 
-    rewritten = text.lower()
-    changed = False
-    for toxic, polite in TOXIC_REWRITES.items():
-        if toxic in rewritten:
-            rewritten = rewritten.replace(toxic, polite)
-            changed = True
+    rewritten, changed = polite_rewriter.rewrite(text)
 
     if changed:
-        # Clean up and capitalize
-        rewritten = rewritten.strip().capitalize()
+        # Clean up and capitalize (the rest keeps the writer's casing)
+        rewritten = rewritten.strip()
+        rewritten = rewritten[:1].upper() + rewritten[1:]
         if not rewritten.endswith('.'):
             rewritten += '.'
-        template = random.choice(POLITE_TEMPLATES)
+        template = scoring_kernel.choice(POLITE_TEMPLATES, basis=risk)
         return template.format(rewrite=rewritten)
     else:
         # Generic rewrite
@@ -529,32 +1191,121 @@ def challenge():
     text = data.get("text", "").strip()
     if not text:
         return jsonify({"error": "No text provided"}), 400
-    result = detect(text)
+    return jsonify(challenge_verdict(detect(text)))
+
+
+def challenge_verdict(result):
+    """Pass/fail feedback for a rewrite, from its detect() result."""
     passed = result["risk"] < 0.3
-    return jsonify({
+    return {
         "passed": passed,
         "risk": result["risk"],
         "level": result["level"],
         "feedback": "🎉 Nailed it! That's the positive energy we need! ✨" if passed
                     else "Almost there! Try making it even more positive and encouraging. 💪",
+    }
+
+
+def _flag(value):
+    """A boolean option from JSON (true/1) or a query string ("1"/"true"); anything else is off."""
+    return str(value).lower() in ("1", "true")
+
+
+@app.route("/api/analyze/batch", methods=["POST"])
+def analyze_batch():
+    """Analyze many texts in one request.
+
+    Body: ``{"items": [...], "compact": false}`` or a bare list. Each item is
+    a string or ``{"id", "text", "media"}``. Results come back in input order;
+    an invalid item gets an ``error`` entry instead of failing the request.
+    ``compact`` (or ``?compact=1``) returns only the score fields.
+    """
+    data = request.get_json(force=True, silent=True)
+    if isinstance(data, list):
+        data = {"items": data}
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+        return jsonify({"error": "Expected a list of items or {\"items\": [...]}"}), 400
+    items = data["items"]
+    if len(items) > ANALYZE_BATCH_MAX:
+        return jsonify({"error": f"Too many items: {len(items)} (max {ANALYZE_BATCH_MAX})",
+                        "max_items": ANALYZE_BATCH_MAX}), 413
+    compact = _flag(data.get("compact")) or _flag(request.args.get("compact"))
+
+    results = [None] * len(items)
+    posts, positions = [], []
+    for i, item in enumerate(items):
+        entry, post = _parse_batch_item(i, item)
+        if post is None:
+            results[i] = entry
+        else:
+            posts.append(post)
+            positions.append((i, entry))
+
+    for (i, entry), analysis in zip(positions, analyze_content_batch(posts)):
+        entry["analysis"] = compact_analysis(analysis) if compact else analysis
+        results[i] = entry
+
+    return jsonify({
+        "results": results,
+        "total": len(results),
+        "errors": sum(1 for r in results if "error" in r),
     })
 
 
+def _parse_batch_item(index, item):
+    """Return ``(entry, post)``; post is None when the item is invalid."""
+    if isinstance(item, str):
+        item = {"text": item}
+    if not isinstance(item, dict):
+        return {"index": index, "error": "Item must be a string or an object"}, None
+    entry = {"index": index}
+    if item.get("id") is not None:
+        entry["id"] = item["id"]
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        entry["error"] = "No text provided"
+        return entry, None
+    media = item.get("media")
+    if media is not None and not isinstance(media, str):
+        entry["error"] = "media must be a string"
+        return entry, None
+    return entry, {"content": text.strip(), "media": media}
+
+
+def compact_analysis(analysis):
+    """Only the score fields of an analyze_content() result."""
+    return {
+        "risk": analysis["risk"],
+        "level": analysis["level"],
+        "toxicity_score": analysis["toxicity_score"],
+        "fraud_score": analysis["fraud"]["score"],
+        "fake_media_score": analysis["fake_media"]["score"],
+        "primary_category": analysis["primary_category"],
+        "overall_severity": analysis["overall_severity"],
+        "campaign_id": (analysis["campaign"] or {}).get("id"),
+    }
+
+
 # ═══════════════════════════════════════════════════════════
 #  PLATFORM API ENDPOINTS
 # ═══════════════════════════════════════════════════════════
 
 @app.route("/api/platform/feed", methods=["GET"])
 def platform_feed():
-    """Get analyzed feed from all or specific platform."""
+    """Get analyzed feed from all or specific platform.
+
+    ``?stream=ndjson|sse`` (or an ``Accept: application/x-ndjson`` /
+    ``text/event-stream`` header) streams results as they are analyzed.
+    """
+    started = time.perf_counter()
     platform = request.args.get("platform", "all")
-    all_results = []
+    platform_names = PLATFORMS if platform == "all" else [platform]
 
-    if platform == "all":
-        for p in ["whatsapp", "instagram", "twitter"]:
-            all_results.extend(scan_platform(p))
-    else:
-        all_results = scan_platform(platform)
+    stream = _stream_format()
+    if stream:
+        return _stream_results(_iter_feed(platform_names), stream, started)
+
+    all_results = scan_platforms(platform_names)
 
     # Sort by severity (most dangerous first)
     all_results.sort(key=lambda x: x["analysis"]["overall_severity"], reverse=True)
@@ -564,22 +1315,23 @@ def platform_feed():
         "total": len(all_results),
         "threats_found": sum(1 for r in all_results if r["analysis"]["primary_category"] != "safe"),
         "auto_actions": sum(1 for r in all_results if r["action"]["action"] in ["block", "report_to_cyberhub"]),
-    })
+    }), 200, _server_timing(started)
 
 
 @app.route("/api/platform/scan", methods=["POST"])
 def platform_scan():
-    """Trigger a scan on a specific platform."""
+    """Trigger a scan on a specific platform (streams like /api/platform/feed)."""
     try:
+        started = time.perf_counter()
         data = request.get_json(force=True)
         platform = data.get("platform", "all")
+        platform_names = PLATFORMS if platform == "all" else [platform]
 
-        all_results = []
-        if platform == "all":
-            for p in ["whatsapp", "instagram", "twitter"]:
-                all_results.extend(scan_platform(p))
-        else:
-            all_results = scan_platform(platform)
+        stream = _stream_format()
+        if stream:
+            return _stream_results(_iter_feed(platform_names), stream, started)
+
+        all_results = scan_platforms(platform_names)
 
         all_results.sort(key=lambda x: x["analysis"]["overall_severity"], reverse=True)
 
@@ -589,19 +1341,91 @@ def platform_scan():
             "threats_found": sum(1 for r in all_results if r["analysis"]["primary_category"] != "safe"),
             "auto_actions": sum(1 for r in all_results if r["action"]["action"] in ["block", "report_to_cyberhub"]),
             "scan_complete": True,
-        })
+        }), 200, _server_timing(started)
+    except (InferencePoolFull, InferencePoolUnavailable):
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({"error": "Internal server error", "detail": str(e)}), 500
 
 
+# --------- STREAMING ----------
+def _stream_format():
+    """Return "ndjson", "sse" or None from ?stream= or the Accept header."""
+    requested = request.args.get("stream")
+    if requested in ("ndjson", "sse"):
+        return requested
+    accept = request.headers.get("Accept", "")
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    if "text/event-stream" in accept:
+        return "sse"
+    return None
+
+
+def _iter_feed(platform_names):
+    """Already-analyzed results first, then new posts as each batch finishes."""
+    for platform_name in platform_names:
+        yield from list(platform_feeds.get(platform_name, ()))
+        yield from iter_scan(platform_name)
+
+
+def _encode_event(stream, event, payload):
+    if stream == "sse":
+        return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+    return app.json.dumps({"event": event, **payload}) + "\n"
+
+
+def _stream_results(results, stream, started):
+    """Stream one event per result, then a summary event with the totals.
+
+    Results arrive in feed order, not sorted by severity; the summary's
+    ``time_to_first_result_ms`` and ``total_ms`` show how long the client
+    waited for the first result versus the whole scan.
+    """
+    def generate():
+        total = threats_found = auto_actions = 0
+        first_result_ms = None
+        try:
+            for result in results:
+                if first_result_ms is None:
+                    first_result_ms = round((time.perf_counter() - started) * 1000, 2)
+                total += 1
+                threats_found += result["analysis"]["primary_category"] != "safe"
+                auto_actions += result["action"]["action"] in ["block", "report_to_cyberhub"]
+                yield _encode_event(stream, "result", {"result": result})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield _encode_event(stream, "error", {"error": "Internal server error", "detail": str(e)})
+            return
+        yield _encode_event(stream, "summary", {
+            "total": total,
+            "threats_found": threats_found,
+            "auto_actions": auto_actions,
+            "scan_complete": True,
+            "time_to_first_result_ms": first_result_ms,
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+
+    mimetype = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+    # X-Accel-Buffering stops nginx-style proxies from holding the stream back.
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _server_timing(started):
+    return {"Server-Timing": f"total;dur={(time.perf_counter() - started) * 1000:.1f}"}
+
+
 @app.route("/api/platform/stats", methods=["GET"])
 def platform_stats():
     """Get platform-level statistics."""
     stats = {}
-    for p in ["whatsapp", "instagram", "twitter"]:
-        results = scan_platform(p)
+    all_results = scan_platforms(PLATFORMS)
+    for p in PLATFORMS:
+        results = [r for r in all_results if r["platform"] == p]
         threats = [r for r in results if r["analysis"]["primary_category"] != "safe"]
         stats[p] = {
             "total_scanned": len(results),
@@ -613,19 +1437,40 @@ def platform_stats():
 
     return jsonify({
         "platforms": stats,
-        "total_reports": len(cyberhub_reports),
+        "total_reports": report_store.count(),
     })
 
 
 @app.route("/api/cyberhub/reports", methods=["GET"])
 def get_cyberhub_reports():
-    """Get all Cyber Hub reports."""
+    """Get one page of Cyber Hub reports, newest first.
+
+    Query parameters: ``limit``, ``cursor`` (the previous page's
+    ``next_cursor``), and the filters platform, priority, threat_type,
+    reported_user, since and until (ISO timestamps). Poll with
+    ``since=<newest timestamp seen>`` to fetch only new reports.
+    """
+    try:
+        limit = int(request.args.get("limit", REPORTS_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    limit = min(max(limit, 1), REPORTS_PAGE_MAX)
+    filters = {name: request.args[name] for name in REPORT_FILTERS if request.args.get(name)}
+
+    try:
+        reports, next_cursor = report_store.query(limit=limit, cursor=request.args.get("cursor"), **filters)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
     return jsonify({
-        "reports": cyberhub_reports,
-        "total": len(cyberhub_reports),
-        "critical": sum(1 for r in cyberhub_reports if r["priority"] == "critical"),
-        "high": sum(1 for r in cyberhub_reports if r["priority"] == "high"),
-        "medium": sum(1 for r in cyberhub_reports if r["priority"] == "medium"),
+        "reports": reports,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "limit": limit,
+        "filters": filters,
+        # Store-wide totals from the incrementally maintained counters.
+        "total": report_store.count(),
+        **report_store.priority_counts(),
     })
 
 
@@ -648,7 +1493,8 @@ def manual_cyberhub_report():
         content=content,
         threats=analysis["threats"] or [{"type": threat_type, "severity": 0.7}],
         severity=analysis["overall_severity"] or 0.7,
-        action_taken="manual_report"
+        action_taken="manual_report",
+        campaign_id=(analysis["campaign"] or {}).get("id"),
     )
 
     return jsonify({
@@ -658,8 +1504,211 @@ def manual_cyberhub_report():
     })
 
 
+# ═══════════════════════════════════════════════════════════
+#  INFERENCE API ENDPOINTS
+# ═══════════════════════════════════════════════════════════
+
+@app.errorhandler(InferencePoolFull)
+def inference_pool_full(e):
+    return jsonify({"error": "Inference queue is full, retry shortly", "detail": str(e)}), 429, {"Retry-After": "1"}
+
+
+@app.errorhandler(InferencePoolUnavailable)
+def inference_pool_unavailable(e):
+    return jsonify({"error": "Inference workers unavailable", "detail": str(e)}), 503, {"Retry-After": "5"}
+
+
+@app.route("/api/offenders/top", methods=["GET"])
+def top_offenders():
+    """Top-K repeat offenders by decayed severity score (``?by=window_hits`` for recent post count)."""
+    try:
+        k = int(request.args.get("k", 10))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    k = min(max(k, 1), OFFENDERS_TOP_MAX)
+    by = request.args.get("by", "score")
+    if by not in ("score", "window_hits"):
+        return jsonify({"error": "by must be 'score' or 'window_hits'"}), 400
+    platform = request.args.get("platform")
+
+    offenders = offender_index.top(k, by=by, platform=platform)
+    for offender in offenders:
+        offender["last_seen"] = datetime.fromtimestamp(offender["last_seen"]).isoformat()
+    return jsonify({
+        "offenders": offenders,
+        "k": k,
+        "by": by,
+        "platform": platform,
+        **offender_index.stats(),
+    })
+
+
+@app.route("/api/campaigns/top", methods=["GET"])
+def top_campaigns():
+    """Largest near-duplicate campaigns (``?min_size=`` posts, default 2)."""
+    try:
+        k = int(request.args.get("k", 10))
+        min_size = int(request.args.get("min_size", 2))
+    except ValueError:
+        return jsonify({"error": "k and min_size must be integers"}), 400
+    k = min(max(k, 1), CAMPAIGNS_TOP_MAX)
+
+    campaigns = campaign_index.top(k, min_size=min_size)
+    for campaign in campaigns:
+        campaign["first_seen"] = datetime.fromtimestamp(campaign["first_seen"]).isoformat()
+        campaign["last_seen"] = datetime.fromtimestamp(campaign["last_seen"]).isoformat()
+    return jsonify({
+        "campaigns": campaigns,
+        "k": k,
+        "enabled": CAMPAIGN_DETECTION,
+        "reused_scores": campaign_counters["reused"],
+        **campaign_index.stats(),
+    })
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: the toxicity model is loaded and requests will not block on it."""
+    if inference_pool is not None:
+        # The pool processes own the model; this process never loads it.
+        return jsonify({"ready": True, "mode": "pool", **model_status})
+    ready = model_ready()
+    if model_status["state"] == "not_loaded":
+        # Lazy mode: the first probe kicks off loading instead of a user request.
+        start_warmup()
+    return jsonify({"ready": ready, **model_status}), 200 if ready else 503
+
+
+@app.route("/api/inference/stats", methods=["GET"])
+def inference_stats():
+    """Get model scheduling and cache statistics."""
+    return jsonify({
+        "model": dict(model_counters),
+        "scan_memo": scan_memo.stats(),
+        "feed_watermarks": feed_watermarks.all(),
+        "feed_skipped": {p: getattr(source, "skipped", 0) for p, source in feed_sources.items()},
+        "microbatch": toxicity_batcher.stats() if toxicity_batcher is not None else None,
+        "cache": inference_cache.stats() if inference_cache is not None else None,
+        "prescreen": prescreen.stats() if prescreen is not None else None,
+        "pool": inference_pool.stats() if inference_pool is not None else None,
+    })
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus text exposition of this process's metrics."""
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/metrics/profile", methods=["GET"])
+def metrics_profile():
+    """Merged cProfile report of the sampled requests (``?sort=&limit=&reset=1``)."""
+    if profiler.sample_rate <= 0:
+        return jsonify({"error": "Profiling is off; set PROFILE_SAMPLE_RATE (e.g. 0.01)"}), 404
+    try:
+        limit = int(request.args.get("limit", 30))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    sort = request.args.get("sort", "cumulative")
+    if sort not in ("cumulative", "tottime", "calls", "ncalls"):
+        return jsonify({"error": "sort must be cumulative, tottime, calls or ncalls"}), 400
+    report = profiler.report(sort=sort, limit=limit, reset=request.args.get("reset") == "1")
+    return Response(report, mimetype="text/plain")
+
+
+@app.before_request
+def _start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.profile = profiler.start()
+
+
+@app.after_request
+def _record_request_metrics(response):
+    # Streamed responses are timed up to the first byte, not the last.
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    started = g.get("request_started")
+    if started is not None:
+        record_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+
+@app.teardown_request
+def _stop_request_profile(exc):
+    profiler.stop(g.pop("profile", None))
+
+
+def _cache_events():
+    if inference_cache is None:
+        return None
+    stats = inference_cache.stats()
+    return {(event,): stats[event] for event in ("hits", "disk_hits", "misses", "evictions", "expirations")}
+
+
+def _scan_memo_events():
+    stats = scan_memo.stats()
+    return {(event,): stats[event] for event in ("hits", "misses", "evictions")}
+
+
+metrics_registry.callback("bully_model_calls_total", "Model forward passes (after pre-screen and cache).",
+                          lambda: model_counters["calls"], type="counter")
+metrics_registry.callback("bully_model_texts_total", "Texts sent through the model.",
+                          lambda: model_counters["texts"], type="counter")
+metrics_registry.callback("bully_model_ready", "1 once the toxicity model is loaded.",
+                          lambda: int(model_ready() or inference_pool is not None))
+metrics_registry.callback("bully_inference_cache_events_total", "Score cache lookups and evictions.",
+                          _cache_events, ["event"], type="counter")
+metrics_registry.callback("bully_inference_cache_entries", "Scores held in the memory cache.",
+                          lambda: inference_cache.stats()["entries"] if inference_cache is not None else None)
+metrics_registry.callback("bully_scan_memo_events_total", "Per-post scan memo lookups and evictions.",
+                          _scan_memo_events, ["event"], type="counter")
+metrics_registry.callback("bully_prescreen_total", "Texts decided by each pre-screen tier.",
+                          lambda: {(tier,): n for tier, n in prescreen.stats()["tiers"].items()}
+                          if prescreen is not None else None, ["tier"], type="counter")
+metrics_registry.callback("bully_microbatch_queue_depth", "Texts waiting for a micro-batch.",
+                          lambda: toxicity_batcher.stats()["queue_depth"] if toxicity_batcher is not None else None)
+metrics_registry.callback("bully_offenders_tracked", "Users held in the repeat-offender index.",
+                          lambda: len(offender_index))
+metrics_registry.callback("bully_rewrite_lexicon_entries", "Phrases in the polite-rewrite lexicon.",
+                          lambda: len(polite_rewriter))
+metrics_registry.callback("bully_campaign_lookups_total", "Campaign index lookups: near-duplicate hits, new campaigns, too short.",
+                          lambda: {(result,): campaign_index.stats()[key] for result, key in
+                                   (("hit", "hits"), ("miss", "misses"), ("skipped", "skipped"))},
+                          ["result"], type="counter")
+metrics_registry.callback("bully_campaign_reused_scores_total", "Model scores reused from a campaign's first post.",
+                          lambda: campaign_counters["reused"], type="counter")
+metrics_registry.callback("bully_campaigns_tracked", "Campaigns held in the near-duplicate index.",
+                          lambda: len(campaign_index))
+metrics_registry.callback("bully_campaign_index_bytes", "Approximate memory of the near-duplicate index.",
+                          campaign_index.memory_bytes)
+metrics_registry.callback("bully_report_export_total", "Reports handed to the export sink, by outcome.",
+                          lambda: {(k,): v for k, v in report_exporter.stats().items()
+                                   if k in ("sent", "spilled", "replayed", "rejected", "dropped")}
+                          if report_exporter is not None else None, ["result"], type="counter")
+metrics_registry.callback("bully_report_export_queue_depth", "Reports waiting to be exported.",
+                          lambda: report_exporter.stats()["queue_depth"] if report_exporter is not None else None)
+metrics_registry.callback("bully_report_export_journal_bytes", "Size of the export spill journal.",
+                          lambda: report_exporter.journal_bytes() if report_exporter is not None else None)
+metrics_registry.callback("bully_reports_stored", "Cyber Hub reports in the report store, by priority.",
+                          lambda: {(p,): n for p, n in report_store.priority_counts().items()}, ["priority"])
+
+
+model_status["import_seconds"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+if MODEL_WARMUP == "eager":
+    load_model()
+elif MODEL_WARMUP == "background":
+    start_warmup()
+
+
 # --------- RUN ----------
 if __name__ == "__main__":
+    if MODEL_WARMUP == "lazy":
+        start_warmup()
     port = int(os.environ.get("PORT", 10000))
     app.run(host="0.0.0.0", port=port)
 
@@ -0,0 +1,218 @@
+"""Near-duplicate campaign detection with MinHash LSH.
+
+Scam campaigns send the same message thousands of times with small edits
+(another amount, phone number, emoji or link), which exact-match caches
+never see as equal. CampaignIndex gives every text a MinHash signature over
+its character shingles and files it under ``bands`` LSH buckets; a new text
+only compares against the campaigns sharing one of its buckets, so a lookup
+costs the same whether the index holds a hundred campaigns or a million.
+
+A text whose estimated Jaccard similarity to a campaign's representative
+reaches ``threshold`` joins that campaign; anything else starts a new
+campaign. A member may only reuse the campaign's model score when
+Campaign.covers() its text: every normalized token already appears in the
+representative, so text added to a known message is never skipped. 128 permutations keep the standard
+error of that estimate near 0.035 at the default threshold. Campaigns live in an LRU capped at
+``max_campaigns``, so memory stays fixed however many messages stream
+through; only campaigns are stored, never the individual copies.
+"""
+import hashlib
+import heapq
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Characters of the first text kept for display.
+SAMPLE_CHARS = 60
+
+_BASE = np.uint64(257)
+_SHIFT = np.uint64(32)
+# A bucket key (a Python int) referenced from a bucket dict.
+_BUCKET_ENTRY_BYTES = 32
+
+_NORMALIZE_RE = re.compile(r"[^\w]+")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def normalize(text):
+    """Lowercase, every number as "0", punctuation and whitespace as one space."""
+    return _NORMALIZE_RE.sub(" ", _DIGITS_RE.sub("0", text.lower())).strip()
+
+
+class Campaign:
+    __slots__ = ("id", "signature", "tokens", "sample", "media", "score",
+                 "size", "first_seen", "last_seen", "nbytes")
+
+    def __init__(self, campaign_id, signature, tokens, sample, media, now):
+        self.id = campaign_id
+        self.signature = signature
+        self.tokens = tokens
+        self.sample = sample
+        self.media = media
+        self.score = None  # set by the caller once the representative is scored
+        self.size = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.nbytes = (sys.getsizeof(self) + sys.getsizeof(signature)
+                       + sys.getsizeof(campaign_id) + sys.getsizeof(sample) + sys.getsizeof(0.0)
+                       + sys.getsizeof(tokens) + sum(sys.getsizeof(t) for t in tokens))
+
+    def covers(self, text):
+        """Whether every normalized token of ``text`` appears in the representative."""
+        return self.tokens.issuperset(normalize(text).split())
+
+    def to_dict(self):
+        return {
+            "campaign_id": self.id,
+            "size": self.size,
+            "sample": self.sample,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+        }
+
+
+class CampaignIndex:
+    """LSH index of campaigns, keyed by MinHash signatures of their first text."""
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16, shingle=5,
+                 max_campaigns=100000, min_chars=24, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self.shingle = int(shingle)
+        self.max_campaigns = max(1, int(max_campaigns))
+        self.min_chars = int(min_chars)
+        # Multiply-shift hashing: h(x) = (a * x + b) >> 32 in wrapping 64-bit
+        # arithmetic, one (odd a, b) pair per permutation.
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 63, self.num_perm, dtype=np.uint64)[:, None] | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, self.num_perm, dtype=np.uint64)[:, None]
+        self._buckets = [{} for _ in range(self.bands)]
+        self._campaigns = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+
+    def signature(self, text):
+        """MinHash signature (``num_perm`` uint32) of a text's character shingles, or None if too short."""
+        data = normalize(text).encode("utf-8")
+        if len(data) < max(self.min_chars, self.shingle):
+            return None
+        # Polynomial rolling hash of every ``shingle``-byte window.
+        chars = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+        n = len(chars) - self.shingle + 1
+        shingles = chars[:n].copy()
+        for offset in range(1, self.shingle):
+            shingles *= _BASE
+            shingles += chars[offset:offset + n]
+        return ((self._a * shingles + self._b) >> _SHIFT).min(axis=1).astype(np.uint32)
+
+    def assign(self, text, media=None, now=None):
+        """Return ``(campaign, similarity)`` for ``text``, or None for texts too short to index.
+
+        ``campaign.size == 1`` means the text started a new campaign.
+        """
+        signature = self.signature(text)
+        if signature is None:
+            with self._lock:
+                self.skipped += 1
+            return None
+        now = time.time() if now is None else now
+        raw = signature.tobytes()
+        keys = self._band_keys(raw)
+        with self._lock:
+            best, best_similarity = None, 0.0
+            seen = set()
+            for bucket, key in zip(self._buckets, keys):
+                candidate = bucket.get(key)
+                if candidate is None or candidate.id in seen:
+                    continue
+                seen.add(candidate.id)
+                agree = np.count_nonzero(np.frombuffer(candidate.signature, dtype=np.uint32) == signature)
+                similarity = float(agree) / self.num_perm
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None and best_similarity >= self.threshold:
+                best.size += 1
+                best.last_seen = now
+                self._campaigns.move_to_end(best.id)
+                self.hits += 1
+                return best, best_similarity
+
+            campaign_id = f"CAMP-{hashlib.sha1(raw).hexdigest()[:8].upper()}"
+            campaign = Campaign(campaign_id, raw, frozenset(normalize(text).split()),
+                                text[:SAMPLE_CHARS], media, now)
+            stale = self._campaigns.pop(campaign_id, None)
+            if stale is not None:
+                self._forget(stale)
+            self._campaigns[campaign_id] = campaign
+            for bucket, key in zip(self._buckets, keys):
+                if bucket.setdefault(key, campaign) is campaign:
+                    campaign.nbytes += _BUCKET_ENTRY_BYTES
+            self._bytes += campaign.nbytes
+            while len(self._campaigns) > self.max_campaigns:
+                self._forget(self._campaigns.popitem(last=False)[1])
+                self.evictions += 1
+            self.misses += 1
+            return campaign, 1.0
+
+    def get(self, campaign_id):
+        with self._lock:
+            campaign = self._campaigns.get(campaign_id)
+            return campaign.to_dict() if campaign else None
+
+    def top(self, k=10, min_size=2):
+        """The ``k`` largest campaigns with at least ``min_size`` messages."""
+        with self._lock:
+            campaigns = (c for c in self._campaigns.values() if c.size >= min_size)
+            return [c.to_dict() for c in heapq.nlargest(k, campaigns, key=lambda c: c.size)]
+
+    def clear(self):
+        with self._lock:
+            self._campaigns.clear()
+            for bucket in self._buckets:
+                bucket.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._campaigns)
+
+    def memory_bytes(self):
+        """Approximate bytes held by the index (signatures, stored scores, buckets, LRU)."""
+        return self._bytes + sys.getsizeof(self._campaigns) + sum(sys.getsizeof(b) for b in self._buckets)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tracked": len(self._campaigns),
+                "max_campaigns": self.max_campaigns,
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "evictions": self.evictions,
+                "dedup_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_bytes": self.memory_bytes(),
+                "threshold": self.threshold,
+            }
+
+    def _band_keys(self, raw):
+        width = self.rows * 4
+        return [hash(raw[band * width:(band + 1) * width]) for band in range(self.bands)]
+
+    def _forget(self, campaign):
+        # Caller holds the lock.
+        self._bytes -= campaign.nbytes
+        for bucket, key in zip(self._buckets, self._band_keys(campaign.signature)):
+            if bucket.get(key) is campaign:
+                del bucket[key]
@@ -0,0 +1,94 @@
+"""Length-aware batching and overlapping-window chunking for the model.
+
+The pipeline pads every batch to its longest member and the model cannot
+see past its token limit. So before texts reach the model:
+
+* texts longer than the limit are split into overlapping windows, scored
+  like any other text and combined back into one score per text, and
+* all pieces are sorted by token length and batched in that order, so each
+  batch holds similar lengths and little compute is spent on padding.
+
+Token positions come from the backend's fast tokenizer when it has one
+(offset mapping), otherwise from whitespace-separated words. Only texts
+that may not fit need them: the rest are bucketed by estimate_tokens(),
+so the pipeline stays the only thing that tokenizes them.
+"""
+import math
+import re
+
+_WORD_RE = re.compile(r"\S+")
+
+COMBINERS = ("max", "mean", "softmax")
+
+
+def token_spans(texts, tokenizer=None):
+    """``(start, end)`` character offsets of every token, one list per text."""
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        encoded = tokenizer(list(texts), add_special_tokens=False, return_offsets_mapping=True)
+        return [[tuple(span) for span in offsets] for offsets in encoded["offset_mapping"]]
+    return [[m.span() for m in _WORD_RE.finditer(text)] for text in texts]
+
+
+def may_overflow(text, window):
+    """Whether ``text`` can exceed ``window`` tokens; every token covers at least one UTF-8 byte."""
+    return len(text.encode("utf-8")) > window
+
+
+def estimate_tokens(text):
+    """Cheap token count for bucketing: one per word or per four characters, whichever is more."""
+    return max(len(text.split()), -(-len(text) // 4))
+
+
+def split_windows(text, spans, window, stride):
+    """Split ``text`` into windows of at most ``window`` tokens overlapping by ``stride``.
+
+    Returns ``[(piece, token count)]``; a text that fits is returned whole.
+    """
+    if len(spans) <= window:
+        return [(text, len(spans))]
+    step = max(1, window - stride)
+    pieces = []
+    for start in range(0, len(spans), step):
+        end = min(start + window, len(spans))
+        pieces.append((text[spans[start][0]:spans[end - 1][1]], end - start))
+        if end == len(spans):
+            break
+    return pieces
+
+
+def length_sorted_batches(lengths, batch_size):
+    """Index batches in ascending length order (each batch holds similar lengths)."""
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def arrival_batches(lengths, batch_size):
+    """Index batches in input order (no length bucketing)."""
+    return [list(range(i, min(i + batch_size, len(lengths)))) for i in range(0, len(lengths), batch_size)]
+
+
+def padding_waste(lengths, batches):
+    """``(real tokens, padded tokens)`` when each batch pads to its longest member."""
+    real = sum(lengths)
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
+    return real, padded
+
+
+def combine(scores, how="max", temperature=0.1):
+    """One score from the scores of a text's windows.
+
+    ``max`` flags a text if any window is toxic, ``mean`` averages them, and
+    ``softmax`` weights each window by exp(score / temperature) so the most
+    toxic windows dominate without ignoring the rest.
+    """
+    if len(scores) == 1:
+        return scores[0]
+    if how == "max":
+        return max(scores)
+    if how == "mean":
+        return sum(scores) / len(scores)
+    if how == "softmax":
+        top = max(scores)
+        weights = [math.exp((s - top) / temperature) for s in scores]
+        return sum(w * s for w, s in zip(weights, scores)) / sum(weights)
+    raise ValueError(f"Unknown combiner {how!r} (expected one of {', '.join(COMBINERS)})")
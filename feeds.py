@@ -0,0 +1,116 @@
+"""Append-only feed sources with per-platform watermarks.
+
+A FeedSource yields ``(position, post)`` pairs in arrival order, where
+``position`` is the watermark to store once that post has been processed.
+Reading again from a stored watermark returns only the posts that arrived
+after it, so a scan costs O(new posts) instead of O(all posts).
+"""
+import json
+import os
+import tempfile
+import threading
+
+# Fields every post must carry as strings (see bully_detector._scan_result).
+REQUIRED_FIELDS = ("user", "content", "type")
+
+
+class FeedSource:
+    """A platform feed that only ever grows at the end."""
+
+    def read(self, watermark=None):
+        """Yield ``(position, post)`` for every post after ``watermark``."""
+        raise NotImplementedError
+
+
+class ListFeedSource(FeedSource):
+    """Feed backed by an in-memory list (the simulated posts). Watermark = posts consumed."""
+
+    def __init__(self, posts):
+        self.posts = posts
+
+    def read(self, watermark=None):
+        for i in range(watermark or 0, len(self.posts)):
+            yield i + 1, self.posts[i]
+
+
+class JsonlFeedSource(FeedSource):
+    """Tails a JSONL file of posts. Watermark = byte offset after the last consumed line.
+
+    A trailing line without a newline is treated as still being written and
+    is left for the next read. Complete lines that are not a JSON object with
+    string REQUIRED_FIELDS are logged, counted in ``skipped`` and passed over,
+    so one bad line cannot stall the feed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.skipped = 0
+        self._checked_to = 0  # bad lines before this offset were already counted
+
+    def read(self, watermark=None):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(watermark or 0)
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    return
+                if not line.strip():
+                    continue
+                try:
+                    post = json.loads(line)
+                except ValueError:
+                    post = None
+                if not isinstance(post, dict) or not all(isinstance(post.get(k), str) for k in REQUIRED_FIELDS):
+                    if f.tell() > self._checked_to:
+                        self.skipped += 1
+                        print(f"[!] Skipping malformed post at byte {f.tell() - len(line)} of {self.path}")
+                    self._checked_to = max(self._checked_to, f.tell())
+                    continue
+                self._checked_to = max(self._checked_to, f.tell())
+                yield f.tell(), post
+
+
+class WatermarkStore:
+    """Per-platform watermarks, optionally persisted to a JSON file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._marks = json.load(f)
+
+    def get(self, platform):
+        with self._lock:
+            return self._marks.get(platform)
+
+    def set(self, platform, watermark):
+        with self._lock:
+            self._marks[platform] = watermark
+            self._save()
+
+    def reset(self, platform=None):
+        with self._lock:
+            if platform is None:
+                self._marks.clear()
+            else:
+                self._marks.pop(platform, None)
+            self._save()
+
+    def all(self):
+        with self._lock:
+            return dict(self._marks)
+
+    def _save(self):
+        # Caller holds the lock. Write-then-rename so a crash never leaves a
+        # half-written file.
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".watermarks-")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._marks, f)
+        os.replace(tmp, self.path)
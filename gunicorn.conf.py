@@ -0,0 +1,58 @@
+"""Gunicorn config: load toxic-bert once in the master and fork workers from it.
+
+    gunicorn -c gunicorn.conf.py bully_detector:app
+
+With ``preload_app`` the master imports ``bully_detector`` (and, because
+MODEL_WARMUP defaults to "eager" here, loads the model) before forking, so
+every worker shares the weights copy-on-write instead of holding its own
+copy. Each worker then gets its own slice of the CPU cores for torch.
+
+Environment:
+    PORT             listen port (default 10000)
+    WEB_CONCURRENCY  worker processes (default 2)
+    GUNICORN_THREADS request threads per worker (default 4, gthread)
+    TORCH_THREADS    torch intra-op threads per worker (default cores / workers)
+    PRELOAD_APP      "0" to load the model separately in every worker
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = 120
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", max(1, (os.cpu_count() or 1) // workers)))
+
+# Read by bully_detector at import time, which happens in the master when
+# preloading. OMP/MKL pick these up when torch is first imported.
+os.environ.setdefault("MODEL_WARMUP", "eager")
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_THREADS))
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any fork. Moving
+    # everything into the permanent GC generation stops the workers' garbage
+    # collector from writing to (and so un-sharing) the preloaded pages.
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+        server.log.info("Model preloaded in master; workers will share it copy-on-write")
+
+
+def post_fork(server, worker):
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already fixed once any parallel work has run in this process.
+        pass
+    server.log.info(f"Worker {worker.pid}: torch using {TORCH_THREADS} thread(s)")
@@ -0,0 +1,204 @@
+"""Content-addressed cache for toxicity model scores.
+
+Entries are keyed on a SHA-256 of the normalized text and hold only the
+deterministic model score (never the random meme / noise fields built on top
+of it). The in-memory tier is a bounded LRU with a TTL; an optional SQLite
+file adds a disk tier that survives process restarts and is shared by every
+worker pointing at the same path. The disk tier is swept every
+``sweep_every`` written rows: expired rows are deleted, then the oldest rows
+beyond ``disk_max_entries``.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFC, trimmed, single spaces."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class InferenceCache:
+    """LRU + TTL cache of model scores with an optional SQLite disk tier."""
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600, disk_path=None, namespace="",
+                 disk_max_entries=1000000, sweep_every=1000):
+        self.max_entries = max(0, int(max_entries))
+        self.disk_max_entries = max(1, int(disk_max_entries))
+        self.sweep_every = max(1, int(sweep_every))
+        self._unswept = 0
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self.disk_path = disk_path
+        self.namespace = namespace
+        self._entries = OrderedDict()  # key -> (score, stored_at)
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_pid = None
+
+        # Stats
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_pruned = 0
+
+    def key(self, text):
+        data = f"{self.namespace}\x00{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, text):
+        """Return the cached score for ``text`` or None."""
+        return self._get_key(self.key(text))
+
+    def put(self, text, score):
+        self._put_key(self.key(text), score)
+
+    def get_many(self, texts):
+        """Return a list of cached scores (None for misses), one per text."""
+        return [self.get(text) for text in texts]
+
+    def put_many(self, texts, scores):
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, score in zip(texts, scores):
+                key = self.key(text)
+                self._store(key, score, now)
+                rows.append((key, float(score), now))
+        self._disk_write(rows)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        conn = self._disk_conn()
+        if conn is not None:
+            with self._lock:
+                conn.execute("DELETE FROM scores")
+                conn.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0,
+            "disk_path": self.disk_path,
+            "disk_pruned": self.disk_pruned,
+        }
+
+    # Memory tier
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _get_key(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                score, stored_at = entry
+                if not self._expired(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return score
+                del self._entries[key]
+                self.expirations += 1
+
+        score = self._disk_read(key, now)
+        with self._lock:
+            if score is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, score, now)
+        return score
+
+    def _put_key(self, key, score):
+        now = time.time()
+        with self._lock:
+            self._store(key, score, now)
+        self._disk_write([(key, float(score), now)])
+
+    def _store(self, key, score, now):
+        # Caller holds the lock.
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (score, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # Disk tier
+
+    def _disk_conn(self):
+        if not self.disk_path:
+            return None
+        # SQLite connections must not cross a fork; reopen in each process.
+        if self._disk is None or self._disk_pid != os.getpid():
+            conn = sqlite3.connect(self.disk_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS scores "
+                         "(key TEXT PRIMARY KEY, score REAL NOT NULL, stored_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_stored_at ON scores (stored_at)")
+            conn.commit()
+            self._disk, self._disk_pid = conn, os.getpid()
+        return self._disk
+
+    def _disk_read(self, key, now):
+        conn = self._disk_conn()
+        if conn is None:
+            return None
+        with self._lock:
+            row = conn.execute("SELECT score, stored_at FROM scores WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[1], now):
+            return None
+        return row[0]
+
+    def _disk_write(self, rows):
+        conn = self._disk_conn()
+        if conn is None or not rows:
+            return
+        with self._lock:
+            conn.executemany("INSERT OR REPLACE INTO scores (key, score, stored_at) VALUES (?, ?, ?)", rows)
+            self._unswept += len(rows)
+            if self._unswept >= self.sweep_every:
+                self._unswept = 0
+                self._sweep_locked(conn, rows[-1][2])
+            conn.commit()
+
+    def sweep(self):
+        """Delete expired disk rows, then the oldest rows over ``disk_max_entries``."""
+        conn = self._disk_conn()
+        if conn is None:
+            return
+        with self._lock:
+            self._sweep_locked(conn, time.time())
+            conn.commit()
+
+    def _sweep_locked(self, conn, now):
+        pruned = 0
+        if self.ttl is not None:
+            pruned += conn.execute("DELETE FROM scores WHERE stored_at < ?", (now - self.ttl,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.disk_max_entries
+        if excess > 0:
+            pruned += conn.execute("DELETE FROM scores WHERE key IN "
+                                   "(SELECT key FROM scores ORDER BY stored_at LIMIT ?)", (excess,)).rowcount
+        self.disk_pruned += pruned
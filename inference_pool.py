@@ -0,0 +1,163 @@
+"""Fixed pool of model-owning worker processes.
+
+Web threads hand texts to the pool and wait on a future instead of running
+tokenization and the forward pass themselves, so web concurrency and model
+concurrency can be sized separately. The number of in-flight requests is
+bounded; past that ``submit`` raises InferencePoolFull right away so the web
+layer can answer 429 instead of queueing without limit.
+"""
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class InferencePoolFull(Exception):
+    """Too many requests are already waiting on the pool."""
+
+
+class InferencePoolUnavailable(Exception):
+    """The worker processes died or the pool is shut down."""
+
+
+def _resolve(path):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+# --------- Child process side ----------
+_target = None
+
+
+def _init_worker(target, warmup, torch_threads):
+    global _target
+    if torch_threads:
+        os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+    _target = _resolve(target)
+    if warmup:
+        _resolve(warmup)()
+
+
+def _run(items):
+    started = time.perf_counter()
+    results = _target(items)
+    return os.getpid(), time.perf_counter() - started, results
+
+
+# --------- Parent process side ----------
+class InferencePool:
+    """Run ``target`` ("module:function", items -> results) in worker processes."""
+
+    def __init__(self, target, processes=2, max_pending=64, warmup=None, torch_threads=1):
+        self.target = target
+        self.processes = max(1, int(processes))
+        self.max_pending = max(1, int(max_pending))
+        self.warmup = warmup
+        self.torch_threads = torch_threads
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._started_at = None
+
+        # Stats
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self._per_process = {}  # pid -> {"tasks", "items", "busy_seconds"}
+
+    def submit(self, items):
+        """Queue ``items`` for one worker call and return a Future of the results."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise InferencePoolFull(f"{self._pending} inference requests already pending")
+            executor = self._ensure_executor()
+            self._pending += 1
+            self.submitted += 1
+        try:
+            future = executor.submit(_run, list(items))
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._finish(None)
+            raise InferencePoolUnavailable(str(e))
+        future.add_done_callback(self._finish)
+        return future
+
+    def __call__(self, items, timeout=None):
+        """Submit ``items`` and block for the results."""
+        future = self.submit(items)
+        try:
+            _, _, results = future.result(timeout=timeout)
+        except BrokenProcessPool as e:
+            raise InferencePoolUnavailable(str(e))
+        except TimeoutError:
+            raise InferencePoolUnavailable(f"no result within {timeout}s")
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            uptime = time.time() - self._started_at if self._started_at else 0
+            processes = {
+                str(pid): {
+                    **info,
+                    "busy_seconds": round(info["busy_seconds"], 4),
+                    "utilization": round(info["busy_seconds"] / uptime, 4) if uptime else 0,
+                }
+                for pid, info in self._per_process.items()
+            }
+            return {
+                "processes": self.processes,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "uptime_seconds": round(uptime, 3),
+                "per_process": processes,
+            }
+
+    def _ensure_executor(self):
+        # Caller holds the lock. Spawn (not fork) so workers never inherit
+        # the web process's threads or torch state.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.target, self.warmup, self.torch_threads),
+            )
+            self._started_at = time.time()
+        return self._executor
+
+    def _finish(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future is None:
+                return
+            if future.cancelled():
+                self.failed += 1
+                return
+            if future.exception() is not None:
+                self.failed += 1
+                if isinstance(future.exception(), BrokenProcessPool):
+                    # Start fresh processes on the next submit.
+                    self._executor = None
+                return
+            pid, busy, results = future.result()
+            info = self._per_process.setdefault(pid, {"tasks": 0, "items": 0, "busy_seconds": 0.0})
+            info["tasks"] += 1
+            info["items"] += len(results)
+            info["busy_seconds"] += busy
@@ -0,0 +1,42 @@
+"""Precompiled regex matching for the fraud / fake media pattern lists."""
+import re
+
+# A leading global inline flag group such as "(?i)".
+_LEADING_FLAGS = re.compile(r"^\(\?([imsx]+)\)")
+
+
+def _scoped(pattern):
+    """Turn a leading "(?i)..." into "(?i:...)" so it can sit in an alternation."""
+    m = _LEADING_FLAGS.match(pattern)
+    if m:
+        return f"(?{m.group(1)}:{pattern[m.end():]})"
+    return f"(?:{pattern})"
+
+
+class PatternMatcher:
+    """Match a text against an ordered list of regex patterns.
+
+    All patterns are compiled once. A single combined alternation is scanned
+    first; texts that hit none of the patterns (the common case) are rejected
+    in that one pass. Otherwise each pattern is searched once, so the result
+    is exactly what ``re.search(pattern, text).group(0)`` gives per pattern.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._compiled = [re.compile(p) for p in self.patterns]
+        self._any = re.compile("|".join(_scoped(p) for p in self.patterns))
+
+    def matches(self, text):
+        """Return the first match of every pattern that hits, in pattern order."""
+        if not self._any.search(text):
+            return []
+        hits = []
+        for pattern in self._compiled:
+            m = pattern.search(text)
+            if m:
+                hits.append(m.group(0))
+        return hits
+
+    def any(self, text):
+        return self._any.search(text) is not None
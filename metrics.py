@@ -0,0 +1,243 @@
+"""In-process metrics with a Prometheus text exposition.
+
+Counters and histograms are plain dicts behind a lock, keyed by label
+values, so recording a sample costs a couple of microseconds and can stay on
+under load. Values that other components already track (cache hits, report
+counts) are read through callbacks at scrape time instead of being
+duplicated. Every process exposes its own numbers; with several gunicorn
+workers, Prometheus scrapes (or a sidecar sums) each one.
+
+Profiler adds an optional sampled cProfile capture for deep dives.
+"""
+import bisect
+import cProfile
+import functools
+import io
+import pstats
+import random
+import threading
+import time
+
+# Seconds; fine-grained at the low end where the regex stages live.
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._values.get(labelvalues, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labelvalues -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def time(self, *labelvalues):
+        """Context manager observing the seconds spent inside it."""
+        return _Timer(self, labelvalues)
+
+    def count(self, *labelvalues):
+        state = self._values.get(labelvalues)
+        return sum(state[:-1]) if state else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labelvalues, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(state[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram, self.labelvalues = histogram, labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+        return False
+
+
+class CallbackMetric:
+    """A gauge or counter whose samples come from ``fn()`` at scrape time.
+
+    ``fn`` returns a number, or ``{labelvalues tuple: number}`` for labelled
+    samples; None means "nothing to report".
+    """
+
+    def __init__(self, name, help, fn, labelnames=(), type="gauge"):
+        self.name, self.help, self.fn, self.labelnames, self.type = name, help, fn, tuple(labelnames), type
+
+    def render(self):
+        values = self.fn()
+        if values is None:
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labelvalues, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, labelnames=(), type="gauge"):
+        return self.register(CallbackMetric(name, help, fn, labelnames, type))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = list(metric.render())
+            except Exception as e:
+                # A failing callback must not take the whole scrape down.
+                lines.append(f"# {metric.name} unavailable: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+def timed(histogram, *labelvalues, enabled=True):
+    """Decorator observing each call's duration in ``histogram``.
+
+    With ``enabled=False`` the function is returned untouched (zero overhead).
+    """
+    def decorate(fn):
+        if not enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labelvalues)
+        return wrapper
+    return decorate
+
+
+class Profiler:
+    """Sampled cProfile capture: profiles ``sample_rate`` of requests, merged into one report.
+
+    Only one request is profiled at a time (the interpreter allows a single
+    active profiler); requests arriving meanwhile are simply not sampled.
+    """
+
+    def __init__(self, sample_rate=0.0):
+        self.sample_rate = float(sample_rate)
+        self.sampled = 0
+        self._busy = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = None
+        self._rng = random.Random()
+
+    def start(self):
+        """Return a running profile for this request, or None if it is not sampled."""
+        if self.sample_rate <= 0 or self._rng.random() >= self.sample_rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active.
+            self._busy.release()
+            return None
+        return profile
+
+    def stop(self, profile):
+        if profile is None:
+            return
+        profile.disable()
+        self._busy.release()
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.sampled += 1
+
+    def report(self, sort="cumulative", limit=30, reset=False):
+        """Text table of the merged profiles (the pstats format)."""
+        with self._stats_lock:
+            if self._stats is None:
+                return f"No profiles captured yet (sample rate {self.sample_rate}).\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            out.write(f"{self.sampled} sampled requests\n")
+            self._stats.sort_stats(sort).print_stats(limit)
+            if reset:
+                self._stats, self.sampled = None, 0
+            return out.getvalue()
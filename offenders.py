@@ -0,0 +1,180 @@
+"""Streaming per-user offender index.
+
+Each (platform, user) that posts something at or above ``min_severity``
+gets a small fixed-size record:
+
+* a ring of ``buckets`` counters covering the last ``window_seconds``
+  (a sliding window at bucket resolution) plus its running total, and
+* a severity score that halves every ``half_life_seconds``.
+
+Both update in O(1) per post. A post passed with a ``post_id`` is counted
+once however often it is re-analyzed; the ids seen are kept in an LRU of
+``max_posts`` hashes. Records live in an LRU capped at
+``max_users`` (roughly 0.5 KiB each), so memory stays fixed however many
+distinct users appear; the least recently active users are forgotten
+first. top() ranks users with heapq.nlargest in O(n log k) instead of
+sorting everyone.
+"""
+import heapq
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+
+class _Offender:
+    __slots__ = ("platform", "user", "buckets", "epoch", "window_hits",
+                 "score", "updated", "total_hits", "max_severity")
+
+    def __init__(self, platform, user, n_buckets, epoch, now):
+        self.platform = platform
+        self.user = user
+        self.buckets = array("I", bytes(4 * n_buckets))
+        self.epoch = epoch  # bucket number of the newest slot
+        self.window_hits = 0
+        self.score = 0.0
+        self.updated = now
+        self.total_hits = 0
+        self.max_severity = 0.0
+
+
+class OffenderIndex:
+    """Bounded index of repeat offenders keyed by (platform, user)."""
+
+    def __init__(self, max_users=100000, window_seconds=3600, buckets=12,
+                 half_life_seconds=3600, min_severity=0.25, max_posts=None):
+        self.max_users = max(1, int(max_users))
+        self.max_posts = max(1, int(max_posts if max_posts is not None else max_users))
+        self.window_seconds = float(window_seconds)
+        self.n_buckets = max(1, int(buckets))
+        self.bucket_seconds = self.window_seconds / self.n_buckets
+        self.half_life = float(half_life_seconds)
+        self.min_severity = float(min_severity)
+        self._users = OrderedDict()
+        self._posts = OrderedDict()
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.repeats = 0
+        self.evictions = 0
+
+    def record(self, platform, user, severity, now=None, post_id=None):
+        """Count one post by ``user``; return its history (None below min_severity).
+
+        A ``post_id`` already counted is not counted again.
+        """
+        if severity < self.min_severity:
+            return self.get(platform, user, now)
+        now = time.time() if now is None else now
+        epoch = int(now // self.bucket_seconds)
+        key = (platform, user)
+        with self._lock:
+            if post_id is not None:
+                post_hash = hash(post_id)
+                if post_hash in self._posts:
+                    self._posts.move_to_end(post_hash)
+                    self.repeats += 1
+                    offender = self._users.get(key)
+                    return self._snapshot(offender, now, epoch) if offender else None
+                self._posts[post_hash] = None
+                if len(self._posts) > self.max_posts:
+                    self._posts.popitem(last=False)
+            offender = self._users.get(key)
+            if offender is None:
+                offender = self._users[key] = _Offender(platform, user, self.n_buckets, epoch, now)
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._users.move_to_end(key)
+                self._advance(offender, epoch)
+
+            offender.buckets[epoch % self.n_buckets] += 1
+            offender.window_hits += 1
+            offender.score = self._decayed(offender, now) + severity
+            offender.updated = now
+            offender.total_hits += 1
+            offender.max_severity = max(offender.max_severity, severity)
+            self.recorded += 1
+            return self._snapshot(offender, now, epoch)
+
+    def get(self, platform, user, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            offender = self._users.get((platform, user))
+            if offender is None:
+                return None
+            return self._snapshot(offender, now, int(now // self.bucket_seconds))
+
+    def top(self, k=10, by="score", platform=None, now=None):
+        """The ``k`` worst offenders by decayed ``score`` or ``window_hits``."""
+        now = time.time() if now is None else now
+        epoch = int(now // self.bucket_seconds)
+        with self._lock:
+            offenders = [o for o in self._users.values() if platform is None or o.platform == platform]
+            if by == "window_hits":
+                rank = lambda o: self._hits_at(o, epoch)
+            else:
+                rank = lambda o: self._decayed(o, now)
+            worst = heapq.nlargest(k, offenders, key=rank)
+            return [self._snapshot(o, now, epoch) for o in worst]
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._posts.clear()
+
+    def __len__(self):
+        return len(self._users)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "max_users": self.max_users,
+                "recorded": self.recorded,
+                "repeats": self.repeats,
+                "evictions": self.evictions,
+                "window_seconds": self.window_seconds,
+                "half_life_seconds": self.half_life,
+            }
+
+    # Internals (caller holds the lock)
+
+    def _advance(self, offender, epoch):
+        # Zero the slots that fell out of the window; at most n_buckets steps.
+        gap = epoch - offender.epoch
+        if gap <= 0:
+            return
+        if gap >= self.n_buckets:
+            offender.buckets = array("I", bytes(4 * self.n_buckets))
+            offender.window_hits = 0
+        else:
+            for step in range(1, gap + 1):
+                slot = (offender.epoch + step) % self.n_buckets
+                offender.window_hits -= offender.buckets[slot]
+                offender.buckets[slot] = 0
+        offender.epoch = epoch
+
+    def _hits_at(self, offender, epoch):
+        # window_hits as of ``epoch`` without mutating the record.
+        gap = epoch - offender.epoch
+        if gap <= 0:
+            return offender.window_hits
+        if gap >= self.n_buckets:
+            return 0
+        return offender.window_hits - sum(offender.buckets[(offender.epoch + step) % self.n_buckets]
+                                          for step in range(1, gap + 1))
+
+    def _decayed(self, offender, now):
+        return offender.score * 0.5 ** (max(0.0, now - offender.updated) / self.half_life)
+
+    def _snapshot(self, offender, now, epoch):
+        return {
+            "platform": offender.platform,
+            "user": offender.user,
+            "window_hits": self._hits_at(offender, epoch),
+            "score": round(self._decayed(offender, now), 4),
+            "total_hits": offender.total_hits,
+            "max_severity": round(offender.max_severity, 4),
+            "last_seen": offender.updated,
+        }
@@ -0,0 +1,118 @@
+"""Cheap first-stage screen that decides whether a text needs the model.
+
+Every text gets a tier:
+
+* ``benign``  – no toxic keywords, no fraud / fake media patterns, and a
+  confidence above the threshold. The model is skipped.
+* ``fraud``   – clearly a scam by the fraud patterns with no toxic keywords.
+  The fraud score already drives the verdict, so the model is skipped.
+* ``model``   – anything else escalates to the transformer.
+
+Skipped texts get ``benign_score`` as their toxicity score.
+"""
+import re
+import threading
+
+TIERS = ("benign", "fraud", "model")
+
+# "you" as the subject/object of a sentence is a much stronger sign of a
+# targeted message than the possessive "your".
+_SECOND_PERSON = re.compile(r"\b(?:you|you're|youre|ur|u)\b", re.IGNORECASE)
+_POSSESSIVE = re.compile(r"\byour\b", re.IGNORECASE)
+
+
+class PreScreen:
+    """Keyword / regex / length screen in front of the toxicity model."""
+
+    def __init__(self, lexicon, fraud_matcher, fake_matcher, threshold=0.85,
+                 benign_score=0.1, max_chars=280):
+        self.lexicon = sorted({word.lower() for word in lexicon})
+        self.fraud_matcher = fraud_matcher
+        self.fake_matcher = fake_matcher
+        self.threshold = float(threshold)
+        self.benign_score = float(benign_score)
+        self.max_chars = int(max_chars)
+        self._lexicon_re = re.compile("|".join(re.escape(w) for w in self.lexicon))
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(TIERS, 0)
+
+    def confidence(self, text):
+        """How sure the cheap stage is that ``text`` is not toxic (0..1)."""
+        lowered = text.lower()
+        if self._lexicon_re.search(lowered):
+            return 0.0
+        confidence = 1.0
+        # Long messages and messages aimed at someone are where the model
+        # catches insults the lexicon does not know about.
+        if len(text) > self.max_chars:
+            confidence -= 0.3
+        if _SECOND_PERSON.search(lowered):
+            confidence -= 0.2
+        elif _POSSESSIVE.search(lowered):
+            confidence -= 0.05
+        letters = [c for c in text if c.isalpha()]
+        if len(letters) >= 8 and sum(c.isupper() for c in letters) / len(letters) > 0.6:
+            confidence -= 0.1
+        return max(0.0, confidence)
+
+    def classify(self, text):
+        """Return ``(tier, confidence)`` without touching the counters."""
+        confidence = self.confidence(text)
+        if confidence < self.threshold or self.fake_matcher.any(text):
+            return "model", confidence
+        if len(self.fraud_matcher.matches(text)) >= 2:
+            return "fraud", confidence
+        if self.fraud_matcher.any(text):
+            return "model", confidence
+        return "benign", confidence
+
+    def screen(self, text):
+        """Return a toxicity score for ``text`` if the model can be skipped, else None."""
+        tier, _ = self.classify(text)
+        with self._lock:
+            self.counts[tier] += 1
+        return None if tier == "model" else self.benign_score
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        skipped = total - counts["model"]
+        return {
+            "tiers": counts,
+            "screened": total,
+            "skipped_model": skipped,
+            "skip_rate": round(skipped / total, 4) if total else 0,
+            "threshold": self.threshold,
+        }
+
+    def evaluate(self, samples, model_fn, toxic_threshold=0.5):
+        """Compare tiered vs model-only verdicts on labeled ``(text, is_toxic)`` samples.
+
+        ``model_fn`` maps a list of texts to toxicity scores. Returns the
+        fraction of texts that skipped the model and the accuracy of both
+        modes against the labels.
+        """
+        samples = list(samples)
+        texts = [text for text, _ in samples]
+        model_scores = model_fn(texts)
+
+        tiers = dict.fromkeys(TIERS, 0)
+        tiered_correct = model_correct = missed_toxic = 0
+        for (text, is_toxic), model_score in zip(samples, model_scores):
+            tier, _ = self.classify(text)
+            tiers[tier] += 1
+            score = model_score if tier == "model" else self.benign_score
+            tiered_correct += (score > toxic_threshold) == bool(is_toxic)
+            model_correct += (model_score > toxic_threshold) == bool(is_toxic)
+            missed_toxic += tier != "model" and bool(is_toxic)
+
+        total = len(samples) or 1
+        return {
+            "samples": len(samples),
+            "tiers": tiers,
+            "skip_rate": round((len(samples) - tiers["model"]) / total, 4),
+            "tiered_accuracy": round(tiered_correct / total, 4),
+            "model_accuracy": round(model_correct / total, 4),
+            "missed_toxic": missed_toxic,
+        }
@@ -0,0 +1,434 @@
+"""Write-behind export of Cyber Hub reports to an external HTTP sink.
+
+submit() only appends the report to a bounded in-memory queue, so request
+latency does not depend on the sink. A background thread sends the queue
+in batches as ``POST {"reports": [...]}`` over keep-alive connections from
+a small pool, retrying timeouts, 408/429 and 5xx answers with exponential
+backoff and jitter (honouring Retry-After).
+
+When the sink stays down, batches are appended to a JSONL journal on disk
+instead, as are reports arriving while the queue is full. Once the sink
+answers again the journal is replayed, oldest first. Delivery is
+at-least-once: a batch can be sent twice after a timeout, so the sink
+should de-duplicate on the report ``id`` (each batch also carries an
+Idempotency-Key header derived from its ids).
+
+The journal is locked with flock() where available, so several worker
+processes can append to one file. To replay, a process first claims the
+journal by renaming it to ``<journal>.<pid>.replay`` under the lock; new
+spills start a fresh journal, and no other process can send or truncate
+the claimed lines. Whatever the sink does not take stays in the claimed
+file and is replayed before the next claim. A claim left by a process that
+died is adopted by the next one to replay.
+"""
+import hashlib
+import http.client
+import json
+import os
+import random
+import shutil
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows: one process per journal
+    fcntl = None
+
+# Statuses worth retrying; any other non-2xx answer rejects the batch.
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class SinkError(Exception):
+    """The sink could not be reached or answered with a retryable status."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HTTPConnectionPool:
+    """Keep-alive connections to one HTTP(S) endpoint, reused across requests."""
+
+    def __init__(self, url, size=2, timeout=5.0):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported sink URL {url!r}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def request(self, method, body, headers):
+        """Return ``(status, headers, body)``; a stale kept-alive connection is retried once."""
+        conn, reused = self._get()
+        try:
+            return self._send(conn, method, body, headers)
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            # The server closed an idle connection; try once on a new one.
+            conn, _ = self._new(), False
+            return self._send(conn, method, body, headers)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _send(self, conn, method, body, headers):
+        try:
+            conn.request(method, self.path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._put(conn)
+        return response.status, dict(response.getheaders()), data
+
+    def _get(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new(), False
+
+    def _new(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.connections_opened += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _put(self, conn):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+class ReportExporter:
+    """Queue reports and forward them to ``url`` from a background thread."""
+
+    def __init__(self, url, journal_path=None, max_queue=10000, batch_size=100, flush_interval=1.0,
+                 timeout=5.0, max_retries=5, backoff_base=0.5, backoff_max=30.0, headers=None, pool_size=2):
+        self.url = url
+        self.journal_path = journal_path
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.pool = HTTPConnectionPool(url, size=pool_size, timeout=timeout)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._journal_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._in_flight = 0
+        self._healthy = True
+        self._next_probe = 0.0
+        self._rng = random.Random()
+
+        # Stats
+        self.counts = {"submitted": 0, "sent": 0, "batches": 0, "retries": 0, "spilled": 0,
+                       "replayed": 0, "rejected": 0, "dropped": 0}
+        self.last_error = None
+
+    def submit(self, report):
+        """Queue a report for export; never blocks on the network."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ReportExporter is closed")
+            self.counts["submitted"] += 1
+            if len(self._queue) < self.max_queue:
+                self._queue.append(report)
+                self._ensure_worker()
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+                return
+        # Queue full: the sink is slow or down; keep the report on disk.
+        self._spill([report])
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far was sent or spilled; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.1)
+        return True
+
+    def close(self, timeout=10.0):
+        """Send what is queued (spilling the rest to the journal) and stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            leftover, self._queue = list(self._queue), deque()
+        if leftover:
+            self._spill(leftover)
+        self.pool.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self.counts,
+                "queue_depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "healthy": self._healthy,
+                "journal_bytes": self.journal_bytes(),
+                "connections_opened": self.pool.connections_opened,
+                "last_error": self.last_error,
+            }
+
+    def journal_bytes(self):
+        """Bytes waiting in the shared journal, this process's claim and claims left by dead processes."""
+        if not self.journal_path:
+            return 0
+        total = 0
+        for path in (self.journal_path, self._claim_path(), *self._orphaned_claims()):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    # Worker thread
+
+    def _ensure_worker(self):
+        # Started lazily so a forking server starts one thread per worker.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="report-exporter", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            deadline = time.monotonic() + self.flush_interval
+            while len(self._queue) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            size = min(len(self._queue), self.batch_size)
+            batch = [self._queue.popleft() for _ in range(size)]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                if batch:
+                    self._deliver(batch)
+                if not self._closed and (self._healthy or time.monotonic() >= self._next_probe):
+                    self._replay_journal()
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+            with self._cond:
+                if not self._queue and (self._closed or not self.journal_bytes()):
+                    # Exit when idle; the next submit() starts a new worker.
+                    self._thread = None
+                    return
+
+    def _deliver(self, batch):
+        """Send one batch, retrying with backoff; spill it to the journal if the sink stays down."""
+        if not self._healthy and time.monotonic() < self._next_probe:
+            self._spill(batch)
+            return
+        retries = self.max_retries if self._healthy else 0  # while down, one probe per backoff_max
+        for attempt in range(retries + 1):
+            try:
+                self._post(batch)
+                return
+            except SinkError as e:
+                if attempt == retries or self._closed:
+                    break
+                self.counts["retries"] += 1
+                time.sleep(self._backoff(attempt, e.retry_after))
+        print(f"[!] Report sink {self.url} unavailable ({self.last_error}); journaling {len(batch)} reports")
+        self._spill(batch)
+
+    def _post(self, batch):
+        ids = "\x00".join(str(report.get("id")) for report in batch)
+        headers = {**self.headers, "Idempotency-Key": hashlib.sha256(ids.encode("utf-8")).hexdigest()[:32]}
+        body = json.dumps({"reports": batch}).encode("utf-8")
+        try:
+            status, response_headers, _ = self.pool.request("POST", body, headers)
+        except (OSError, http.client.HTTPException) as e:
+            self._mark_down(f"{type(e).__name__}: {e}")
+            raise SinkError(self.last_error)
+        if status in RETRY_STATUSES:
+            self._mark_down(f"HTTP {status}")
+            raise SinkError(self.last_error, retry_after=response_headers.get("Retry-After"))
+        self._healthy = True
+        if 200 <= status < 300:
+            self.counts["sent"] += len(batch)
+            self.counts["batches"] += 1
+            return
+        # Retrying a request the sink refuses cannot succeed.
+        self.counts["rejected"] += len(batch)
+        self.last_error = f"HTTP {status}"
+        print(f"[!] Report sink rejected {len(batch)} reports with HTTP {status}")
+
+    def _mark_down(self, error):
+        self.last_error = error
+        self._healthy = False
+        self._next_probe = time.monotonic() + self.backoff_max
+
+    def _backoff(self, attempt, retry_after=None):
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.backoff_max)
+        except ValueError:
+            pass  # an HTTP date; fall back to our own schedule
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * self._rng.uniform(0.5, 1.0)
+
+    # Journal
+
+    def _spill(self, reports):
+        if not self.journal_path:
+            with self._cond:
+                self.counts["dropped"] += len(reports)
+            return
+        lines = b"".join(json.dumps(report).encode("utf-8") + b"\n" for report in reports)
+        with self._journal_lock, self._open_journal() as f:
+            f.write(lines)
+        with self._cond:
+            self.counts["spilled"] += len(reports)
+
+    def _replay_journal(self, chunk_batches=50):
+        """Send journaled reports oldest first; stop at the first failure."""
+        while self.journal_bytes() and not self._closed:
+            claim = self._claim_journal()
+            if claim is None or not self._replay_claim(claim, chunk_batches):
+                return
+            os.remove(claim)
+
+    def _claim_path(self):
+        return f"{self.journal_path}.{os.getpid()}.replay"
+
+    def _claim_journal(self):
+        """This process's claimed journal, claiming the shared one if needed; None if nothing to send."""
+        claim = self._claim_path()
+        if os.path.exists(claim):
+            return claim
+        # Claims of dead processes first, one per pass: each is older than the shared journal.
+        for orphan in self._orphaned_claims():
+            try:
+                os.rename(orphan, claim)
+                print(f"[OK] Adopted unsent reports from {orphan}")
+                return claim
+            except FileNotFoundError:
+                pass  # another process adopted it first
+        with self._journal_lock, self._open_journal() as f:
+            if not os.fstat(f.fileno()).st_size:
+                return None
+            # Still holding the lock: writers waiting on this file see it
+            # was replaced and reopen the path, which starts a new journal.
+            os.rename(self.journal_path, claim)
+        return claim
+
+    def _orphaned_claims(self):
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        prefix = os.path.basename(self.journal_path) + "."
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            pid = name[len(prefix):-len(".replay")]
+            if name.startswith(prefix) and name.endswith(".replay") and pid.isdigit() and not _alive(int(pid)):
+                yield os.path.join(directory, name)
+
+    def _replay_claim(self, claim, chunk_batches):
+        """Send a claimed journal; on failure keep only the unsent lines and return False."""
+        with open(claim, "rb") as f:
+            while True:
+                start = f.tell()
+                if self._closed:
+                    self._keep_from(claim, f, start)
+                    return False
+                lines = []
+                while len(lines) < self.batch_size * chunk_batches:
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                if not lines:
+                    return True
+                reports, line_ends, end = [], [], start
+                for line in lines:
+                    end += len(line)
+                    try:
+                        reports.append(json.loads(line))
+                        line_ends.append(end)
+                    except ValueError:
+                        self.counts["dropped"] += 1
+                        print(f"[!] Skipping unreadable line in {claim}")
+                sent = 0
+                for i in range(0, len(reports), self.batch_size):
+                    try:
+                        self._post(reports[i:i + self.batch_size])
+                    except SinkError:
+                        break
+                    sent = i + len(reports[i:i + self.batch_size])
+                self.counts["replayed"] += sent
+                if sent < len(reports):
+                    self._keep_from(claim, f, line_ends[sent - 1] if sent else start)
+                    return False
+
+    def _keep_from(self, claim, f, offset):
+        # Only this process writes its claim, so no lock is needed.
+        f.seek(offset)
+        tmp = f"{claim}.tmp"
+        with open(tmp, "wb") as out:
+            shutil.copyfileobj(f, out)
+        os.replace(tmp, claim)
+
+    def _open_journal(self):
+        """Open the journal for append, locked against other processes."""
+        while True:
+            f = open(self.journal_path, "a+b")
+            if fcntl is None:
+                return f
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(self.journal_path).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            # Another process replaced the file while we waited; use the new one.
+            f.close()
+
+
+def _alive(pid):
+    if fcntl is None:
+        return False  # Windows: one process per journal, so any other claim is stale
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
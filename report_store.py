@@ -0,0 +1,340 @@
+"""Storage for Cyber Hub reports.
+
+Two interchangeable backends:
+
+* MemoryReportStore – process-local, for tests and single-process dev runs.
+* SQLiteReportStore – a WAL-mode SQLite file shared by every gunicorn worker
+  and kept across restarts. Inserts are buffered and written in batches, and
+  per-priority counters are kept in their own table and updated in the same
+  transaction, so counting never rescans the reports.
+
+Both keep the total and per-priority counts incrementally, so add() and
+the count queries stay O(1) however many reports exist.
+"""
+import base64
+import binascii
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter, deque
+
+PRIORITIES = ("critical", "high", "medium")
+
+# Filter keyword arguments accepted by query().
+FILTERS = ("platform", "priority", "threat_type", "reported_user", "since", "until")
+
+
+class InvalidCursor(ValueError):
+    """The pagination cursor could not be decoded."""
+
+
+def encode_cursor(report):
+    """Opaque keyset cursor pointing just past ``report`` (newest-first order)."""
+    raw = json.dumps([report["timestamp"], report["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return the ``(timestamp, id)`` a cursor points past."""
+    try:
+        timestamp, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(f"Invalid cursor {cursor!r}")
+    return str(timestamp), str(report_id)
+
+
+def _matches(report, filters):
+    if filters.get("platform") and report["platform"] != filters["platform"]:
+        return False
+    if filters.get("priority") and report["priority"] != filters["priority"]:
+        return False
+    if filters.get("reported_user") and report["reported_user"] != filters["reported_user"]:
+        return False
+    if filters.get("threat_type") and not any(t["type"] == filters["threat_type"] for t in report["threats"]):
+        return False
+    if filters.get("since") and report["timestamp"] <= filters["since"]:
+        return False
+    if filters.get("until") and report["timestamp"] > filters["until"]:
+        return False
+    return True
+
+
+class MemoryReportStore:
+    """In-memory report store (newest first)."""
+
+    def __init__(self):
+        self._reports = deque()
+        self._by_id = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, report):
+        with self._lock:
+            if report["id"] in self._by_id:
+                return
+            self._reports.appendleft(report)
+            self._by_id[report["id"]] = report
+            self._counts["total"] += 1
+            self._counts[report["priority"]] += 1
+
+    def get(self, report_id):
+        return self._by_id.get(report_id)
+
+    def contains(self, report_id):
+        return report_id in self._by_id
+
+    def recent(self, limit=None):
+        """Return up to ``limit`` reports, newest first (all if limit is None)."""
+        with self._lock:
+            if limit is None:
+                return list(self._reports)
+            return [r for _, r in zip(range(limit), self._reports)]
+
+    def query(self, limit=50, cursor=None, **filters):
+        """Return ``(reports, next_cursor)``: one newest-first page of matching reports.
+
+        ``since`` (exclusive) and ``until`` (inclusive) bound the ISO timestamp.
+        ``next_cursor`` is None on the last page.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        page = []
+        with self._lock:
+            for report in self._reports:
+                if after is not None and (report["timestamp"], report["id"]) >= after:
+                    continue
+                if filters.get("since") and report["timestamp"] <= filters["since"]:
+                    # Newest first: nothing older can match.
+                    break
+                if _matches(report, filters):
+                    page.append(report)
+                    if len(page) > limit:
+                        break
+        if len(page) > limit:
+            return page[:limit], encode_cursor(page[limit - 1])
+        return page, None
+
+    def count(self):
+        return self._counts["total"]
+
+    def priority_counts(self):
+        return {p: self._counts[p] for p in PRIORITIES}
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteReportStore:
+    """SQLite-backed report store with batched writes and stored counters."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS reports (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            timestamp TEXT NOT NULL,
+            platform TEXT,
+            reported_user TEXT,
+            priority TEXT,
+            overall_severity REAL,
+            action_taken TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reports_timestamp ON reports (timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_reports_platform ON reports (platform, timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_reports_priority ON reports (priority, timestamp, id);
+        CREATE INDEX IF NOT EXISTS idx_reports_user ON reports (reported_user, timestamp, id);
+        CREATE TABLE IF NOT EXISTS report_threats (
+            type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            report_id TEXT NOT NULL,
+            PRIMARY KEY (type, timestamp, report_id)
+        );
+        CREATE TABLE IF NOT EXISTS report_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=0.5):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._conn = None
+        self._conn_pid = None
+        self._flusher = None
+        self._closed = False
+        self._connect()
+
+    # Connection
+
+    def _connect(self):
+        # Connections must not cross a fork; each process opens its own.
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+            self._flusher = None
+        return self._conn
+
+    # Writes
+
+    def add(self, report):
+        with self._lock:
+            self._buffer.append(report)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+            else:
+                self._ensure_flusher()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        conn = self._connect()
+        counts = Counter()
+        inserted = []
+        with conn:
+            for r in batch:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO reports (id, timestamp, platform, reported_user, priority, "
+                    "overall_severity, action_taken, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (r["id"], r["timestamp"], r["platform"], r["reported_user"], r["priority"],
+                     r["overall_severity"], r["action_taken"], json.dumps(r)),
+                )
+                # Ids are idempotency keys: a duplicate (e.g. the same post
+                # auto-reported by another worker) must not bump the counters.
+                if cursor.rowcount == 1:
+                    inserted.append(r)
+                    counts["total"] += 1
+                    counts[r["priority"]] += 1
+            conn.executemany(
+                "INSERT OR IGNORE INTO report_threats (type, timestamp, report_id) VALUES (?, ?, ?)",
+                [(t["type"], r["timestamp"], r["id"]) for r in inserted for t in r["threats"]],
+            )
+            conn.executemany(
+                "INSERT INTO report_counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                list(counts.items()),
+            )
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="report-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        event = threading.Event()
+        while not self._closed:
+            event.wait(self.flush_interval)
+            with self._lock:
+                if not self._buffer:
+                    # Exit when idle; the next add() starts a new flusher.
+                    self._flusher = None
+                    return
+                self._flush_locked()
+
+    # Reads (flush first so a worker always sees its own reports)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._flush_locked()
+            return self._connect().execute(sql, params).fetchall()
+
+    def get(self, report_id):
+        rows = self._query("SELECT data FROM reports WHERE id = ?", (report_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def contains(self, report_id):
+        """Whether ``report_id`` is buffered or stored; unlike get(), does not flush."""
+        with self._lock:
+            if any(r["id"] == report_id for r in self._buffer):
+                return True
+            return self._connect().execute("SELECT 1 FROM reports WHERE id = ?", (report_id,)).fetchone() is not None
+
+    def recent(self, limit=None):
+        """Return up to ``limit`` reports, newest first (all if limit is None)."""
+        rows = self._query("SELECT data FROM reports ORDER BY timestamp DESC, id DESC LIMIT ?",
+                           (-1 if limit is None else int(limit),))
+        return [json.loads(data) for data, in rows]
+
+    def query(self, limit=50, cursor=None, **filters):
+        """Return ``(reports, next_cursor)``: one newest-first page of matching reports.
+
+        ``since`` (exclusive) and ``until`` (inclusive) bound the ISO timestamp.
+        ``next_cursor`` is None on the last page. Every filter and the keyset
+        condition are served by an index, so a page costs the same however
+        many reports are stored.
+        """
+        where, params = [], []
+        if filters.get("threat_type"):
+            table = "report_threats t JOIN reports r ON r.id = t.report_id"
+            key = "t"
+            where.append("t.type = ?")
+            params.append(filters["threat_type"])
+        else:
+            table = "reports r"
+            key = "r"
+        for column in ("platform", "priority", "reported_user"):
+            if filters.get(column):
+                where.append(f"r.{column} = ?")
+                params.append(filters[column])
+        if filters.get("since"):
+            where.append(f"{key}.timestamp > ?")
+            params.append(filters["since"])
+        if filters.get("until"):
+            where.append(f"{key}.timestamp <= ?")
+            params.append(filters["until"])
+        if cursor:
+            timestamp, report_id = decode_cursor(cursor)
+            id_column = "t.report_id" if key == "t" else "r.id"
+            where.append(f"({key}.timestamp < ? OR ({key}.timestamp = ? AND {id_column} < ?))")
+            params.extend([timestamp, timestamp, report_id])
+
+        order = "t.timestamp DESC, t.report_id DESC" if key == "t" else "r.timestamp DESC, r.id DESC"
+        sql = (f"SELECT r.data FROM {table}"
+               + (f" WHERE {' AND '.join(where)}" if where else "")
+               + f" ORDER BY {order} LIMIT ?")
+        rows = self._query(sql, params + [int(limit) + 1])
+        page = [json.loads(data) for data, in rows]
+        if len(page) > limit:
+            return page[:limit], encode_cursor(page[limit - 1])
+        return page, None
+
+    def _counters(self):
+        return dict(self._query("SELECT name, value FROM report_counters"))
+
+    def count(self):
+        return self._counters().get("total", 0)
+
+    def priority_counts(self):
+        counters = self._counters()
+        return {p: counters.get(p, 0) for p in PRIORITIES}
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._closed = True
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def open_report_store(kind="memory", path=None, **kwargs):
+    """Build the report store named by ``kind`` ("memory" or "sqlite")."""
+    if kind == "memory":
+        return MemoryReportStore()
+    if kind == "sqlite":
+        return SQLiteReportStore(path or "cyberhub_reports.db", **kwargs)
+    raise ValueError(f"Unknown report store {kind!r} (expected 'memory' or 'sqlite')")
@@ -0,0 +1,151 @@
+"""Single-pass, word-boundary rewriter for the polite-rewrite lexicon.
+
+All lexicon phrases are compiled into one regex shaped like a trie
+(``(?:f(?:at|ool|reak)|...)``), so at each position the engine follows one
+branch instead of trying every phrase, and the cost per message barely grows
+with the size of the lexicon. Phrases only match as whole words ("die" is
+not rewritten inside "studied"), any run of whitespace matches the space in
+a multi-word phrase, and the replacement takes the case of the original
+("IDIOT" -> "SOMEONE WHO MIGHT NEED HELP", "Idiot" -> "Someone who...").
+
+A lexicon file (JSON object or tab-separated lines) is merged over the
+built-in entries and reloaded when it changes on disk.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+
+def load_lexicon(path):
+    """Read ``{phrase: replacement}`` from a JSON object or a TSV file (``#`` comments)."""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        entries = json.loads(content)
+        if not isinstance(entries, dict):
+            raise ValueError(f"{path}: expected a JSON object of phrase -> replacement")
+        return {str(k): str(v) for k, v in entries.items()}
+    entries = {}
+    for number, line in enumerate(content.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        phrase, sep, replacement = line.partition("\t")
+        if not sep:
+            raise ValueError(f"{path}:{number}: expected 'phrase<TAB>replacement'")
+        entries[phrase.strip()] = replacement.strip()
+    return entries
+
+
+def normalize_phrase(phrase):
+    # casefold() agrees with re.IGNORECASE on characters such as "ſ" (long s)
+    # where lower() does not.
+    return " ".join(phrase.casefold().split())
+
+
+def trie_pattern(phrases):
+    """Regex source matching any of ``phrases`` (already normalized), built from a trie."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True  # end of a phrase
+
+    def render(node):
+        terminal = "" in node
+        branches = []
+        for char in sorted(k for k in node if k):
+            head = r"\s+" if char == " " else re.escape(char)
+            branches.append(head + render(node[char]))
+        if not branches:
+            return ""
+        group = f"(?:{'|'.join(branches)})"
+        # Greedy "?" tries the longer phrase first and backs off to this one.
+        return group + "?" if terminal else group
+
+    return render(trie)
+
+
+def match_case(original, replacement):
+    if original.isupper() and len(original) > 1:
+        return replacement.upper()
+    if original[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class Rewriter:
+    """Compiled rewriter for one lexicon."""
+
+    def __init__(self, lexicon):
+        self.lexicon = {normalize_phrase(k): v for k, v in lexicon.items() if normalize_phrase(k)}
+        if self.lexicon:
+            source = trie_pattern(self.lexicon)
+            self.pattern = re.compile(rf"(?<!\w)(?:{source})(?!\w)", re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    def rewrite(self, text):
+        """Return ``(rewritten text, number of replacements)``."""
+        if self.pattern is None:
+            return text, 0
+        return self.pattern.subn(self._replace, text)
+
+    def _replace(self, match):
+        original = match.group(0)
+        replacement = self.lexicon.get(normalize_phrase(original))
+        # IGNORECASE can still match a spelling that casefolds differently; leave it as written.
+        return original if replacement is None else match_case(original, replacement)
+
+
+class LexiconRewriter:
+    """Rewriter over built-in entries plus an optional hot-reloaded lexicon file.
+
+    The file's modification time is checked at most every ``check_interval``
+    seconds; a file that fails to load keeps the previous lexicon in place.
+    """
+
+    def __init__(self, base, path=None, check_interval=2.0):
+        self.base = dict(base)
+        self.path = path
+        self.check_interval = float(check_interval)
+        self.reloads = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._rewriter = Rewriter(self.base)
+        self._reload()
+
+    def rewrite(self, text):
+        if self.path and time.monotonic() - self._checked >= self.check_interval:
+            self._reload()
+        return self._rewriter.rewrite(text)
+
+    def __len__(self):
+        return len(self._rewriter.lexicon)
+
+    def _reload(self):
+        with self._lock:
+            self._checked = time.monotonic()
+            if not self.path:
+                return
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime == self._mtime:
+                return
+            try:
+                lexicon = {**self.base, **(load_lexicon(self.path) if mtime is not None else {})}
+                rewriter = Rewriter(lexicon)
+            except (OSError, ValueError, re.error) as e:
+                self.errors += 1
+                print(f"[!] Rewrite lexicon {self.path} not loaded: {e}")
+                return
+            self._rewriter, self._mtime = rewriter, mtime
+            self.reloads += 1
+            print(f"[OK] Rewrite lexicon: {len(rewriter.lexicon)} entries")
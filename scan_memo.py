@@ -0,0 +1,66 @@
+"""Memo of per-post scan results.
+
+Each analyzed post is stored under ``(platform, post id, content hash)`` so
+the feed, scan and stats endpoints reuse earlier analysis and only posts
+that are new (or whose content changed) reach the model again. The memo is
+a bounded LRU; an evicted post is simply analyzed again.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def post_key(platform, post):
+    """Identity of a post for memoization and idempotent auto-reports."""
+    content = f"{post['content']}\x00{post.get('media') or ''}".encode("utf-8")
+    post_id = post.get("id") or post["user"]
+    return (platform, post_id, hashlib.sha256(content).hexdigest()[:16])
+
+
+class ScanMemo:
+    """Bounded LRU of scan results keyed by post_key()."""
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max(1, int(max_entries))
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._results),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            }
@@ -0,0 +1,305 @@
+"""Offline batch scorer for large JSONL/CSV corpora.
+
+Streams the input in chunks, so memory stays bounded however large the file
+is. The model-free stages (sarcasm, fraud, fake media regexes) run in a
+process pool while the main process runs batched model inference on the
+previous chunk:
+
+    python score_corpus.py messages.jsonl -o scores.jsonl
+    python score_corpus.py messages.csv -o scores.csv --text-field body --workers 8
+    python score_corpus.py messages.jsonl -o scores.parquet   # needs pyarrow
+
+After each chunk is written a checkpoint records how far the input and the
+output got; run the same command with ``--resume`` to continue after a crash
+or interruption. Parquet output is a directory with one part file per chunk.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import bully_detector
+from feeds import WatermarkStore
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+# Flat columns written to CSV / Parquet (and to JSONL with --compact).
+COLUMNS = ["id", "risk", "level", "toxicity_score", "fraud_score", "fake_media_score",
+           "primary_category", "overall_severity", "campaign_id", "threat_types", "error"]
+# Parquet type of each column; every part file shares this schema, and ids
+# (record ids or, on error rows, record numbers) are written as strings.
+COLUMN_TYPES = {"id": "string", "risk": "float64", "level": "string", "toxicity_score": "float64",
+                "fraud_score": "float64", "fake_media_score": "float64", "primary_category": "string",
+                "overall_severity": "float64", "campaign_id": "string", "threat_types": "string",
+                "error": "string"}
+
+
+# --------- INPUT ----------
+def read_jsonl(path, offset=0):
+    """Yield ``(offset_after, record)``; the offset is where a resume continues.
+
+    A line that is not valid JSON yields its ValueError as the record.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                try:
+                    yield offset, json.loads(line)
+                except ValueError as e:
+                    yield offset, e
+
+
+def read_csv(path, offset=0):
+    """Yield ``(offset_after, record)`` for each row; the offset is where a resume continues."""
+    with open(path, "rb") as f:
+        position = 0
+
+        def lines():
+            # csv pulls one physical line at a time, so ``position`` is
+            # always the end of the row just parsed (quoted newlines included).
+            nonlocal position
+            for line in iter(f.readline, b""):
+                position += len(line)
+                yield line.decode("utf-8")
+
+        reader = csv.DictReader(lines())
+        if reader.fieldnames is None:
+            return
+        if offset:
+            f.seek(offset)
+            position = offset
+        for row in reader:
+            yield position, row
+
+
+def chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --------- SCORING ----------
+def record_error(record, args):
+    """Why ``record`` cannot be scored, or None."""
+    if isinstance(record, ValueError):
+        return f"Invalid JSON: {record}"
+    if not isinstance(record, dict):
+        return f"Expected an object, got {type(record).__name__}"
+    text = record.get(args.text_field)
+    if not isinstance(text, str) or not text.strip():
+        return "No text provided"
+    return None
+
+
+def to_post(record, args):
+    if record_error(record, args):
+        return None
+    return {"content": record[args.text_field].strip(), "media": record.get(args.media_field) or None}
+
+
+def signals_worker(posts):
+    """Process pool target: the regex stages for a slice of posts."""
+    return bully_detector.content_signals(posts)
+
+
+def split(items, parts):
+    size = max(1, -(-len(items) // parts))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def score_chunk(posts, signals, args):
+    analyses = iter(bully_detector.analyze_content_batch(
+        [p for p in posts if p is not None], batch_size=args.batch_size,
+        signals=[s for s in signals if s is not None]))
+    return [None if post is None else next(analyses) for post in posts]
+
+
+def output_row(record_id, analysis, compact, error=None):
+    if analysis is None:
+        return {"id": record_id, "error": error}
+    if not compact:
+        return {"id": record_id, **analysis}
+    return {"id": record_id, **bully_detector.compact_analysis(analysis),
+            "threat_types": ",".join(t["type"] for t in analysis["threats"]), "error": None}
+
+
+# --------- OUTPUT ----------
+class JsonlWriter:
+    def __init__(self, path, size):
+        self.f = open(path, "ab")
+        self.f.truncate(size)
+
+    def write(self, rows):
+        self.f.write(b"".join(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in rows))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+class CsvWriter(JsonlWriter):
+    def __init__(self, path, size):
+        super().__init__(path, size)
+        if size == 0:
+            self.f.write((",".join(COLUMNS) + "\n").encode("utf-8"))
+
+    def write(self, rows):
+        import io
+        buf = io.StringIO()
+        csv.DictWriter(buf, COLUMNS, extrasaction="ignore", lineterminator="\n").writerows(rows)
+        self.f.write(buf.getvalue().encode("utf-8"))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+
+class ParquetWriter:
+    """One part file per chunk, named by its first record so a resume overwrites it."""
+
+    def __init__(self, path, size):
+        import pyarrow as pa  # fail fast if pyarrow is missing
+        self.schema = pa.schema([(c, getattr(pa, COLUMN_TYPES[c])()) for c in COLUMNS])
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        if size == 0:
+            for name in os.listdir(path):
+                if name.startswith("part-") and name.endswith(".parquet"):
+                    os.remove(os.path.join(path, name))
+        self.records = size
+
+    def write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist([{**{c: r.get(c) for c in COLUMNS},
+                                       "id": None if r.get("id") is None else str(r["id"])} for r in rows],
+                                     schema=self.schema)
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".part-")
+        os.close(fd)
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(self.path, f"part-{self.records:012d}.parquet"))
+        self.records += len(rows)
+        return self.records
+
+    def close(self):
+        pass
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+# --------- MAIN ----------
+def output_format(args):
+    if args.format:
+        return args.format
+    ext = os.path.splitext(args.output)[1].lstrip(".").lower()
+    if ext not in FORMATS:
+        sys.exit(f"[!] Cannot tell the output format from {args.output!r}; pass --format")
+    return ext
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file of messages")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from --output's extension)")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--media-field", default="media")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="records held in memory per chunk")
+    parser.add_argument("--batch-size", type=int, help="texts per model forward pass (default INFERENCE_BATCH_SIZE)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the regex stages")
+    parser.add_argument("--compact", action="store_true", help="JSONL: write only the score fields")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    args = parser.parse_args(argv)
+
+    fmt = output_format(args)
+    compact = args.compact or fmt != "jsonl"
+    is_csv = args.input.lower().endswith(".csv")
+    checkpoints = WatermarkStore(args.checkpoint or args.output + ".checkpoint")
+    key = os.path.abspath(args.input)
+    state = checkpoints.get(key) if args.resume else None
+    state = state or {"records": 0, "input_offset": 0, "output_size": 0}
+    if state["records"]:
+        print(f"[..] Resuming after {state['records']:,} records", file=sys.stderr)
+
+    # The model loads lazily on the first chunk, after the pool has started,
+    # so workers never fork a process that holds model threads.
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+
+    rows = (read_csv if is_csv else read_jsonl)(args.input, state["input_offset"])
+    writer = WRITERS[fmt](args.output, state["output_size"])
+    started = time.perf_counter()
+    done = 0
+    pending = None  # (chunk, posts, signal futures) of the chunk being prepared
+
+    def prepare(chunk):
+        posts = [to_post(record, args) for _, record in chunk]
+        valid = [p for p in posts if p is not None]
+        if pool is None:
+            futures = [bully_detector.content_signals(valid)]
+        else:
+            futures = [pool.submit(signals_worker, part) for part in split(valid, args.workers)]
+        return chunk, posts, futures
+
+    def finish(chunk, posts, futures):
+        signals = [s for f in futures for s in (f if isinstance(f, list) else f.result())]
+        it = iter(signals)
+        signals = [None if p is None else next(it) for p in posts]
+        analyses = score_chunk(posts, signals, args)
+        first = state["records"]
+        out = [output_row(record.get(args.id_field, first + i) if isinstance(record, dict) else first + i,
+                          analysis, compact, record_error(record, args))
+               for i, ((_, record), analysis) in enumerate(zip(chunk, analyses))]
+        state["output_size"] = writer.write(out)
+        state["records"] += len(chunk)
+        state["input_offset"] = chunk[-1][0]
+        checkpoints.set(key, state)
+        return len(chunk)
+
+    try:
+        for chunk in chunks(rows, max(1, args.chunk_size)):
+            # Regexes for this chunk run in the pool while the model scores the previous one.
+            prepared = prepare(chunk)
+            if pending:
+                done += finish(*pending)
+                report_progress(done, started)
+            pending = prepared
+        if pending:
+            done += finish(*pending)
+            report_progress(done, started)
+    except KeyboardInterrupt:
+        print(f"\n[!] Interrupted; rerun with --resume to continue from record {state['records']:,}", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    print(file=sys.stderr)
+    print(f"[OK] Scored {done:,} records in {elapsed:.1f}s ({done / elapsed if elapsed else 0:,.0f} rec/s) "
+          f"-> {args.output}", file=sys.stderr)
+    return 0
+
+
+def report_progress(done, started):
+    elapsed = time.perf_counter() - started
+    print(f"\r[..] {done:,} records  {done / elapsed if elapsed else 0:,.0f} rec/s  {elapsed:.0f}s",
+          end="", file=sys.stderr, flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Vectorized post-model scoring.
+
+ScoringKernel turns arrays of model (bully) and sarcasm scores into risk,
+level and mood buckets, empathy and respect with a handful of NumPy
+operations, however many rows a batch has. All randomness -- the score
+jitter and the picks of memes, hints and rewrite templates -- comes from one
+``numpy.random.Generator``:
+
+* ``seed=None``   fresh entropy per process (the default)
+* ``seed=<int>``  the same sequence of calls gives the same outputs
+* ``noise=False`` no jitter, and picks are derived from the scores, so
+                  identical inputs always give identical outputs
+"""
+import threading
+
+import numpy as np
+
+# A risk strictly above a bound moves up one level:
+# Safe | 0.25 | Sarcastic | 0.45 | Risky | 0.65 | Toxic | 0.85 | Ultra Toxic
+LEVEL_BOUNDS = np.array([0.25, 0.45, 0.65, 0.85])
+
+# Jitter (standard deviation) added to risk, empathy and respect.
+NOISE_SCALE = (0.03, 0.05, 0.03)
+_NOISE_SCALE = np.array(NOISE_SCALE)
+
+# Number of independent picks per row (meme, mental health message, hint).
+PICKS = 3
+
+# Below this many rows NumPy's per-call overhead outweighs vectorizing, so
+# score_rows() computes the same formulas in plain Python.
+SMALL_BATCH = 8
+
+_PICK_SPREAD = (1.0, 1.6180339887, 2.7182818285)
+
+
+class ScoringKernel:
+    """Batched risk / level / mood / empathy / respect computation."""
+
+    def __init__(self, seed=None, noise=True):
+        self.noise = noise
+        self._lock = threading.Lock()  # Generator is not thread-safe
+        self.reseed(seed)
+
+    def reseed(self, seed=None):
+        with self._lock:
+            self.seed = seed
+            self.rng = np.random.default_rng(seed)
+
+    def score(self, bully_scores, sarcasm_scores):
+        """Score one batch; every value in the result is an array with one entry per row.
+
+        ``level`` and ``mood`` are bucket indices (0 = Safe / 🙂 ... 4 = Ultra
+        Toxic / 💀); ``picks`` holds PICKS uniform numbers in [0, 1) per row
+        for choosing memes and messages with pick().
+        """
+        bully = np.asarray(bully_scores, dtype=np.float64)
+        sarcasm = np.asarray(sarcasm_scores, dtype=np.float64)
+        n = len(bully)
+        if self.noise:
+            with self._lock:
+                jitter = self.rng.standard_normal((n, 3)) * _NOISE_SCALE
+                picks = self.rng.random((n, PICKS))
+        else:
+            jitter = np.zeros((n, 3))
+            picks = None
+
+        risk = np.clip((bully * 0.6 + sarcasm * 1.2) / 2 + jitter[:, 0], 0, 1)
+        if picks is None:
+            # Spread the scores over [0, 1) so different inputs still vary.
+            picks = np.modf(np.outer(risk * 9973.0 + bully * 7919.0 + sarcasm * 104729.0, _PICK_SPREAD))[0]
+        return {
+            "risk": risk,
+            "level": np.searchsorted(LEVEL_BOUNDS, risk, side="left"),
+            # Mood moves up as soon as risk reaches a bound.
+            "mood": np.searchsorted(LEVEL_BOUNDS, risk, side="right"),
+            "empathy": np.clip(np.round(1 - risk - 0.1 * sarcasm + jitter[:, 1], 4), 0, 1),
+            "respect": np.clip(np.round(1 - bully * 0.8 + jitter[:, 2], 4), 0, 1),
+            "picks": picks,
+        }
+
+    def score_rows(self, bully_scores, sarcasm_scores):
+        """score() with every column as a Python list.
+
+        Small batches (single detect() calls) skip NumPy entirely; both paths
+        use the same formulas and the same draws from the generator, so they
+        give identical results.
+        """
+        n = len(bully_scores)
+        if n > SMALL_BATCH:
+            return {name: column.tolist() for name, column in self.score(bully_scores, sarcasm_scores).items()}
+        if self.noise:
+            with self._lock:
+                jitter = (self.rng.standard_normal((n, 3)) * _NOISE_SCALE).tolist()
+                picks = self.rng.random((n, PICKS)).tolist()
+        else:
+            jitter = [(0.0, 0.0, 0.0)] * n
+            picks = None
+
+        columns = {"risk": [], "level": [], "mood": [], "empathy": [], "respect": [], "picks": []}
+        bounds = LEVEL_BOUNDS.tolist()
+        for i, (bully, sarcasm) in enumerate(zip(bully_scores, sarcasm_scores)):
+            bully, sarcasm = float(bully), float(sarcasm)
+            risk = _clip01((bully * 0.6 + sarcasm * 1.2) / 2 + jitter[i][0])
+            columns["risk"].append(risk)
+            columns["level"].append(sum(bound < risk for bound in bounds))
+            columns["mood"].append(sum(bound <= risk for bound in bounds))
+            columns["empathy"].append(_clip01(_round4(1 - risk - 0.1 * sarcasm + jitter[i][1])))
+            columns["respect"].append(_clip01(_round4(1 - bully * 0.8 + jitter[i][2])))
+            if picks is None:
+                base = risk * 9973.0 + bully * 7919.0 + sarcasm * 104729.0
+                columns["picks"].append([(base * spread) % 1.0 for spread in _PICK_SPREAD])
+            else:
+                columns["picks"].append(picks[i])
+        return columns
+
+    def choice(self, options, basis=0.0):
+        """Pick one option; with noise off the pick is derived from ``basis``."""
+        if self.noise:
+            with self._lock:
+                u = self.rng.random()
+        else:
+            u = (basis * 9973.0) % 1.0
+        return pick(options, u)
+
+
+def _clip01(x):
+    return min(max(x, 0.0), 1.0)
+
+
+def _round4(x):
+    # Same rounding as np.round(x, 4): scale, round half to even, unscale.
+    return round(x * 10000) / 10000
+
+
+def pick(options, u):
+    """The option a uniform number ``u`` in [0, 1) selects."""
+    return options[min(int(u * len(options)), len(options) - 1)]
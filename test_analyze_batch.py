@@ -0,0 +1,46 @@
+import bully_detector
+
+client = bully_detector.app.test_client()
+
+
+def test_batch_results_in_order_match_single_analysis():
+    texts = ["You are so stupid", "Have a great day!", "Click here to claim your free prize"]
+    response = client.post("/api/analyze/batch", json={"items": [{"id": f"m{i}", "text": t} for i, t in enumerate(texts)]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["total"] == 3 and body["errors"] == 0
+    for i, (text, entry) in enumerate(zip(texts, body["results"])):
+        single = bully_detector.analyze_content(text)
+        assert entry["id"] == f"m{i}"
+        assert entry["analysis"]["toxicity_score"] == single["toxicity_score"]
+        assert entry["analysis"]["fraud"] == single["fraud"]
+
+
+def test_per_item_errors_and_bare_list():
+    response = client.post("/api/analyze/batch", json=["hello", "", 42, {"text": "hi", "media": "video"}])
+    body = response.get_json()
+    assert [("error" in r) for r in body["results"]] == [False, True, True, False]
+    assert body["errors"] == 2
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+
+
+def test_compact_and_limit():
+    body = client.post("/api/analyze/batch?compact=1", json=["you idiot"]).get_json()
+    assert set(body["results"][0]["analysis"]) == {
+        "risk", "level", "toxicity_score", "fraud_score", "fake_media_score",
+        "primary_category", "overall_severity", "campaign_id"}
+
+    for flag, compact in (("false", False), ("0", False), (False, False), ("true", True), (True, True), (1, True)):
+        body = client.post("/api/analyze/batch", json={"items": ["you idiot"], "compact": flag}).get_json()
+        assert ("explanation" not in body["results"][0]["analysis"]) == compact
+
+    too_many = ["x"] * (bully_detector.ANALYZE_BATCH_MAX + 1)
+    assert client.post("/api/analyze/batch", json=too_many).status_code == 413
+    assert client.post("/api/analyze/batch", json={"text": "no items"}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_batch_results_in_order_match_single_analysis()
+    test_per_item_errors_and_bare_list()
+    test_compact_and_limit()
+    print("✅ Batch analyze endpoint OK")
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+
+import asgi
+import bully_detector
+
+
+async def _call(method, path, body=b"", query=b"", headers=()):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query,
+             "headers": [(b"content-type", b"application/json"), *headers], "http_version": "1.1"}
+    await asgi.app(scope, receive, send)
+    status = sent[0]["status"]
+    chunks = [m["body"] for m in sent[1:] if m.get("body")]
+    return status, dict(sent[0]["headers"]), chunks
+
+
+def call(*args, **kwargs):
+    return asyncio.run(_call(*args, **kwargs))
+
+
+def test_native_analyze_matches_detect():
+    status, _, chunks = call("POST", "/analyze", json.dumps({"text": "you stupid idiot"}).encode())
+    assert status == 200
+    result = json.loads(b"".join(chunks))
+    assert result["toxicity_score"] == bully_detector.detect("you stupid idiot")["toxicity_score"]
+
+    assert call("POST", "/analyze", b'{"text": "  "}')[0] == 400
+    assert call("POST", "/analyze", b"not json")[0] == 400
+
+
+def test_native_challenge_under_concurrency():
+    async def many():
+        body = json.dumps({"text": "You did a lovely job"}).encode()
+        return await asyncio.gather(*(_call("POST", "/challenge", body) for _ in range(50)))
+
+    responses = asyncio.run(many())
+    assert all(status == 200 for status, _, _ in responses)
+    assert all(json.loads(b"".join(chunks))["passed"] for _, _, chunks in responses)
+
+
+def test_bridged_routes_and_streaming():
+    status, _, chunks = call("GET", "/healthz")
+    assert status == 200 and json.loads(b"".join(chunks)) == {"status": "ok"}
+    assert call("GET", "/no-such-route")[0] == 404
+
+    bully_detector.reset_feeds()
+    status, headers, chunks = call("GET", "/api/platform/feed", query=b"stream=ndjson&platform=twitter")
+    assert status == 200 and headers[b"content-type"].startswith(b"application/x-ndjson")
+    events = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert len(chunks) > 1  # relayed chunk by chunk, not buffered
+    assert events[-1]["event"] == "summary"
+    assert events[-1]["total"] == len(bully_detector.SIMULATED_POSTS["twitter"])
+
+
+class _Stream:
+    """WSGI app streaming more chunks than the bridge buffers; records when it is closed."""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def __call__(self, environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return self
+
+    def __iter__(self):
+        return (b"x" for _ in range(asgi.STREAM_BUFFER * 10))
+
+    def close(self):
+        self.closed.set()
+
+
+def test_bridge_stops_wsgi_iterator_on_any_send_error():
+    def receiver():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(3600)
+        return receive
+
+    async def failing_send(message):
+        if message["type"] == "http.response.body":
+            raise RuntimeError("client disconnected")
+
+    async def cancelled_mid_response(stream):
+        async def slow_send(message):
+            await asyncio.sleep(3600)
+        task = asyncio.ensure_future(asgi.handle_wsgi(stream, {"method": "GET", "path": "/"}, receiver(), slow_send))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.sleep(0.2)  # let the drain run
+
+    scope = {"method": "GET", "path": "/"}
+    stream = _Stream()
+    asyncio.run(asyncio.wait_for(asgi.handle_wsgi(stream, scope, receiver(), failing_send), 10))
+    assert stream.closed.wait(10)
+
+    stream = _Stream()
+    asyncio.run(cancelled_mid_response(stream))
+    assert stream.closed.wait(10)
+
+
+if __name__ == "__main__":
+    test_native_analyze_matches_detect()
+    test_native_challenge_under_concurrency()
+    test_bridged_routes_and_streaming()
+    test_bridge_stops_wsgi_iterator_on_any_send_error()
+    print("✅ ASGI app OK")
@@ -0,0 +1,37 @@
+import bully_detector
+
+
+TEXTS = [post["content"] for posts in bully_detector.SIMULATED_POSTS.values() for post in posts]
+
+
+def test_detect_batch_matches_detect():
+    batched = bully_detector.detect_batch(TEXTS, batch_size=4)
+    assert len(batched) == len(TEXTS)
+    for text, result in zip(TEXTS, batched):
+        single = bully_detector.detect(text)
+        assert abs(result["toxicity_score"] - single["toxicity_score"]) < 1e-3
+        assert result["sarcasm_score"] == single["sarcasm_score"]
+
+
+def test_analyze_content_batch_matches_analyze_content():
+    posts = [post for posts in bully_detector.SIMULATED_POSTS.values() for post in posts]
+    batched = bully_detector.analyze_content_batch(posts, batch_size=3)
+    for post, result in zip(posts, batched):
+        single = bully_detector.analyze_content(post["content"], post.get("media"))
+        assert result["fraud"] == single["fraud"]
+        assert result["fake_media"] == single["fake_media"]
+        assert abs(result["toxicity_score"] - single["toxicity_score"]) < 1e-3
+
+
+def test_scan_platforms_keeps_feed_order():
+    results = bully_detector.scan_platforms(bully_detector.PLATFORMS)
+    expected = [(p, post["content"]) for p in bully_detector.PLATFORMS
+                for post in bully_detector.SIMULATED_POSTS[p]]
+    assert [(r["platform"], r["content"]) for r in results] == expected
+
+
+if __name__ == "__main__":
+    test_detect_batch_matches_detect()
+    test_analyze_content_batch_matches_analyze_content()
+    test_scan_platforms_keeps_feed_order()
+    print("✅ Batched detection matches the per-item path")
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from batching import MicroBatcher
+
+
+def test_results_return_to_their_callers():
+    calls = []
+
+    def double(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=50)
+    results = {}
+
+    def worker(n):
+        results[n] = batcher(n, timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {n: n * 2 for n in range(20)}
+    assert max(calls) <= 8
+    assert len(calls) < 20  # requests were actually grouped
+
+    stats = batcher.stats()
+    assert stats["items"] == 20
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+    assert stats["queue_depth"] == 0
+
+
+def test_single_request_waits_at_most_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_wait_ms=20)
+    started = time.perf_counter()
+    assert batcher("hello", timeout=5) == "hello"
+    assert time.perf_counter() - started < 0.5
+    batcher.close()
+
+
+def test_batch_errors_reach_every_caller():
+    def boom(items):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(boom, max_batch_size=4, max_wait_ms=1)
+    try:
+        batcher("x", timeout=5)
+    except ValueError as e:
+        assert "model failed" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+    batcher.close()
+
+
+def test_short_result_list_fails_every_caller():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(n) for n in range(3)]
+    for future in futures:
+        try:
+            future.result(timeout=5)
+        except RuntimeError as e:
+            assert "1 results for 3 items" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+    batcher.close()
+
+
+if __name__ == "__main__":
+    test_results_return_to_their_callers()
+    test_single_request_waits_at_most_max_wait()
+    test_batch_errors_reach_every_caller()
+    test_short_result_list_fails_every_caller()
+    print("✅ MicroBatcher OK")
@@ -0,0 +1,86 @@
+import random
+import string
+
+import bully_detector
+from campaigns import CampaignIndex
+
+SCAM = "Congratulations! You won ₹50,000! Click here to claim: bit.ly/win-now 🎉"
+VARIANT = "Congratulations!! You won ₹10,000! Click here to claim: bit.ly/win-now2 🎁"
+# Only numbers, emoji and punctuation differ from SCAM, and words are dropped, never added.
+REPOST = "Congratulations!! You won ₹10,000! Click here to claim bit.ly 🎁"
+OTHER = "Hey! Great work on the project today. Really proud of you! 🌟"
+
+
+def test_near_duplicates_join_one_campaign():
+    index = CampaignIndex(threshold=0.8)
+    first, _ = index.assign(SCAM)
+    again, similarity = index.assign(VARIANT)
+    assert again is first and first.size == 2 and 0.8 <= similarity < 1
+    other, _ = index.assign(OTHER)
+    assert other is not first
+    assert index.assign("too short") is None
+    stats = index.stats()
+    assert (stats["hits"], stats["misses"], stats["skipped"]) == (1, 2, 1)
+    assert stats["dedup_rate"] == 0.3333
+    assert index.top(5) == [first.to_dict()]
+
+
+def test_index_is_bounded():
+    index = CampaignIndex(max_campaigns=10)
+    rng = random.Random(7)
+    for _ in range(50):
+        index.assign(" ".join("".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(6)))
+    assert len(index) <= 10
+    assert index.stats()["evictions"] >= 40
+    # Evicted campaigns leave no bucket entries behind.
+    assert all(len(bucket) <= 10 for bucket in index._buckets)
+
+
+def test_score_reused_and_reported(monkeypatch):
+    monkeypatch.setattr(bully_detector, "CAMPAIGN_DETECTION", True)
+    bully_detector.campaign_index.clear()
+    posts = [{"content": SCAM, "media": None}, {"content": REPOST, "media": None},
+             {"content": OTHER, "media": None}]
+    first, variant, other = bully_detector.analyze_content_batch(posts)
+    assert variant["campaign"]["reused"] and variant["campaign"]["size"] == 2
+    assert variant["toxicity_score"] == first["toxicity_score"]
+    # Only the model score is shared: the regex stages run on each post.
+    assert variant["fraud"] == bully_detector.detect_fraud(REPOST) != first["fraud"]
+    assert first["campaign"]["id"] == variant["campaign"]["id"]
+    assert other["campaign"] is None
+
+    single = bully_detector.analyze_content(SCAM + " 😏😏")
+    assert single["campaign"]["reused"] and single["campaign"]["id"] == variant["campaign"]["id"]
+    assert single["toxicity_score"] == first["toxicity_score"]
+    assert single["sarcasm_score"] > first["sarcasm_score"]
+    assert bully_detector.campaign_index.get(first["campaign"]["id"]) is not None
+
+    # Padding new words with a known message does not skip the model.
+    benign = ("Hey everyone, the community garden meetup moves to Saturday morning at the library. "
+              "Bring gloves, seeds and snacks to share with the group!")
+    padded = benign + " You are a worthless idiot."
+    assert bully_detector.analyze_content(benign)["toxicity_score"] == 0.1
+    abuse = bully_detector.analyze_content(padded)
+    assert abuse["campaign"] is not None and not abuse["campaign"]["reused"]
+    assert abuse["toxicity_score"] == bully_detector.analyze_content("You are a worthless idiot.")["toxicity_score"]
+    assert abuse["toxicity_score"] > 0.5
+    batch = bully_detector.analyze_content_batch([{"content": benign}, {"content": padded}])
+    assert batch[0]["campaign"]["reused"] and not batch[1]["campaign"]["reused"]
+    assert batch[1]["toxicity_score"] == abuse["toxicity_score"]
+
+    report_id = bully_detector.submit_cyberhub_report(
+        "whatsapp", "@spam", SCAM, variant["threats"], 0.9, "block", campaign_id=variant["campaign"]["id"])
+    assert bully_detector.report_store.get(report_id)["campaign_id"] == variant["campaign"]["id"]
+
+    body = bully_detector.app.test_client().get("/api/campaigns/top?k=5").get_json()
+    sizes = {c["campaign_id"]: c["size"] for c in body["campaigns"]}
+    assert sizes[variant["campaign"]["id"]] == 3
+
+
+if __name__ == "__main__":
+    test_near_duplicates_join_one_campaign()
+    test_index_is_bounded()
+    import pytest
+    with pytest.MonkeyPatch.context() as mp:
+        test_score_reused_and_reported(mp)
+    print("✅ Campaign detection OK")
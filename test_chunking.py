@@ -0,0 +1,65 @@
+import bully_detector
+import chunking
+from chunking import (combine, estimate_tokens, length_sorted_batches, arrival_batches, may_overflow, padding_waste,
+                      split_windows, token_spans)
+
+
+def test_windows_overlap_and_cover_the_text():
+    text = " ".join(f"w{i}" for i in range(100))
+    spans = token_spans([text])[0]
+    pieces = split_windows(text, spans, window=30, stride=10)
+    assert all(length <= 30 for _, length in pieces)
+    assert pieces[0][0].startswith("w0 ") and pieces[-1][0].endswith("w99")
+    # Consecutive windows share `stride` tokens.
+    assert pieces[0][0].split()[-10:] == pieces[1][0].split()[:10]
+    assert split_windows("short text", token_spans(["short text"])[0], 30, 10) == [("short text", 2)]
+
+
+def test_length_sorted_batches_cut_padding():
+    lengths = [5, 400, 8, 6, 350, 7, 9, 380]
+    real, arrival = padding_waste(lengths, arrival_batches(lengths, 2))
+    _, bucketed = padding_waste(lengths, length_sorted_batches(lengths, 2))
+    assert real == sum(lengths)
+    assert bucketed < arrival
+    assert sorted(i for b in length_sorted_batches(lengths, 3) for i in b) == list(range(len(lengths)))
+
+
+def test_combiners():
+    assert combine([0.1, 0.95]) == 0.95
+    assert combine([0.1, 0.9], "mean") == 0.5
+    assert 0.5 < combine([0.1, 0.9], "softmax") < 0.9
+    assert combine([0.4]) == 0.4
+
+
+def test_long_text_scored_by_windows(monkeypatch):
+    monkeypatch.setattr(bully_detector, "MODEL_MAX_TOKENS", 40)
+    long_text = " ".join(["what a lovely sunny afternoon at the park"] * 30) + " you idiot"
+    texts = ["hi", long_text, "you are stupid"]
+    assert bully_detector._run_model(texts) == [0.1, 0.95, 0.95]
+
+    monkeypatch.setattr(bully_detector, "CHUNK_COMBINE", "mean")
+    assert 0.1 < bully_detector._run_model([long_text])[0] < 0.5
+
+
+def test_only_long_texts_are_tokenized(monkeypatch):
+    assert not may_overflow("é" * 10, 20) and may_overflow("é" * 15, 20)
+    assert estimate_tokens("one two three") == 4 and estimate_tokens("a b c d e f") == 6
+
+    tokenized = []
+
+    def spy(texts, tokenizer=None):
+        tokenized.extend(texts)
+        return chunking.token_spans(texts, tokenizer)
+
+    monkeypatch.setattr(bully_detector, "token_spans", spy)
+    monkeypatch.setattr(bully_detector, "MODEL_MAX_TOKENS", 40)
+    long_text = "lovely day " * 50
+    bully_detector._run_model(["hi", long_text, "you are stupid"])
+    assert tokenized == [long_text]
+
+
+if __name__ == "__main__":
+    test_windows_overlap_and_cover_the_text()
+    test_length_sorted_batches_cut_padding()
+    test_combiners()
+    print("✅ Chunking OK")
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+
+import bully_detector
+from feeds import JsonlFeedSource, ListFeedSource, WatermarkStore
+
+
+def _post(n):
+    return {"n": n, "user": f"@user{n}", "content": f"post number {n}", "type": "tweet"}
+
+
+def test_list_source_resumes_from_watermark():
+    posts = [{"n": 1}, {"n": 2}, {"n": 3}]
+    source = ListFeedSource(posts)
+    first = list(source.read())
+    assert [p["n"] for _, p in first] == [1, 2, 3]
+    posts.append({"n": 4})
+    assert [p["n"] for _, p in source.read(first[-1][0])] == [4]
+
+
+def test_jsonl_source_tails_and_skips_partial_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "twitter.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps(_post(1)) + "\n" + json.dumps(_post(2)) + "\n" + json.dumps(_post(3))[:-1])
+        source = JsonlFeedSource(path)
+        read = list(source.read())
+        assert [p["n"] for _, p in read] == [1, 2]
+
+        with open(path, "a") as f:
+            f.write("}\n")
+        assert [p["n"] for _, p in source.read(read[-1][0])] == [3]
+
+
+def test_jsonl_source_skips_malformed_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "twitter.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps(_post(1)) + "\n" + '{"n": 2,,\n' + "[3]\n" + json.dumps({"n": 4, "user": "@x"}) + "\n"
+                    + json.dumps({**_post(5), "content": None}) + "\n" + json.dumps(_post(6)) + "\n")
+        source = JsonlFeedSource(path)
+        read = list(source.read())
+        assert [p["n"] for _, p in read] == [1, 6]
+        assert read[-1][0] == os.path.getsize(path)
+        assert source.skipped == 4
+        list(source.read())
+        assert source.skipped == 4  # counted once, however often the file is re-read
+
+
+def test_scan_skips_posts_missing_fields(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "twitter.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps({"id": "no-type", "user": "@a", "content": "hello there"}) + "\n")
+            f.write(json.dumps({**_post(7), "id": "jsonl-7"}) + "\n")
+        monkeypatch.setitem(bully_detector.feed_sources, "twitter", JsonlFeedSource(path))
+        bully_detector.reset_feeds("twitter")
+        try:
+            assert [r["id"] for r in bully_detector.scan_platform("twitter")] == ["jsonl-7"]
+            assert bully_detector.feed_watermarks.get("twitter") == os.path.getsize(path)
+        finally:
+            bully_detector.reset_feeds("twitter")
+
+
+def test_watermarks_persist():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "watermarks.json")
+        WatermarkStore(path).set("twitter", 42)
+        assert WatermarkStore(path).get("twitter") == 42
+
+
+def test_scan_only_analyzes_new_posts():
+    bully_detector.reset_feeds("twitter")
+    bully_detector.scan_platform("twitter")
+    texts = bully_detector.model_counters["texts"]
+
+    new_post = {"id": "twitter-new", "user": "@newcomer", "content": "A brand new post about kittens 0xF00D",
+                "type": "tweet", "media": None}
+    bully_detector.SIMULATED_POSTS["twitter"].append(new_post)
+    try:
+        streamed = list(bully_detector.iter_scan("twitter"))
+        assert [r["id"] for r in streamed] == ["twitter-new"]
+        assert bully_detector.model_counters["texts"] - texts <= 1
+        feed = bully_detector.scan_platform("twitter")
+        assert feed[-1]["id"] == "twitter-new"
+        assert len(feed) == len(bully_detector.SIMULATED_POSTS["twitter"])
+    finally:
+        bully_detector.SIMULATED_POSTS["twitter"].remove(new_post)
+        bully_detector.reset_feeds("twitter")
+
+
+if __name__ == "__main__":
+    test_list_source_resumes_from_watermark()
+    test_jsonl_source_tails_and_skips_partial_lines()
+    test_jsonl_source_skips_malformed_lines()
+    test_watermarks_persist()
+    test_scan_only_analyzes_new_posts()
+    print("✅ Feed sources OK")
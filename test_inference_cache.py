@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from inference_cache import InferenceCache
+
+
+def test_hit_miss_and_normalized_keys():
+    cache = InferenceCache(max_entries=10, ttl_seconds=60)
+    assert cache.get("FREE iPhone!") is None
+    cache.put("FREE iPhone!", 0.42)
+    assert cache.get("  FREE   iPhone! ") == 0.42
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = InferenceCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 0.1)
+    cache.put("b", 0.2)
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", 0.3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 0.1 and cache.get("c") == 0.3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    cache = InferenceCache(max_entries=10, ttl_seconds=0.05)
+    cache.put("scam", 0.9)
+    time.sleep(0.1)
+    assert cache.get("scam") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scores.db")
+        InferenceCache(max_entries=10, disk_path=path).put_many(["x", "y"], [0.5, 0.6])
+
+        restarted = InferenceCache(max_entries=10, disk_path=path)
+        assert restarted.get("y") == 0.6
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.get("y") == 0.6  # promoted to the memory tier
+        assert restarted.stats()["hits"] == 1
+
+
+def test_namespaces_do_not_collide():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scores.db")
+        InferenceCache(disk_path=path, namespace="mock").put("hello", 0.05)
+        assert InferenceCache(disk_path=path, namespace="real").get("hello") is None
+
+
+def test_disk_tier_is_swept():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scores.db")
+        cache = InferenceCache(max_entries=0, ttl_seconds=60, disk_path=path, disk_max_entries=5, sweep_every=4)
+        for i in range(12):
+            cache.put(f"text {i}", i / 100)
+        rows = cache._disk_conn().execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        assert rows <= 5 + 3  # capped at each sweep, plus the writes since
+        assert cache.get("text 11") == 0.11 and cache.get("text 0") is None
+
+        cache._disk_conn().execute("UPDATE scores SET stored_at = stored_at - 120")
+        cache.sweep()
+        assert cache._disk_conn().execute("SELECT COUNT(*) FROM scores").fetchone()[0] == 0
+        assert cache.stats()["disk_pruned"] >= 12
+
+
+def test_pool_mode_skips_disk_tier():
+    # Pool workers may fall back to mock scores the parent cannot label.
+    env = {**os.environ, "INFERENCE_MODE": "pool", "INFERENCE_CACHE_PATH": os.path.join(tempfile.gettempdir(), "x.db"),
+           "MODEL_BACKEND": "mock"}
+    out = subprocess.run([sys.executable, "-c", "import bully_detector; print(bully_detector.inference_cache.disk_path)"],
+                         env=env, check=True, capture_output=True, text=True).stdout
+    assert out.strip().splitlines()[-1] == "None"
+
+
+if __name__ == "__main__":
+    test_hit_miss_and_normalized_keys()
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_disk_tier_survives_restart()
+    test_namespaces_do_not_collide()
+    test_disk_tier_is_swept()
+    test_pool_mode_skips_disk_tier()
+    print("✅ InferenceCache OK")
@@ -0,0 +1,45 @@
+import time
+
+from inference_pool import InferencePool, InferencePoolFull
+
+
+def _slow_echo(items):
+    time.sleep(0.5)
+    return items
+
+
+def test_pool_scores_with_mock_model(monkeypatch):
+    monkeypatch.setenv("MODEL_BACKEND", "mock")  # inherited by the spawned workers
+    pool = InferencePool("bully_detector:_run_model", processes=2, warmup="bully_detector:load_model")
+    try:
+        scores = pool(["you are so stupid", "see you at dinner"], timeout=120)
+        assert scores == [0.95, 0.1]
+        stats = pool.stats()
+        assert stats["submitted"] == 1 and stats["pending"] == 0
+        assert sum(p["items"] for p in stats["per_process"].values()) == 2
+    finally:
+        pool.shutdown()
+
+
+def test_full_queue_is_rejected():
+    pool = InferencePool("test_inference_pool:_slow_echo", processes=1, max_pending=1)
+    try:
+        future = pool.submit(["a"])
+        try:
+            pool.submit(["b"])
+        except InferencePoolFull:
+            pass
+        else:
+            raise AssertionError("expected InferencePoolFull")
+        assert future.result(timeout=120)[2] == ["a"]
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as mp:
+        test_pool_scores_with_mock_model(mp)
+    test_full_queue_is_rejected()
+    print("✅ InferencePool OK")
@@ -0,0 +1,46 @@
+import re
+
+import bully_detector
+from matchers import PatternMatcher
+
+EXTRA_TEXTS = [
+    "URGENT!!! act now, claim your jackpot, verify your account at bit.ly/x",
+    "This photo was fake, a face swap and voice clone. Total hoax, don't believe it",
+    "Congrats! you won a FREE iPhone, send me your OTP",
+    "Nothing to see here",
+    "",
+]
+
+
+def _texts():
+    posts = [post["content"] for posts in bully_detector.SIMULATED_POSTS.values() for post in posts]
+    return posts + EXTRA_TEXTS
+
+
+def _legacy_matches(patterns, text):
+    return [re.search(p, text).group(0) for p in patterns if re.search(p, text)]
+
+
+def test_matches_agree_with_per_pattern_search():
+    for patterns in (bully_detector.FRAUD_PATTERNS, bully_detector.FAKE_MEDIA_INDICATORS):
+        matcher = PatternMatcher(patterns)
+        for text in _texts():
+            assert matcher.matches(text) == _legacy_matches(patterns, text), text
+
+
+def test_detectors_keep_scores_and_snippets():
+    for text in _texts():
+        legacy = _legacy_matches(bully_detector.FRAUD_PATTERNS, text)
+        result = bully_detector.detect_fraud(text)
+        assert result["matched_patterns"] == legacy[:3]
+        assert result["score"] == round(min(0.25 * len(legacy), 1.0), 4)
+
+        legacy = _legacy_matches(bully_detector.FAKE_MEDIA_INDICATORS, text)
+        result = bully_detector.detect_fake_media(text)
+        assert result["indicators"] == legacy[:3]
+
+
+if __name__ == "__main__":
+    test_matches_agree_with_per_pattern_search()
+    test_detectors_keep_scores_and_snippets()
+    print("✅ PatternMatcher matches the legacy regex loop")
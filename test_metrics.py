@@ -0,0 +1,61 @@
+import metrics
+import bully_detector
+
+
+def test_histogram_and_counter_exposition():
+    registry = metrics.Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ["stage"], buckets=(0.01, 0.1))
+    hits = registry.counter("demo_hits_total", "Demo hits.", ["kind"])
+    registry.callback("demo_size", "Demo size.", lambda: 7)
+    for value in (0.005, 0.05, 0.5):
+        latency.observe(value, "fraud")
+    hits.inc(2, 'a"b')
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{stage="fraud",le="0.01"} 1' in text
+    assert 'demo_seconds_bucket{stage="fraud",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{stage="fraud",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="fraud"} 3' in text
+    assert 'demo_hits_total{kind="a\\"b"} 2' in text
+    assert "demo_size 7" in text
+
+
+def test_metrics_endpoint_covers_stages_and_routes():
+    bully_detector.scan_memo.clear()
+    bully_detector.campaign_index.clear()
+    bully_detector.reset_feeds()
+    client = bully_detector.app.test_client()
+    before = bully_detector.STAGE_SECONDS.count("fraud")
+    client.post("/analyze", json={"text": "you are stupid"})
+    client.get("/api/platform/feed?platform=whatsapp")
+    assert bully_detector.STAGE_SECONDS.count("fraud") > before
+
+    response = client.get("/metrics")
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    for stage in ("sarcasm", "model", "build_detection", "fraud", "decide_action", "serialize"):
+        assert f'bully_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'bully_http_requests_total{route="/analyze",method="POST",status="200"}' in text
+    assert "bully_model_calls_total" in text
+    assert "bully_reports_stored{priority=" in text
+
+
+def test_sampled_profiler_merges_profiles():
+    profiler = metrics.Profiler(sample_rate=1.0)
+    for _ in range(3):
+        profile = profiler.start()
+        assert profile is not None
+        bully_detector.detect_fraud("click here to claim your free prize")
+        profiler.stop(profile)
+    report = profiler.report(sort="tottime", limit=5, reset=True)
+    assert report.startswith("3 sampled requests")
+    assert profiler.sampled == 0
+    assert metrics.Profiler(sample_rate=0).start() is None
+
+
+if __name__ == "__main__":
+    test_histogram_and_counter_exposition()
+    test_metrics_endpoint_covers_stages_and_routes()
+    test_sampled_profiler_merges_profiles()
+    print("✅ Metrics OK")
@@ -0,0 +1,65 @@
+import bully_detector
+from offenders import OffenderIndex
+
+
+def test_sliding_window_and_decay():
+    index = OffenderIndex(window_seconds=60, buckets=6, half_life_seconds=100)
+    for t in (0, 5, 15, 25):
+        history = index.record("twitter", "@a", 0.5, now=t)
+    assert history["window_hits"] == 4
+    assert 1.7 < history["score"] < 2.0  # earlier hits have decayed a little
+
+    # 10-second buckets: at t=65 the t=0/5 bucket has left the window.
+    assert index.get("twitter", "@a", now=65)["window_hits"] == 2
+    later = index.record("twitter", "@a", 0.5, now=200)
+    assert later["window_hits"] == 1
+    assert index.get("twitter", "@a", now=300)["score"] == round(later["score"] / 2, 4)
+    assert index.record("twitter", "@b", 0.1, now=0) is None  # below min_severity: not tracked
+
+
+def test_memory_is_bounded_and_top_k():
+    index = OffenderIndex(max_users=100)
+    for i in range(1000):
+        for _ in range(i % 7 + 1):
+            index.record("whatsapp", f"@u{i}", 0.5, now=1000)
+    assert len(index) == 100 and index.stats()["evictions"] == 900
+
+    top = index.top(3, by="window_hits", now=1000)
+    assert [o["window_hits"] for o in top] == [7, 7, 7]
+    assert index.top(5, now=1000)[0]["score"] >= index.top(5, now=1000)[-1]["score"]
+    assert index.top(5, platform="twitter", now=1000) == []
+
+
+def test_decide_action_escalates_repeat_offenders():
+    analysis = {"overall_severity": 0.4, "threats": [{"type": "toxicity", "severity": 0.4, "detail": "x"}],
+                "primary_category": "toxicity", "meme": ""}
+    user = "@escalation-test"
+    threshold = bully_detector.ESCALATION_RULES[0][3]
+    actions = [bully_detector.decide_action(analysis, "instagram", user, post_key=("instagram", user, str(i)))
+               for i in range(threshold)]
+    assert [a["action"] for a in actions[:-1]] == ["flag"] * (threshold - 1)
+    assert actions[-1]["action"] == "block" and actions[-1]["escalated_from"] == "flag"
+    assert actions[-1]["auto_reported"] and actions[-1]["report_id"]
+
+    body = bully_detector.app.test_client().get("/api/offenders/top?k=5&by=window_hits&platform=instagram").get_json()
+    assert body["offenders"][0]["user"] == user
+
+
+def test_rescanning_a_post_does_not_escalate():
+    analysis = {"overall_severity": 0.44, "threats": [{"type": "toxicity", "severity": 0.44, "detail": "x"}],
+                "primary_category": "toxicity", "meme": ""}
+    user = "@rescan-test"
+    key = ("twitter", user, "1")
+    threshold = bully_detector.ESCALATION_RULES[0][3]
+    actions = [bully_detector.decide_action(analysis, "twitter", user, post_key=key) for _ in range(threshold * 2)]
+    assert {a["action"] for a in actions} == {"flag"}
+    assert not any(a["auto_reported"] for a in actions)
+    assert bully_detector.offender_index.get("twitter", user)["window_hits"] == 1
+
+
+if __name__ == "__main__":
+    test_sliding_window_and_decay()
+    test_memory_is_bounded_and_top_k()
+    test_decide_action_escalates_repeat_offenders()
+    test_rescanning_a_post_does_not_escalate()
+    print("✅ Offender index OK")
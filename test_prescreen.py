@@ -0,0 +1,54 @@
+import bully_detector
+from prescreen import PreScreen
+
+
+def _prescreen(threshold=0.85):
+    return PreScreen(
+        lexicon=list(bully_detector.TOXIC_REWRITES) + bully_detector.MOCK_TOXIC_KEYWORDS,
+        fraud_matcher=bully_detector.FRAUD_MATCHER,
+        fake_matcher=bully_detector.FAKE_MEDIA_MATCHER,
+        threshold=threshold,
+    )
+
+
+def test_tiers():
+    screen = _prescreen()
+    assert screen.classify("Come home for dinner, mom made your favorite 🍲")[0] == "benign"
+    assert screen.classify("You're so useless, just leave the group")[0] == "model"
+    assert screen.classify("URGENT: Your bank account will be blocked. Send OTP to verify")[0] == "fraud"
+    assert screen.classify("Look at this deepfake video of our teacher")[0] == "model"
+    assert screen.classify("People like you don't deserve to exist.")[0] == "model"
+
+
+def test_threshold_controls_escalation():
+    text = "Great presentation today! You really nailed the delivery"
+    assert _prescreen(threshold=0.85).classify(text)[0] == "model"
+    assert _prescreen(threshold=0.5).classify(text)[0] == "benign"
+
+
+def test_counters_and_skipped_score():
+    screen = _prescreen()
+    assert screen.screen("Come home for dinner") == screen.benign_score
+    assert screen.screen("you idiot") is None
+    stats = screen.stats()
+    assert stats["tiers"] == {"benign": 1, "fraud": 0, "model": 1}
+    assert stats["skip_rate"] == 0.5
+
+
+def test_evaluate_reports_skip_rate_and_accuracy():
+    mock = bully_detector.MockPipeline()
+    samples = [(post["content"], mock._classify(post["content"])["label"] == "toxic")
+               for posts in bully_detector.SIMULATED_POSTS.values() for post in posts]
+    report = _prescreen().evaluate(samples, lambda texts: [mock._classify(t)["score"] for t in texts])
+    assert report["samples"] == len(samples)
+    assert 0 < report["skip_rate"] < 1
+    assert report["missed_toxic"] == 0
+    assert report["tiered_accuracy"] == report["model_accuracy"]
+
+
+if __name__ == "__main__":
+    test_tiers()
+    test_threshold_controls_escalation()
+    test_counters_and_skipped_score()
+    test_evaluate_reports_skip_rate_and_accuracy()
+    print("✅ PreScreen OK")
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import bully_detector
+
+
+def test_import_does_not_load_the_model():
+    code = "import sys, bully_detector; print('transformers' in sys.modules, bully_detector.model_ready())"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "False False"
+
+
+def test_health_and_readiness():
+    client = bully_detector.app.test_client()
+    assert client.get("/healthz").status_code == 200
+
+    bully_detector.load_model()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["ready"] is True
+    assert response.get_json()["load_seconds"] is not None
+
+
+if __name__ == "__main__":
+    test_import_does_not_load_the_model()
+    test_health_and_readiness()
+    print("✅ Lazy loading and readiness OK")
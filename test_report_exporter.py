@@ -0,0 +1,170 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import bully_detector
+from report_exporter import ReportExporter
+
+
+class Sink:
+    """Stand-in case-management endpoint; answers ``fail`` requests with 503 first."""
+
+    def __init__(self, fail=0, port=0):
+        self.reports, self.peers, self.fail = [], set(), fail
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                sink.peers.add(self.client_address)
+                if sink.fail:
+                    sink.fail -= 1
+                    status = 503
+                else:
+                    sink.reports.extend(json.loads(body)["reports"])
+                    status = 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/reports"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def reports(n, start=0):
+    return [{"id": f"CH-{i:04d}", "priority": "high"} for i in range(start, start + n)]
+
+
+def test_batches_over_one_keep_alive_connection():
+    sink = Sink()
+    exporter = ReportExporter(sink.url, batch_size=10, flush_interval=0.05)
+    try:
+        for report in reports(35):
+            exporter.submit(report)
+        assert exporter.flush(timeout=5)
+        assert [r["id"] for r in sink.reports] == [r["id"] for r in reports(35)]
+        stats = exporter.stats()
+        assert stats["batches"] == 4 and stats["sent"] == 35
+        assert stats["connections_opened"] == 1 and len(sink.peers) == 1
+    finally:
+        exporter.close()
+        sink.stop()
+
+
+def test_retries_with_backoff():
+    sink = Sink(fail=2)
+    exporter = ReportExporter(sink.url, batch_size=5, flush_interval=0.01, backoff_base=0.01)
+    try:
+        for report in reports(5):
+            exporter.submit(report)
+        assert exporter.flush(timeout=5)
+        assert len(sink.reports) == 5
+        assert exporter.stats()["retries"] == 2
+    finally:
+        exporter.close()
+        sink.stop()
+
+
+def test_spills_to_journal_and_replays_when_sink_returns():
+    sink = Sink()
+    port = sink.server.server_port
+    sink.stop()
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+        exporter = ReportExporter(sink.url, journal_path=journal, batch_size=10, flush_interval=0.01,
+                                  max_retries=1, backoff_base=0.01, backoff_max=0.05, max_queue=20)
+        try:
+            for report in reports(30):
+                exporter.submit(report)
+            assert exporter.flush(timeout=5)
+            stats = exporter.stats()
+            assert not stats["healthy"] and stats["spilled"] == 30 and stats["journal_bytes"] > 0
+
+            sink = Sink(port=port)
+            exporter.submit(reports(1, start=30)[0])
+            deadline = time.monotonic() + 5
+            while len(sink.reports) < 31 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert sorted(r["id"] for r in sink.reports) == [r["id"] for r in reports(31)]
+            assert exporter.stats()["replayed"] >= 30
+            assert exporter.journal_bytes() == 0
+        finally:
+            exporter.close()
+            sink.stop()
+
+
+def test_replay_claims_the_journal():
+    sink = Sink()
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+        # Claims left by processes that exited are adopted, however many there are.
+        for start in (0, 3):
+            dead = subprocess.Popen([sys.executable, "-c", "pass"])
+            dead.wait()
+            with open(f"{journal}.{dead.pid}.replay", "wb") as f:
+                f.write(b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in reports(3, start=start)))
+        with open(journal, "wb") as f:
+            f.write(b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in reports(4, start=6)))
+
+        exporter = ReportExporter(sink.url, journal_path=journal, batch_size=5)
+        assert exporter.journal_bytes() == sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        other = ReportExporter(sink.url, journal_path=journal)  # another worker sharing the journal
+        posts = []
+        original = exporter._post
+
+        def post(batch):
+            posts.append(batch)
+            if len(posts) == 3:
+                other._spill(reports(1, start=10))  # arrives while the claim is being sent
+            original(batch)
+
+        exporter._post = post
+        try:
+            exporter._replay_journal()
+            assert sorted(r["id"] for r in sink.reports) == [r["id"] for r in reports(11)]
+            assert [r["id"] for r in sink.reports][-5:] == [r["id"] for r in reports(5, start=6)]
+            assert exporter.journal_bytes() == 0 and os.listdir(tmp) == []
+        finally:
+            exporter.close()
+            other.close()
+            sink.stop()
+
+
+def test_submit_does_not_wait_for_the_sink(monkeypatch):
+    sink = Sink(fail=1000)
+    exporter = ReportExporter(sink.url, batch_size=1, flush_interval=0.01, backoff_base=0.2, max_queue=5)
+    monkeypatch.setattr(bully_detector, "report_exporter", exporter)
+    try:
+        started = time.perf_counter()
+        for i in range(20):
+            bully_detector.submit_cyberhub_report("twitter", f"@user{i}", "you idiot",
+                                                  [{"type": "toxicity", "severity": 0.9}], 0.9, "block")
+        assert time.perf_counter() - started < 0.5
+        # No journal configured: what does not fit in the queue is counted as dropped.
+        assert exporter.stats()["dropped"] >= 14
+    finally:
+        exporter.close(timeout=1)
+        sink.stop()
+
+
+if __name__ == "__main__":
+    test_batches_over_one_keep_alive_connection()
+    test_retries_with_backoff()
+    test_spills_to_journal_and_replays_when_sink_returns()
+    test_replay_claims_the_journal()
+    print("✅ Report exporter OK")
@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from report_store import InvalidCursor, MemoryReportStore, SQLiteReportStore
+
+
+def _report(n, priority="high", platform="twitter"):
+    return {
+        "id": f"CH-{n:08d}",
+        "timestamp": f"2025-01-01T00:00:{n:02d}.000000",
+        "platform": platform,
+        "reported_user": f"@user{n % 3}",
+        "content_snippet": "N/A",
+        "threats": [{"type": "fraud", "severity": 0.6}],
+        "overall_severity": 0.6,
+        "action_taken": "block",
+        "status": "submitted",
+        "status_icon": "📤",
+        "priority": priority,
+    }
+
+
+def _check_store(store):
+    for n, priority in enumerate(["critical", "high", "high", "medium"]):
+        store.add(_report(n, priority))
+    assert store.count() == 4
+    assert store.priority_counts() == {"critical": 1, "high": 2, "medium": 1}
+    assert [r["id"] for r in store.recent()] == ["CH-00000003", "CH-00000002", "CH-00000001", "CH-00000000"]
+    assert [r["id"] for r in store.recent(limit=2)] == ["CH-00000003", "CH-00000002"]
+    assert store.get("CH-00000001") == _report(1, "high")
+
+
+def _check_query(store):
+    for n in range(10):
+        report = _report(n, "critical" if n % 2 else "medium", "twitter" if n < 6 else "instagram")
+        if n == 4:
+            report["threats"] = [{"type": "toxicity", "severity": 0.9}]
+        store.add(report)
+
+    ids, cursor = [], None
+    while True:
+        page, cursor = store.query(limit=3, cursor=cursor)
+        assert len(page) <= 3
+        ids.extend(r["id"] for r in page)
+        if cursor is None:
+            break
+    assert ids == [f"CH-{n:08d}" for n in range(9, -1, -1)]
+
+    page, cursor = store.query(limit=10, platform="twitter", priority="critical")
+    assert [r["id"] for r in page] == ["CH-00000005", "CH-00000003", "CH-00000001"] and cursor is None
+    assert [r["id"] for r in store.query(threat_type="toxicity")[0]] == ["CH-00000004"]
+    assert [r["id"] for r in store.query(reported_user="@user0")[0]] == ["CH-00000009", "CH-00000006", "CH-00000003", "CH-00000000"]
+    since = _report(7)["timestamp"]
+    assert [r["id"] for r in store.query(since=since)[0]] == ["CH-00000009", "CH-00000008"]
+    assert [r["id"] for r in store.query(until=_report(1)["timestamp"])[0]] == ["CH-00000001", "CH-00000000"]
+
+
+def test_memory_store():
+    _check_store(MemoryReportStore())
+
+
+def test_memory_store_query():
+    _check_query(MemoryReportStore())
+
+
+def test_sqlite_store_query():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteReportStore(os.path.join(tmp, "reports.db"), batch_size=4)
+        _check_query(store)
+        store.close()
+
+
+def test_bad_cursor_is_rejected():
+    try:
+        MemoryReportStore().query(cursor="not-a-cursor")
+    except InvalidCursor:
+        pass
+    else:
+        raise AssertionError("expected InvalidCursor")
+
+
+def test_sqlite_store_batches_and_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reports.db")
+        store = SQLiteReportStore(path, batch_size=3, flush_interval=60)
+        _check_store(store)
+        store.close()
+
+        reopened = SQLiteReportStore(path)
+        assert reopened.count() == 4
+        assert reopened.priority_counts()["high"] == 2
+        reopened.close()
+
+
+def test_sqlite_contains_does_not_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteReportStore(os.path.join(tmp, "reports.db"), batch_size=10, flush_interval=60)
+        store.add(_report(1))
+        assert store.contains("CH-00000001") and not store.contains("CH-00000002")
+        assert len(store._buffer) == 1  # still batched
+        store.flush()
+        assert store.contains("CH-00000001")
+        store.close()
+
+
+def test_buffered_reports_are_written_at_exit():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reports.db")
+        env = {**os.environ, "REPORT_STORE": "sqlite", "REPORT_DB_PATH": path, "MODEL_BACKEND": "mock"}
+        code = ("import bully_detector; bully_detector.submit_cyberhub_report("
+                "'twitter', '@a', 'you idiot', [{'type': 'toxicity', 'severity': 0.9}], 0.9, 'block')")
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True)
+        store = SQLiteReportStore(path)
+        assert store.count() == 1
+        store.close()
+
+
+if __name__ == "__main__":
+    test_memory_store()
+    test_memory_store_query()
+    test_sqlite_store_query()
+    test_bad_cursor_is_rejected()
+    test_sqlite_store_batches_and_persists()
+    test_sqlite_contains_does_not_flush()
+    test_buffered_reports_are_written_at_exit()
+    print("✅ Report stores OK")
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+import bully_detector
+from rewriter import LexiconRewriter, Rewriter, load_lexicon, trie_pattern
+
+
+def test_whole_words_only():
+    rewriter = Rewriter(bully_detector.TOXIC_REWRITES)
+    assert rewriter.rewrite("I studied with my father") == ("I studied with my father", 0)
+    text, count = rewriter.rewrite("you fool, just die")
+    assert text == "you someone still learning, just take a break"
+    assert count == 2
+
+
+def test_case_and_phrases():
+    rewriter = Rewriter(bully_detector.TOXIC_REWRITES)
+    assert rewriter.rewrite("IDIOT")[0] == "SOMEONE WHO MIGHT NEED HELP"
+    assert rewriter.rewrite("Stupid move")[0] == "Still learning move"
+    assert rewriter.rewrite("please SHUT   UP now")[0] == "please I'D APPRECIATE SOME QUIET now"
+    # The trie prefers the longest phrase and backs off to shorter ones.
+    overlap = Rewriter({"fat": "a", "fatal": "b", "fat cat": "c"})
+    assert overlap.rewrite("fat fatal fat cat fats")[0] == "a b c fats"
+    assert trie_pattern(["ab", "ac"]) == "(?:a(?:b|c))"
+
+
+def test_unicode_case_variants():
+    rewriter = Rewriter(bully_detector.TOXIC_REWRITES)
+    # IGNORECASE matches "ſuck" (long s) for "suck"; the lookup must find it too.
+    assert rewriter.rewrite("you ſuck, idiot")[1] == 2
+    # "İ" matches "i" but casefolds to "i̇"; with no entry to use it stays as written.
+    assert Rewriter({"i": "x"}).rewrite("\u0130")[0] == "\u0130"
+    result = bully_detector.app.test_client().post("/analyze", json={"text": "you ſuck, idiot"})
+    assert result.status_code == 200
+
+
+def test_generate_polite_rewrite_keeps_contract():
+    out = bully_detector.generate_polite_rewrite("you are STUPID and a loser", 0.9)
+    assert "You are STILL LEARNING and a someone going through a tough time." in out
+    assert bully_detector.generate_polite_rewrite("he studied hard", 0.9).startswith("This sounds harsh")
+    assert bully_detector.generate_polite_rewrite("you idiot", 0.1) is None
+
+
+def test_lexicon_file_hot_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "lexicon.tsv")
+        with open(path, "w") as f:
+            f.write("# extra rewrites\nclown\tsomeone with a sense of humour\n")
+        assert load_lexicon(path) == {"clown": "someone with a sense of humour"}
+
+        rewriter = LexiconRewriter({"idiot": "friend"}, path=path, check_interval=0)
+        assert rewriter.rewrite("idiot clown")[0] == "friend someone with a sense of humour"
+
+        json_path = os.path.join(tmp, "lexicon.json")
+        with open(json_path, "w") as f:
+            f.write('{"clown": "jester", "idiot": "pal"}')
+        rewriter.path = json_path
+        assert rewriter.rewrite("idiot clown")[0] == "pal jester"
+        assert rewriter.reloads == 2
+
+        # A broken file keeps the last good lexicon.
+        with open(json_path, "w") as f:
+            f.write("[1, 2]")
+        os.utime(json_path, ns=(1, 1))
+        assert rewriter.rewrite("idiot clown")[0] == "pal jester"
+        assert rewriter.errors == 1
+
+
+if __name__ == "__main__":
+    test_whole_words_only()
+    test_case_and_phrases()
+    test_unicode_case_variants()
+    test_generate_polite_rewrite_keeps_contract()
+    test_lexicon_file_hot_reload()
+    print("✅ Rewriter OK")
@@ -0,0 +1,53 @@
+import bully_detector
+
+
+def test_rescan_reuses_results_without_model_calls():
+    bully_detector.scan_memo.clear()
+    bully_detector.reset_feeds()
+    first = bully_detector.scan_platforms(bully_detector.PLATFORMS)
+    model_calls = dict(bully_detector.model_counters)
+    reports = bully_detector.report_store.count()
+
+    client = bully_detector.app.test_client()
+    assert client.get("/api/platform/stats").status_code == 200
+    assert client.get("/api/platform/feed").status_code == 200
+    second = bully_detector.scan_platforms(bully_detector.PLATFORMS)
+
+    assert second == first
+    assert bully_detector.model_counters == model_calls
+    assert bully_detector.report_store.count() == reports
+
+
+def test_auto_reports_are_idempotent_per_post():
+    bully_detector.scan_platforms(bully_detector.PLATFORMS)
+    reports = bully_detector.report_store.count()
+    store = bully_detector.report_store
+    known = {
+        bully_detector._report_id_for(bully_detector.post_key(p, post))
+        for p in bully_detector.PLATFORMS for post in bully_detector.SIMULATED_POSTS[p]
+        if store.get(bully_detector._report_id_for(bully_detector.post_key(p, post))) is not None
+    }
+
+    # Even when the memo and watermarks are lost, re-analyzing a post reuses
+    # its report id, so only posts never reported before can add a report.
+    bully_detector.scan_memo.clear()
+    bully_detector.reset_feeds()
+    results = bully_detector.scan_platforms(bully_detector.PLATFORMS)
+    reported = {r["action"]["report_id"] for r in results if r["action"]["report_id"]}
+    assert store.count() == reports + len(reported - known)
+    for report_id in reported:
+        assert store.get(report_id) is not None
+
+
+def test_edited_post_is_analyzed_again():
+    post = dict(bully_detector.SIMULATED_POSTS["twitter"][0])
+    key = bully_detector.post_key("twitter", post)
+    post["content"] += " (edited)"
+    assert bully_detector.post_key("twitter", post) != key
+
+
+if __name__ == "__main__":
+    test_rescan_reuses_results_without_model_calls()
+    test_auto_reports_are_idempotent_per_post()
+    test_edited_post_is_analyzed_again()
+    print("✅ Scan memo OK")
@@ -0,0 +1,116 @@
+import csv
+import json
+
+import pytest
+
+import score_corpus
+
+MESSAGES = [
+    {"id": "a", "text": "You are so stupid"},
+    {"id": "b", "text": "Have a lovely weekend"},
+    {"id": "c", "text": ""},
+    {"id": "d", "text": "Click here to claim your free prize now", "media": "image_proof"},
+    {"id": "e", "text": "idiot"},
+]
+
+
+def _write_jsonl(path, records):
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_scores_every_record_in_order(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, MESSAGES)
+    assert score_corpus.main([str(src), "-o", str(out), "--chunk-size", "2", "--workers", "2"]) == 0
+
+    rows = _read_jsonl(out)
+    assert [r["id"] for r in rows] == ["a", "b", "c", "d", "e"]
+    assert rows[2]["error"] == "No text provided"
+    assert rows[0]["toxicity_score"] > rows[1]["toxicity_score"]
+    assert rows[3]["fraud"]["is_fraud"]
+
+
+def test_resume_only_scores_new_records(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, MESSAGES[:3])
+    score_corpus.main([str(src), "-o", str(out), "--workers", "1", "--compact"])
+    _write_jsonl(src, MESSAGES[3:])
+    score_corpus.main([str(src), "-o", str(out), "--workers", "1", "--compact", "--resume"])
+
+    rows = _read_jsonl(out)
+    assert [r["id"] for r in rows] == ["a", "b", "c", "d", "e"]
+    assert set(rows[0]) == set(score_corpus.COLUMNS)
+
+
+def test_csv_in_and_out(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    with open(src, "w", newline="") as f:
+        writer = csv.DictWriter(f, ["id", "body"])
+        writer.writeheader()
+        writer.writerows({"id": m["id"], "body": m["text"]} for m in MESSAGES)
+    score_corpus.main([str(src), "-o", str(out), "--text-field", "body", "--workers", "1"])
+
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["id"] for r in rows] == ["a", "b", "c", "d", "e"]
+    assert "fraud" in rows[3]["threat_types"]
+
+
+def test_bad_records_get_error_rows(tmp_path):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_jsonl(src, MESSAGES[:1])
+    with open(src, "a") as f:
+        f.write('{"id": "broken", "text": \n' + '["not", "an", "object"]\n')
+    _write_jsonl(src, MESSAGES[1:2])
+    assert score_corpus.main([str(src), "-o", str(out), "--workers", "1", "--compact"]) == 0
+
+    rows = _read_jsonl(out)
+    assert [r["id"] for r in rows] == ["a", 1, 2, "b"]
+    assert rows[1]["error"].startswith("Invalid JSON") and rows[2]["error"] == "Expected an object, got list"
+    assert rows[3]["error"] is None
+
+
+def test_csv_resume_continues_from_offset(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    with open(src, "w", newline="") as f:
+        writer = csv.DictWriter(f, ["id", "body"])
+        writer.writeheader()
+        writer.writerows([{"id": "a", "body": "line one\nline two"}, {"id": "b", "body": "idiot"}])
+    score_corpus.main([str(src), "-o", str(out), "--text-field", "body", "--workers", "1"])
+    with open(src, "a", newline="") as f:
+        csv.writer(f).writerow(["c", "Have a lovely weekend"])
+    score_corpus.main([str(src), "-o", str(out), "--text-field", "body", "--workers", "1", "--resume"])
+
+    with open(out, newline="") as f:
+        assert [r["id"] for r in csv.DictReader(f)] == ["a", "b", "c"]
+
+
+def test_parquet_parts_share_one_schema(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.parquet"
+    _write_jsonl(src, MESSAGES)
+    with open(src, "a") as f:
+        f.write("not json\n")
+    assert score_corpus.main([str(src), "-o", str(out), "--chunk-size", "3", "--workers", "1"]) == 0
+
+    table = pq.read_table(str(out))
+    assert table.schema.field("id").type == "string"
+    assert table.column("id").to_pylist() == ["a", "b", "c", "d", "e", "5"]
+    assert table.column("error").to_pylist()[2] == "No text provided"
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    for test in (test_jsonl_scores_every_record_in_order, test_resume_only_scores_new_records, test_csv_in_and_out,
+                 test_bad_records_get_error_rows, test_csv_resume_continues_from_offset):
+        with tempfile.TemporaryDirectory() as d:
+            test(pathlib.Path(d))
+    print("✅ Corpus scorer OK")
@@ -0,0 +1,54 @@
+import numpy as np
+
+import bully_detector
+from scoring import ScoringKernel
+
+
+def test_buckets_match_thresholds_without_noise():
+    kernel = ScoringKernel(noise=False)
+    bully = np.array([0.1, 0.95, 0.95, 0.5, 0.1])
+    sarcasm = np.array([0.2, 0.2, 0.95, 0.6, 0.2])
+    scores = kernel.score(bully, sarcasm)
+
+    risk = np.clip((bully * 0.6 + sarcasm * 1.2) / 2, 0, 1)
+    assert np.allclose(scores["risk"], risk)
+    for r, level, mood in zip(risk, scores["level"], scores["mood"]):
+        expected_level = 4 if r > 0.85 else 3 if r > 0.65 else 2 if r > 0.45 else 1 if r > 0.25 else 0
+        expected_mood = 0 if r < 0.25 else 1 if r < 0.45 else 2 if r < 0.65 else 3 if r < 0.85 else 4
+        assert (level, mood) == (expected_level, expected_mood)
+    assert np.allclose(scores["respect"], np.clip(np.round(1 - bully * 0.8, 4), 0, 1))
+    assert ((scores["picks"] >= 0) & (scores["picks"] < 1)).all()
+
+
+def test_seeded_kernel_is_reproducible():
+    bully, sarcasm = np.random.default_rng(1).random((2, 1000))
+    a, b = ScoringKernel(seed=42).score(bully, sarcasm), ScoringKernel(seed=42).score(bully, sarcasm)
+    assert all(np.array_equal(a[k], b[k]) for k in a)
+    assert not np.array_equal(a["risk"], ScoringKernel(seed=43).score(bully, sarcasm)["risk"])
+
+
+def test_small_batch_path_matches_numpy_path():
+    bully, sarcasm = np.random.default_rng(2).random((2, 6))
+    for noise in (True, False):
+        small = ScoringKernel(seed=7, noise=noise).score_rows(bully, sarcasm)
+        vectorized = {k: v.tolist() for k, v in ScoringKernel(seed=7, noise=noise).score(bully, sarcasm).items()}
+        assert small == vectorized
+
+
+def test_detect_is_deterministic_with_noise_off():
+    original = bully_detector.scoring_kernel
+    bully_detector.scoring_kernel = ScoringKernel(noise=False)
+    try:
+        text = "you are so stupid 🙄"
+        assert bully_detector.detect(text) == bully_detector.detect(text)
+        assert bully_detector.detect_batch([text, text]) == [bully_detector.detect(text)] * 2
+    finally:
+        bully_detector.scoring_kernel = original
+
+
+if __name__ == "__main__":
+    test_buckets_match_thresholds_without_noise()
+    test_seeded_kernel_is_reproducible()
+    test_small_batch_path_matches_numpy_path()
+    test_detect_is_deterministic_with_noise_off()
+    print("✅ Scoring kernel OK")
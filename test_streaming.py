@@ -0,0 +1,47 @@
+import json
+
+import bully_detector
+
+
+def _events(body):
+    return [json.loads(line) for line in body.decode("utf-8").splitlines() if line]
+
+
+def test_ndjson_feed_streams_results_then_summary():
+    bully_detector.reset_feeds()
+    client = bully_detector.app.test_client()
+    response = client.get("/api/platform/feed?stream=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    events = _events(response.get_data())
+
+    results = [e["result"] for e in events if e["event"] == "result"]
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert summary["total"] == len(results) == sum(len(p) for p in bully_detector.SIMULATED_POSTS.values())
+    assert summary["threats_found"] == sum(r["analysis"]["primary_category"] != "safe" for r in results)
+    assert summary["time_to_first_result_ms"] <= summary["total_ms"]
+
+
+def test_sse_scan_via_accept_header():
+    client = bully_detector.app.test_client()
+    response = client.post("/api/platform/scan", json={"platform": "twitter"},
+                           headers={"Accept": "text/event-stream"})
+    assert response.mimetype == "text/event-stream"
+    chunks = [c for c in response.get_data(as_text=True).split("\n\n") if c]
+    assert all(c.startswith("event: ") for c in chunks)
+    assert chunks[-1].startswith("event: summary")
+    assert len(chunks) == len(bully_detector.SIMULATED_POSTS["twitter"]) + 1
+
+
+def test_plain_json_is_unchanged():
+    response = bully_detector.app.test_client().get("/api/platform/feed?platform=whatsapp")
+    assert response.is_json
+    assert response.get_json()["total"] == len(bully_detector.SIMULATED_POSTS["whatsapp"])
+    assert "Server-Timing" in response.headers
+
+
+if __name__ == "__main__":
+    test_ndjson_feed_streams_results_then_summary()
+    test_sse_scan_via_accept_header()
+    test_plain_json_is_unchanged()
+    print("✅ Streaming OK")